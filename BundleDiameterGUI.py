@@ -1,20 +1,208 @@
+import time
+
+_STARTED = time.perf_counter()  # for --startup-time, taken before the Qt import
+
 from PyQt6.QtWidgets import (
-    QApplication, QWidget, QLabel, QLineEdit, QPushButton, QVBoxLayout,
-    QGridLayout, QMessageBox, QComboBox, QFrame
+    QApplication, QWidget, QLabel, QLineEdit, QPushButton, QVBoxLayout, QHBoxLayout,
+    QGridLayout, QMessageBox, QComboBox, QFrame, QCheckBox, QProgressBar, QFileDialog, QDialog, QTableWidget,
+    QTableWidgetItem
 )
 from PyQt6 import QtGui
 from PyQt6.QtGui import QIntValidator, QDoubleValidator, QRegularExpressionValidator
-from PyQt6.QtCore import QRegularExpression
+from PyQt6.QtCore import QRegularExpression, QThread, QTimer, pyqtSignal
+import os
 import sys
-import json
 import math
-from pathlib import Path
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
 import numpy as np
-import itertools
 
-plt.ion()
+import bundle_engine
+import bundle_export
+import bundle_thermal
+# matplotlib (bundle_plot) and the process pool (bundle_search) are imported on first
+# use: most sessions never draw a section, and matplotlib alone costs far more
+# startup time than everything else together
+from pack_cache import PackCache, DEFAULT_CACHE_PATH
+from wire_catalog import WireCatalog
+
+
+def section_plot_data(positions):
+    """Per-wire drawing arrays (centres, radii, colours per label), computed off the GUI thread."""
+    # choose colors per label (to reflect different insulation/core types), as the exported drawings
+    color_idx = bundle_export.label_colors(positions)
+    idx = [color_idx[label] for label in bundle_engine.position_labels(positions)]
+    x, y, outer_radii, core_areas = bundle_engine.position_arrays(positions)
+    # core radius from area, strictly smaller than outer for visibility
+    core_radii = np.sqrt(core_areas / math.pi)
+    core_radii = np.where(core_radii >= outer_radii, outer_radii * 0.98, core_radii)
+    return {
+        "xy": np.column_stack((x, y)),
+        "outer_radii": outer_radii,
+        "core_radii": core_radii,
+        "insulation_colors": [bundle_export.INSULATION_COLORS[i] for i in idx],
+        "core_colors": [bundle_export.CORE_COLORS[i] for i in idx],
+    }
+
+
+class PackWorker(QThread):
+    """Packs one job off the GUI thread, reporting progress per placed wire."""
+    progress = pyqtSignal(int, int, int)  # job id, placed, total
+    done = pyqtSignal(int, object, object)  # job id, PackResult, plot data (or None)
+    failed = pyqtSignal(int, str)
+
+    def __init__(self, job, pack_cache, wire_data, last_pack):
+        super().__init__()
+        self.job = job
+        self.pack_cache = pack_cache
+        self.wire_data = wire_data
+        self.last_pack = last_pack
+        self._cancelled = False
+        self._reported = -1
+
+    def cancel(self):
+        self._cancelled = True
+
+    def _progress(self, placed, total):
+        if self._cancelled:
+            raise bundle_engine.PackCancelled()
+        # about 200 updates per pack is plenty for a progress bar
+        step = placed * 200 // max(total, 1)
+        if step != self._reported:
+            self._reported = step
+            self.progress.emit(self.job["id"], placed, total)
+
+    def pack(self):
+        job = self.job
+        if job["incremental"] and self.last_pack is not None:
+            return bundle_engine.repack_incremental(self.last_pack, job["wire_counts"], job["insulation"],
+                                                    job["heatshrink"], custom=job["custom"],
+                                                    wire_data=self.wire_data, mode=job["mode"],
+                                                    progress=self._progress)
+        return self.pack_cache.pack(job["wire_counts"], job["insulation"], job["heatshrink"],
+                                    custom=job["custom"], mode=job["mode"], progress=self._progress)
+
+    def run(self):
+        job = self.job
+        try:
+            # HARNESSHELPER_PROFILE=file dumps a cProfile of every packing to that file
+            profile_path = os.environ.get("HARNESSHELPER_PROFILE")
+            if profile_path:
+                result = bundle_engine.profile_call(profile_path, self.pack)
+            else:
+                result = self.pack()
+            plot_data = None
+            if job["plot"]:
+                import bundle_plot  # noqa: F401  load matplotlib here rather than on the GUI thread
+                start = time.perf_counter()
+                plot_data = section_plot_data(result.positions)
+                plot_data["prep_time"] = time.perf_counter() - start
+        except bundle_engine.PackCancelled:
+            return
+        except Exception as e:
+            self.failed.emit(job["id"], str(e))
+            return
+        self.done.emit(job["id"], result, plot_data)
+
+
+class SearchWorker(QThread):
+    """Multi-start search within the job's time budget, reporting every improvement."""
+    progress = pyqtSignal(int, int, int)  # job id, elapsed ms, budget ms
+    done = pyqtSignal(int, object, object)  # job id, best PackResult so far, plot data
+    failed = pyqtSignal(int, str)
+    searched = pyqtSignal(int, object)  # job id, final SearchResult
+
+    def __init__(self, job, pack_cache, wire_data, last_pack):
+        super().__init__()
+        self.job = job
+        self.pack_cache = pack_cache
+        self.wire_data = wire_data
+        self._cancelled = False
+        self._started = 0.0
+
+    def cancel(self):
+        self._cancelled = True
+
+    def _tick(self):
+        # polled by the search loop: report elapsed time, stop on cancel
+        elapsed = time.perf_counter() - self._started
+        self.progress.emit(self.job["id"], int(elapsed * 1000), int(self.job["budget"] * 1000))
+        return self._cancelled
+
+    def _improved(self, search):
+        self.done.emit(self.job["id"], search.best, section_plot_data(search.best.positions))
+
+    def run(self):
+        import bundle_plot  # noqa: F401  load matplotlib here rather than on the GUI thread
+        import bundle_search
+        job = self.job
+        self._started = time.perf_counter()
+        try:
+            # start from the plain packing if it is cached, so there's a result straight away
+            initial = self.pack_cache.lookup(job["wire_counts"], job["insulation"], job["heatshrink"],
+                                             custom=job["custom"], mode=job["mode"])
+            if initial is not None:
+                self._improved(bundle_search.SearchResult(initial))
+            # spawn: forking a process that runs Qt threads is not safe
+            result = bundle_search.search(job["wire_counts"], job["insulation"], job["heatshrink"],
+                                          custom=job["custom"], wire_data=self.wire_data, mode=job["mode"],
+                                          budget=job["budget"], initial=initial, improved=self._improved,
+                                          stop=self._tick, context="spawn")
+        except Exception as e:
+            self.failed.emit(job["id"], str(e))
+            return
+        self.searched.emit(job["id"], result)
+
+
+class CompareWorker(QThread):
+    """Packs and rates the job's wires with every insulation at once (bundle_compare)."""
+    done = pyqtSignal(object, object)  # job, list of InsulationRow
+    failed = pyqtSignal(str)
+
+    def __init__(self, job, pack_cache, wire_data):
+        super().__init__()
+        self.job = job
+        self.pack_cache = pack_cache
+        self.wire_data = wire_data
+
+    def run(self):
+        import bundle_compare
+        job = self.job
+        try:
+            # spawn: forking a process that runs Qt threads is not safe
+            rows = bundle_compare.compare_insulations(job["wire_counts"], job["heatshrink"], custom=job["custom"],
+                                                      wire_data=self.wire_data, mode=job["mode"], load=job["load"],
+                                                      safety_factor=job["safety_factor"], cache=self.pack_cache,
+                                                      context="spawn")
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.done.emit(job, rows)
+
+
+def comparison_dialog(parent, job, rows):
+    """Table of the insulation comparison: one row per insulation, one derated-current column per gauge."""
+    gauges = [g for g in job["wire_counts"] if job["wire_counts"][g]]
+    headers = ["Insulation", "Bundle Ø (mm)", "With HS Ø (mm)", "Weight (g/m)"] + [f"{g} (A)" for g in gauges]
+    table = QTableWidget(len(rows), len(headers))
+    table.setHorizontalHeaderLabels(headers)
+    for k, row in enumerate(rows):
+        table.setItem(k, 0, QTableWidgetItem(row.insulation))
+        if row.error:
+            table.setItem(k, 1, QTableWidgetItem(row.error))
+            table.setSpan(k, 1, 1, len(headers) - 1)
+            continue
+        cells = [f"{row.diameter:.2f}", f"{row.diameter_with_hs:.2f}", f"{row.weight:.0f}"]
+        cells += [f"{row.current_limits[g]:.2f}" if g in row.current_limits else "" for g in gauges]
+        for c, text in enumerate(cells, start=1):
+            table.setItem(k, c, QTableWidgetItem(text))
+    table.resizeColumnsToContents()
+    dialog = QDialog(parent)
+    dialog.setWindowTitle(f"Insulation comparison — {sum(job['wire_counts'].values())} wires, "
+                          f"{job['load']} % bundle load")
+    layout = QVBoxLayout()
+    layout.addWidget(table)
+    dialog.setLayout(layout)
+    dialog.resize(min(1200, 60 + table.horizontalHeader().length()), 120 + 30 * len(rows))
+    return dialog
 
 
 class HarnessCalculator(QWidget):
@@ -23,13 +211,11 @@ class HarnessCalculator(QWidget):
 
         # Load wires.json from same folder as this script
         try:
-            base = Path(__file__).parent
-            with open(base / "wires.json", "r", encoding="utf-8") as f:
-                self.wire_data = json.load(f)
+            self.wire_data = bundle_engine.load_wire_data()
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Could not load wires.json: {e}")
             # Fallback minimal data so UI builds
-            self.wire_data = {
+            self.wire_data = WireCatalog.from_dict({
                 "core": {
                     "24 Gauge": {"area": 0.69, "core_radius": None},
                     "22 Gauge": {"area": 0.93, "core_radius": None}
@@ -38,14 +224,27 @@ class HarnessCalculator(QWidget):
                     "24 Gauge": {"radius": 0.47, "amp_limit": 2},
                     "22 Gauge": {"radius": 0.54, "amp_limit": 3}
                 }
-            }
+            })
 
         # central core table (metal/conductor dimensions) — single source of truth
-        self.core_table = self.wire_data.get("core", {})
-        self.insulation_types = [k for k in self.wire_data.keys() if k != "core"]
+        self.core_gauges = self.wire_data.core_gauges
+        self.insulation_types = bundle_engine.insulation_types(self.wire_data)
+        # repeated packs of the same wire mix are served from memory / disk
+        try:
+            self.pack_cache = PackCache(self.wire_data, path=DEFAULT_CACHE_PATH)
+        except Exception:
+            self.pack_cache = PackCache(self.wire_data)
         self.selected_insulation = self.insulation_types[0]
         self.input_widgets = []  # widgets added for wire inputs (for cleanup)
         self.inputs = {}  # QLineEdit per wire name
+        self.last_pack = None  # last bundle section, base for incremental repacking
+        self.worker = None  # PackWorker currently running, if any
+        self.pending_job = None  # job waiting for the running worker to stop
+        self.job_id = 0  # id of the newest job, results of older ones are dropped
+        self.section_view = None  # BundleSectionView, created on first display
+        self.plot_prep_time = 0.0
+        self.last_plot_data = None  # drawing arrays of the section on screen
+        self.compare_worker = None  # CompareWorker currently running, if any
         self.initUI()
 
     def initUI(self):
@@ -80,6 +279,8 @@ class HarnessCalculator(QWidget):
         self.custom_area_input.setValidator(QDoubleValidator(0.0, 999.99, 3))
         self.custom_count_input = QLineEdit()
         self.custom_count_input.setValidator(QIntValidator(0, 9999))
+        self.custom_area_input.textChanged.connect(self.schedule_live_update)
+        self.custom_count_input.textChanged.connect(self.schedule_live_update)
         grid.addWidget(QLabel("Custom (mm²)"), row, 0)
         grid.addWidget(self.custom_count_input, row, 1)
         grid.addWidget(QLabel("Wires"), row, 2)
@@ -96,23 +297,81 @@ class HarnessCalculator(QWidget):
         self.calc_button = QPushButton("Calculate Harness Diameter")
         self.calc_button.clicked.connect(self.Calculate_diameter)
         grid.addWidget(self.calc_button, row, 0, 1, 2)
+        # drawings of the last packed section for build books (no plot needed)
+        self.export_button = QPushButton("Export Section…")
+        self.export_button.clicked.connect(self.ExportSection)
+        grid.addWidget(self.export_button, row, 2, 1, 3)
         row += 1
 
         self.bundle_button = QPushButton("Display Bundle Section")
         self.bundle_button.clicked.connect(self.DisplayBundleSection)
         grid.addWidget(self.bundle_button, row, 0, 1, 2)
+        # live mode: repack (debounced) while typing, diameter only
+        self.live_check = QCheckBox("Live diameter")
+        self.live_check.toggled.connect(self.schedule_live_update)
+        grid.addWidget(self.live_check, row, 2, 1, 3)
+        row += 1
+
+        # packing progress, only shown while a worker runs
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        grid.addWidget(self.progress_bar, row, 0, 1, 2)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_pack)
+        self.cancel_button.setVisible(False)
+        grid.addWidget(self.cancel_button, row, 2)
         row += 1
 
+        # timings and counters of the last packing
+        self.status_label = QLabel("")
+        self.status_label.setWordWrap(True)
+        self.status_label.setStyleSheet("color: gray; font-size: 9pt;")
+        grid.addWidget(self.status_label, row, 0, 1, 5)
+        row += 1
+
+        self.live_timer = QTimer(self)
+        self.live_timer.setSingleShot(True)
+        self.live_timer.setInterval(300)
+        self.live_timer.timeout.connect(self.live_update)
+
         # Heat shrink input
         self.heatshrink_input = QLineEdit()
         self.heatshrink_input.setValidator(QDoubleValidator(0.0, 50.0, 3))
         self.heatshrink_input.setPlaceholderText("0 = none")
+        self.heatshrink_input.textChanged.connect(self.schedule_live_update)
         grid.addWidget(QLabel("Heat shrink thickness (mm)"), row, 0)
         grid.addWidget(self.heatshrink_input, row, 1)
         row += 1
 
-        # Layout Setup
+        # Packing mode: exhaustive pair search or front-chain for large trunks
+        self.packing_dropdown = QComboBox()
+        self.packing_dropdown.addItems(["Pratt (exact)", "Front chain (fast)"])
+        self.packing_dropdown.currentTextChanged.connect(self.schedule_live_update)
+        grid.addWidget(QLabel("Packing mode"), row, 0)
+        grid.addWidget(self.packing_dropdown, row, 1)
+        # incremental: wires added since the last section are placed around the old layout
+        self.incremental_check = QCheckBox("Keep layout when adding wires")
+        grid.addWidget(self.incremental_check, row, 2, 1, 3)
+        row += 1
+
+        # anytime search: many seeded packings on all cores, smallest Ø within the budget
+        self.search_button = QPushButton("Best Ø within")
+        self.search_button.clicked.connect(self.SearchBestSection)
+        grid.addWidget(self.search_button, row, 0)
+        self.budget_input = QLineEdit("10")
+        self.budget_input.setValidator(QDoubleValidator(0.5, 3600.0, 1))
+        grid.addWidget(self.budget_input, row, 1)
+        grid.addWidget(QLabel("s"), row, 2)
+        # same wires with every insulation in wires.json, packed in parallel
+        self.compare_button = QPushButton("Compare Insulations")
+        self.compare_button.clicked.connect(self.CompareInsulations)
+        grid.addWidget(self.compare_button, row, 3, 1, 2)
+        row += 1
+
+        # Layout Setup: input panels on the left, bundle section view added on the right
+        self.outer_layout = QHBoxLayout()
         layout = QVBoxLayout()
+        self.outer_layout.addLayout(layout)
         layout.addLayout(grid)
 
         # Separator
@@ -127,7 +386,7 @@ class HarnessCalculator(QWidget):
         self.operation_dropdown = QComboBox()
         grid2.addWidget(QLabel("Wire Gauge"), row2, 0)
         # populate with available gauges — prefer core table keys
-        gauges = list(self.core_table.keys()) if self.core_table else list(next(iter(self.wire_data.values())).keys())
+        gauges = self.core_gauges or self.wire_data.gauges_for(self.insulation_types[0])
         self.operation_dropdown.addItems(gauges)
         grid2.addWidget(self.operation_dropdown, row2, 1)
 
@@ -135,7 +394,12 @@ class HarnessCalculator(QWidget):
         self.operation_dropdown2 = QComboBox()
         grid2.addWidget(QLabel("Bundle loading percentage"), row2, 0)
         self.operation_dropdown2.addItems(["20", "40", "60", "80", "100"])
+        self.operation_dropdown2.currentTextChanged.connect(self.refresh_thermal)
         grid2.addWidget(self.operation_dropdown2, row2, 1)
+        # every wire of the packed section at that share of its rated current, solved per layout
+        self.thermal_check = QCheckBox("Conductor temperatures of the section")
+        self.thermal_check.toggled.connect(self.refresh_thermal)
+        grid2.addWidget(self.thermal_check, row2, 2)
 
         row2 += 1
         self.input1 = QLineEdit()
@@ -161,6 +425,11 @@ class HarnessCalculator(QWidget):
         self.calculate_button.clicked.connect(self.Calculate_Amp)
         grid2.addWidget(self.calculate_button, row2, 0, 1, 2)
 
+        row2 += 1
+        self.thermal_label = QLabel("")
+        self.thermal_label.setWordWrap(True)
+        grid2.addWidget(self.thermal_label, row2, 0, 1, 3)
+
         layout.addLayout(grid2)
 
         # Separator
@@ -193,7 +462,7 @@ class HarnessCalculator(QWidget):
 
         row3 += 1
         self.operation_dropdown4 = QComboBox()
-        self.operation_dropdown4.addItems(["Cu", "Ag", "CuS"])
+        self.operation_dropdown4.addItems(list(bundle_engine.MATERIAL_RESISTANCE))
         grid3.addWidget(QLabel("Material"), row3, 0)
         grid3.addWidget(self.operation_dropdown4, row3, 1)
 
@@ -208,10 +477,7 @@ class HarnessCalculator(QWidget):
 
         layout.addLayout(grid3)
 
-        # material resistivity
-        self.material_resistance = {"Cu": 0.00000172, "Ag": 0.00000159, "CuS": 0.00000159}
-
-        self.setLayout(layout)
+        self.setLayout(self.outer_layout)
 
     def update_wire_inputs(self, start_row: int = 1):
         # Remove old widgets
@@ -230,7 +496,7 @@ class HarnessCalculator(QWidget):
         row = start_row
         # Build inputs from selected insulation set
         # input list should reflect gauges from core table when present
-        wires = list(self.core_table.keys()) if self.core_table else list(self.wire_data.get(self.selected_insulation, {}).keys())
+        wires = self.core_gauges or self.wire_data.gauges_for(self.selected_insulation)
         if not wires:
             wires = ["(no wire data)"]
 
@@ -238,6 +504,7 @@ class HarnessCalculator(QWidget):
             label = QLabel(wire)
             input_field = QLineEdit()
             input_field.setValidator(QIntValidator(0, 9999))
+            input_field.textChanged.connect(self.schedule_live_update)
             wires_label = QLabel("Wires")
             self.inputs[wire] = input_field
             self.grid.addWidget(label, row, 0)
@@ -252,7 +519,7 @@ class HarnessCalculator(QWidget):
     def on_insulation_change(self, text):
         self.selected_insulation = text
         # update gauge dropdowns to reflect available gauges (optional)
-        gauges = list(self.wire_data.get(text, {}).keys())
+        gauges = self.wire_data.gauges_for(text)
         if gauges:
             # update operation_dropdowns without triggering signals
             self.operation_dropdown.clear()
@@ -260,51 +527,20 @@ class HarnessCalculator(QWidget):
             self.operation_dropdown3.clear()
             self.operation_dropdown3.addItems(gauges)
         self.update_wire_inputs(start_row=1)
+        self.schedule_live_update()
 
     def Calculate_diameter(self):
-        total_area = 0.0
-        for wire, edit in self.inputs.items():
-            txt = edit.text().strip()
-            if not txt:
-                continue
-            try:
-                count = int(txt)
-                if count < 0:
-                    raise ValueError
-                # prefer perimeter/insulation area if explicitly provided, otherwise use core conductor area from core table
-                ins_entry = self.wire_data.get(self.selected_insulation, {}).get(wire, {})
-                core_entry = self.core_table.get(wire, {})
-                area = float(ins_entry.get("area", core_entry.get("area", 0.0)))
-                total_area += count * area
-            except Exception:
-                QMessageBox.warning(self, "Input Error", f"Invalid input for {wire}")
-                return
-
-        # custom wires
-        custom_count = self.custom_count_input.text().strip()
-        custom_area = self.custom_area_input.text().strip()
-        if custom_count and custom_area:
-            try:
-                cc = int(custom_count)
-                ca = float(custom_area)
-                if cc < 0 or ca <= 0:
-                    raise ValueError
-                total_area += cc * ca
-            except Exception:
-                QMessageBox.warning(self, "Input Error", "Invalid custom wire values")
-                return
-
-        if total_area <= 0:
-            self.result_label.setText("Harness Diameter: 0.00 mm")
+        counts = self.read_wire_counts()
+        if counts is None:
             return
-
-        diameter = 1.3 * math.sqrt(total_area)
+        wire_counts, custom = counts
+        diameter = bundle_engine.harness_diameter(self.wire_data, self.selected_insulation, wire_counts, custom)
         self.result_label.setText(f"Harness Diameter: {diameter:.2f} mm")
 
-    def DisplayBundleSection(self):
-        # gather wire tuples: (insulation_outer_radius_mm, core_area_mm2)
-        wire_entries = []
-        total_wires = 0
+    def read_wire_counts(self, quiet=False):
+        """Wire counts and custom (count, area) from the inputs; shows a warning (unless
+        quiet) and returns None on invalid input."""
+        wire_counts = {}
         for wire, edit in self.inputs.items():
             txt = edit.text().strip()
             if not txt:
@@ -313,26 +549,13 @@ class HarnessCalculator(QWidget):
                 count = int(txt)
                 if count < 0:
                     raise ValueError
-                # outer radius (insulation) comes from selected insulation set
-                ins_entry = self.wire_data.get(self.selected_insulation, {}).get(wire, {})
-                r_outer = float(ins_entry.get("radius", 0.0))
-                # core (metal) area comes from single core table (preferred)
-                core_entry = self.core_table.get(wire, {})
-                if "core_area" in core_entry:
-                    core_area = float(core_entry["core_area"])
-                elif "area" in core_entry:
-                    core_area = float(core_entry["area"])
-                else:
-                    # fallback to any area present in insulation entry (legacy)
-                    core_area = float(ins_entry.get("area", max(0.0001, math.pi * (r_outer * 0.5) ** 2)))
-                total_wires += count
-                for _ in range(count):
-                    wire_entries.append((r_outer, core_area, wire))
+                wire_counts[wire] = count
             except Exception:
-                QMessageBox.warning(self, "Input Error", f"Invalid input for {wire}")
-                return
+                if not quiet:
+                    QMessageBox.warning(self, "Input Error", f"Invalid input for {wire}")
+                return None
 
-        # custom wires: assume provided area is core area; outer radius = core radius (no insulation)
+        custom = None
         custom_count = self.custom_count_input.text().strip()
         custom_area = self.custom_area_input.text().strip()
         if custom_count and custom_area:
@@ -341,133 +564,14 @@ class HarnessCalculator(QWidget):
                 ca = float(custom_area)
                 if cc < 0 or ca <= 0:
                     raise ValueError
-                core_radius = math.sqrt(ca / math.pi)
-                total_wires += cc
-                for _ in range(cc):
-                    wire_entries.append((core_radius, ca, "Custom"))
+                custom = (cc, ca)
             except Exception:
-                QMessageBox.warning(self, "Input Error", "Invalid custom wire values")
-                return
-
-        if total_wires < 3:
-            QMessageBox.warning(self, "Input Error", "Please enter at least 3 wires to display a bundle")
-            return
-
-        # sort by outer radius descending for better packing
-        wire_entries.sort(key=lambda t: t[0], reverse=True)
-        radii = [entry[0] for entry in wire_entries]  # outer radii
-        core_areas = [entry[1] for entry in wire_entries]
-        labels = [entry[2] for entry in wire_entries]
-
-        # Pratt-style placement:
-        positions = []  # list of (x,y,outer_r, core_area, label)
-        # place first at origin
-        positions.append((0.0, 0.0, radii[0], core_areas[0], labels[0]))
-
-        def overlaps_any(x, y, r):
-            for (px, py, pr, *_ ) in positions:
-                if (x - px) ** 2 + (y - py) ** 2 < (r + pr - 1e-8) ** 2:
-                    return True
-            return False
-
-        # helper: intersection points of two circles (centers c1,c2 radii R1,R2)
-        def circle_intersections(c1, R1, c2, R2):
-            (x1, y1) = c1
-            (x2, y2) = c2
-            dx = x2 - x1
-            dy = y2 - y1
-            d2 = dx * dx + dy * dy
-            if d2 == 0:
-                return []  # concentric
-            d = math.sqrt(d2)
-            # no solutions
-            if d > (R1 + R2) + 1e-8 or d < abs(R1 - R2) - 1e-8:
-                return []
-            # two circle intersection
-            a = (R1 * R1 - R2 * R2 + d * d) / (2 * d)
-            h2 = max(0.0, R1 * R1 - a * a)
-            xm = x1 + a * dx / d
-            ym = y1 + a * dy / d
-            if h2 == 0:
-                return [(xm, ym)]
-            h = math.sqrt(h2)
-            rx = -dy * (h / d)
-            ry = dx * (h / d)
-            p1 = (xm + rx, ym + ry)
-            p2 = (xm - rx, ym - ry)
-            return [p1, p2]
-
-        # place remaining with Pratt-like candidate generation (tangent to pairs + angle probes)
-        for idx in range(1, len(radii)):
-            r_new = radii[idx]
-            core_area_new = core_areas[idx]
-            label_new = labels[idx]
-            candidates = []
-
-            # 1) positions tangent to every placed circle at many angles (single circle probes)
-            for (px, py, pr, *_ ) in positions:
-                # sample angles for candidate tangency points (coarse)
-                for theta in np.linspace(0, 2 * math.pi, 36, endpoint=False):
-                    x = px + (pr + r_new) * math.cos(theta)
-                    y = py + (pr + r_new) * math.sin(theta)
-                    candidates.append((x, y))
-
-            # 2) positions tangent to pairs of existing circles (intersection of circles of R = pr + r_new)
-            for (i, a), (j, b) in itertools.combinations(enumerate(positions), 2):
-                (x1, y1, r1, *_) = a
-                (x2, y2, r2, *_) = b
-                inters = circle_intersections((x1, y1), r1 + r_new, (x2, y2), r2 + r_new)
-                for pt in inters:
-                    candidates.append(pt)
-
-            # evaluate candidates: sort by distance to origin (prefer compact)
-            def cand_key(pt):
-                return math.hypot(pt[0], pt[1])
-
-            placed = False
-            # remove duplicates and sort
-            unique_candidates = []
-            seen = set()
-            for c in sorted(candidates, key=cand_key):
-                key = (round(c[0], 6), round(c[1], 6))
-                if key in seen:
-                    continue
-                seen.add(key)
-                unique_candidates.append(c)
-
-            for (x, y) in unique_candidates:
-                if not overlaps_any(x, y, r_new):
-                    positions.append((x, y, r_new, core_area_new, label_new))
-                    placed = True
-                    break
-
-            if not placed:
-                # fallback: spiral search outward
-                R0 = 0.0
-                maxR = max(10.0, sum(radii) * 1.5)
-                for R in np.linspace(0, maxR, 800):
-                    for theta in np.linspace(0, 2 * math.pi, max(24, int(6 * (R + 1)))):
-                        x = R * math.cos(theta)
-                        y = R * math.sin(theta)
-                        if not overlaps_any(x, y, r_new):
-                            positions.append((x, y, r_new, core_area_new, label_new))
-                            placed = True
-                            break
-                    if placed:
-                        break
-                if not placed:
-                    # place far on +x
-                    x = maxR + r_new
-                    y = 0.0
-                    positions.append((x, y, r_new, core_area_new, label_new))
-
-        # compute bundle outer radius
-        bundle_outer = 0.0
-        for x, y, r, *_ in positions:
-            dist = math.hypot(x, y) + r
-            if dist > bundle_outer:
-                bundle_outer = dist
+                if not quiet:
+                    QMessageBox.warning(self, "Input Error", "Invalid custom wire values")
+                return None
+        return wire_counts, custom
 
+    def read_heatshrink(self):
         # heatshrink thickness (mm)
         hs_text = self.heatshrink_input.text().strip()
         hs_thickness = 0.0
@@ -478,63 +582,228 @@ class HarnessCalculator(QWidget):
                     hs_thickness = 0.0
         except Exception:
             hs_thickness = 0.0
+        return hs_thickness
+
+    def pack_job(self, quiet=False):
+        """Snapshot of the inputs for a PackWorker, or None if they can't be packed."""
+        counts = self.read_wire_counts(quiet)
+        if counts is None:
+            return None
+        wire_counts, custom = counts
+        total_wires = sum(wire_counts.values()) + (custom[0] if custom else 0)
+        if total_wires < 3:
+            if not quiet:
+                QMessageBox.warning(self, "Input Error", "Please enter at least 3 wires to display a bundle")
+            return None
+        return {
+            "wire_counts": wire_counts,
+            "custom": custom,
+            "insulation": self.selected_insulation,
+            "heatshrink": self.read_heatshrink(),
+            "mode": "front" if self.packing_dropdown.currentText() == "Front chain (fast)" else "pratt",
+            "incremental": self.incremental_check.isChecked(),
+        }
+
+    def DisplayBundleSection(self):
+        job = self.pack_job()
+        if job is not None:
+            job["plot"] = True
+            self.start_pack(job)
+
+    def ExportSection(self):
+        if self.last_pack is None or not self.last_pack.positions:
+            QMessageBox.information(self, "Export", "Pack a bundle section first (Display Bundle Section).")
+            return
+        path, chosen = QFileDialog.getSaveFileName(self, "Export bundle section", "bundle.svg",
+                                                   "SVG drawing (*.svg);;DXF drawing (*.dxf);;JSON geometry (*.json)")
+        if not path:
+            return
+        # the extension decides the format; without one, the chosen filter does
+        fmt = os.path.splitext(path)[1].lstrip(".").lower()
+        if not fmt:
+            fmt = chosen.split("*.")[-1].rstrip(")")
+            path = f"{path}.{fmt}"
+        try:
+            written = bundle_export.export(self.last_pack, path, fmt)
+        except Exception as e:
+            QMessageBox.warning(self, "Export", f"Could not export: {e}")
+            return
+        self.status_label.setText(f"Section exported to {written}")
 
-        # plotting
-        fig, ax = plt.subplots(figsize=(6, 6))
-        ax.set_aspect('equal')
-
-        # draw outer heat shrink ring first (as faint fill)
-        if hs_thickness > 0:
-            outer_hs = bundle_outer + hs_thickness
-            hs_patch = patches.Circle((0, 0), radius=outer_hs, edgecolor='red', facecolor=(1, 0.8, 0.8, 0.3), linewidth=1.0)
-            ax.add_patch(hs_patch)
-            # inner boundary of heatshrink (bundle outer)
-            hs_inner = patches.Circle((0, 0), radius=bundle_outer, edgecolor='red', facecolor='none', linestyle='--')
-            ax.add_patch(hs_inner)
-
-        # draw each wire: insulation outer (color A) and core (color B)
-        # choose colors per label (to reflect different insulation/core types)
-        insulation_colors = ['#66c2a5', '#8da0cb', '#fc8d62', '#a6d854', '#ffd92f']
-        core_colors = ['#2b7a5b', '#2f4a8a', '#b04532', '#4a7a2a', '#b07a02']
-        color_map = {}
-        for pos in positions:
-            _, _, _, _, label = pos
-            if label not in color_map:
-                idx = len(color_map) % len(insulation_colors)
-                color_map[label] = (insulation_colors[idx], core_colors[idx])
-
-        for x, y, r_outer, core_area, label in positions:
-            # insulation outer
-            ins_color, core_color = color_map[label]
-            circ_ins = patches.Circle((x, y), radius=r_outer, edgecolor='k', facecolor=ins_color, linewidth=0.6, zorder=1)
-            ax.add_patch(circ_ins)
-            # core radius from area
-            core_r = math.sqrt(core_area / math.pi)
-            # ensure core is strictly smaller than outer for visibility
-            if core_r >= r_outer:
-                core_r = r_outer * 0.98
-            circ_core = patches.Circle((x, y), radius=core_r, edgecolor='k', facecolor=core_color, linewidth=0.3, zorder=2)
-            ax.add_patch(circ_core)
+    def SearchBestSection(self):
+        job = self.pack_job()
+        if job is None:
+            return
+        try:
+            budget = float(self.budget_input.text())
+        except ValueError:
+            budget = 0.0
+        if budget <= 0:
+            QMessageBox.warning(self, "Input Error", "Please enter a time budget in seconds")
+            return
+        job["plot"] = True
+        job["incremental"] = False
+        job["budget"] = budget
+        self.start_pack(job)
+
+    def CompareInsulations(self):
+        job = self.pack_job()
+        if job is None or self.compare_worker is not None:
+            return
+        job["load"] = self.operation_dropdown2.currentText()
+        try:
+            job["safety_factor"] = float(self.inputSF.text()) if self.inputSF.text() else 1.0
+        except ValueError:
+            job["safety_factor"] = 1.0
+        self.compare_button.setEnabled(False)
+        self.compare_button.setText("Comparing…")
+        self.compare_worker = CompareWorker(job, self.pack_cache, self.wire_data)
+        self.compare_worker.done.connect(self.on_compare_done)
+        self.compare_worker.failed.connect(lambda message: QMessageBox.warning(self, "Compare", message))
+        self.compare_worker.finished.connect(self.on_compare_finished)
+        self.compare_worker.start()
+
+    def on_compare_done(self, job, rows):
+        comparison_dialog(self, job, rows).show()
+
+    def on_compare_finished(self):
+        self.compare_worker.deleteLater()
+        self.compare_worker = None
+        self.compare_button.setEnabled(True)
+        self.compare_button.setText("Compare Insulations")
+
+    def schedule_live_update(self, *_):
+        if self.live_check.isChecked():
+            self.live_timer.start()
+
+    def live_update(self):
+        job = self.pack_job(quiet=True)
+        if job is not None:
+            job["plot"] = False
+            self.start_pack(job)
+
+    def start_pack(self, job):
+        """Run a packing job on a worker thread; a newer job supersedes a running one."""
+        self.job_id += 1
+        job["id"] = self.job_id
+        if self.worker is not None:
+            # one packer at a time: cancel the running one, this job starts when it stops
+            self.worker.cancel()
+            self.pending_job = job
+            return
+        self.pending_job = None
+        worker_class = SearchWorker if job.get("budget") else PackWorker
+        self.worker = worker_class(job, self.pack_cache, self.wire_data, self.last_pack)
+        if job.get("budget"):
+            self.worker.searched.connect(self.on_search_done)
+        self.worker.progress.connect(self.on_pack_progress)
+        self.worker.done.connect(self.on_pack_done)
+        self.worker.failed.connect(self.on_pack_failed)
+        self.worker.finished.connect(self.on_worker_finished)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.cancel_button.setVisible(True)
+        self.worker.start()
+
+    def cancel_pack(self):
+        self.pending_job = None
+        if self.worker is not None:
+            self.worker.cancel()
+
+    def on_pack_progress(self, job_id, placed, total):
+        if job_id == self.job_id:
+            self.progress_bar.setMaximum(total)
+            self.progress_bar.setValue(placed)
+
+    def on_pack_failed(self, job_id, message):
+        if job_id == self.job_id:
+            QMessageBox.warning(self, "Input Error", message)
+
+    def on_worker_finished(self):
+        self.worker.deleteLater()
+        self.worker = None
+        if self.pending_job is not None:
+            self.start_pack(self.pending_job)
+        else:
+            self.progress_bar.setVisible(False)
+            self.cancel_button.setVisible(False)
 
+    def on_pack_done(self, job_id, result, plot_data):
+        if job_id != self.job_id:
+            return  # stale, inputs changed while it was packing
+        self.last_pack = result
         # compute diameters and update UI label (include heat shrink)
-        bundle_dia_no_hs = 2.0 * bundle_outer
-        if hs_thickness > 0:
-            bundle_dia_with_hs = 2.0 * (bundle_outer + hs_thickness)
-            self.result_label.setText(f"Bundle Ø = {bundle_dia_no_hs:.2f} mm  |  with HS Ø = {bundle_dia_with_hs:.2f} mm")
+        if result.heatshrink > 0:
+            self.result_label.setText(f"Bundle Ø = {result.diameter:.2f} mm  |  with HS Ø = {result.diameter_with_hs:.2f} mm")
         else:
-            self.result_label.setText(f"Bundle Ø = {bundle_dia_no_hs:.2f} mm")
-
-        # annotate on plot
-        ax.set_title(f"Estimated Bundle Section — {total_wires} wires\nInsulation: {self.selected_insulation}", fontsize=12)
-        margin = 0.12 * (bundle_outer + hs_thickness + 1.0)
-        ax.text(0, bundle_outer + hs_thickness + margin * 0.2, f"Bundle Ø = {bundle_dia_no_hs:.2f} mm", ha='center', fontsize=10, color='black')
-        if hs_thickness > 0:
-            ax.text(0, -(bundle_outer + hs_thickness + margin * 0.1), f"With heatshrink Ø = {bundle_dia_with_hs:.2f} mm", ha='center', fontsize=9, color='red')
-
-        ax.set_xlim(-bundle_outer - hs_thickness - margin, bundle_outer + hs_thickness + margin)
-        ax.set_ylim(-bundle_outer - hs_thickness - margin, bundle_outer + hs_thickness + margin)
-        ax.axis('off')
-        plt.show()
+            self.result_label.setText(f"Bundle Ø = {result.diameter:.2f} mm")
+        if result.stats is not None:
+            self.status_label.setText(result.stats.summary())
+            # gap fallback means the tangent search failed somewhere, worth noticing
+            color = "darkorange" if result.stats.fallback_runs else "gray"
+            self.status_label.setStyleSheet(f"color: {color}; font-size: 9pt;")
+        else:
+            self.status_label.setText(f"{result.total_wires} wires, served from cache")
+        self.update_thermal(result, plot_data)
+        if plot_data is not None:
+            self.draw_section(result, plot_data)
+
+    def update_thermal(self, result, plot_data=None):
+        """Solve conductor temperatures of a packed section (a few ms) and flag wires over their rating."""
+        if plot_data is not None:
+            plot_data.pop("hot", None)
+        if not self.thermal_check.isChecked() or result is None or not result.positions:
+            self.thermal_label.setText("")
+            return
+        loading = float(self.operation_dropdown2.currentText())
+        try:
+            currents = bundle_thermal.loading_currents(result, self.wire_data, loading)
+            thermal = bundle_thermal.solve(result, currents, self.wire_data)
+        except Exception as e:
+            self.thermal_label.setText(f"Thermal check failed: {e}")
+            return
+        hot = thermal.overheated
+        text = thermal.summary()
+        if not thermal.runaway and len(thermal.temperature):
+            text = f"At {loading:g} % of rated current: " + text
+        self.thermal_label.setText(text)
+        self.thermal_label.setStyleSheet("color: red;" if thermal.runaway or hot.any() else "")
+        if plot_data is not None:
+            plot_data["hot"] = hot
+
+    def refresh_thermal(self, *_):
+        # loading or check box changed: re-solve the section on screen, no repack needed
+        self.update_thermal(self.last_pack, self.last_plot_data)
+        if self.section_view is not None and self.last_plot_data is not None:
+            self.section_view.show_section(self.last_pack, self.last_plot_data)
+
+    def on_search_done(self, job_id, search):
+        if job_id != self.job_id:
+            return
+        if search.best is None:
+            self.status_label.setText(f"No packing finished within {self.worker.job['budget']:g} s")
+            return
+        gain = ""
+        if len(search.history) > 1:
+            gain = f", {search.history[0][2] - search.best.diameter:.3f} mm smaller than the first"
+        self.status_label.setText(f"Best of {search.tried} packings in {search.elapsed:.1f} s: "
+                                  f"seed {search.best.seed}{gain}")
+
+    def draw_section(self, result, plot_data):
+        # one persistent canvas, embedded next to the input panels on first use
+        if self.section_view is None:
+            from bundle_plot import BundleSectionView
+            self.section_view = BundleSectionView(self)
+            self.section_view.drawn = self.on_section_drawn
+            self.outer_layout.addWidget(self.section_view, 1)
+            self.resize(self.width() + 600, max(self.height(), 640))
+        self.plot_prep_time = plot_data.get("prep_time", 0.0)
+        self.last_plot_data = plot_data
+        self.section_view.show_section(result, plot_data)
+
+    def on_section_drawn(self, seconds):
+        text = self.status_label.text().split("  |  plot")[0]
+        self.status_label.setText(f"{text}  |  plot data {self.plot_prep_time:.3f}s, draw {seconds:.3f}s")
 
     def Calculate_Amp(self):
         try:
@@ -542,27 +811,8 @@ class HarnessCalculator(QWidget):
             NumWire = float(self.input1.text() or 0)
             PercLoad = self.operation_dropdown2.currentText()
             SafetyFactor = float(self.inputSF.text()) if self.inputSF.text() else 1.0
-
-            if PercLoad == "20":
-                CoeffLoad = 0.4566806 + 0.5809375 * math.exp(-0.06637023 * NumWire)
-            elif PercLoad == "40":
-                CoeffLoad = 0.3831531 + 0.674138 * math.exp(-0.09878993 * NumWire)
-            elif PercLoad == "60":
-                CoeffLoad = 0.3254571 + 0.7533654 * math.exp(-0.1164914 * NumWire)
-            elif PercLoad == "80":
-                CoeffLoad = 0.3005456 + 0.7738705 * math.exp(-0.1294528 * NumWire)
-            elif PercLoad == "100":
-                CoeffLoad = 0.2701568 + 0.8338723 * math.exp(-0.1363069 * NumWire)
-            else:
-                CoeffLoad = 1.0
-
-            if SafetyFactor == 0:
-                raise ValueError
-
-            # amp_limit remains per-insulation (depends on insulation)
-            amp_limit = float(self.wire_data.get(self.selected_insulation, {}).get(WireSize, {}).get("amp_limit",
-                                       self.core_table.get(WireSize, {}).get("amp_limit", 0.0)))
-            result = CoeffLoad * amp_limit / SafetyFactor
+            result = bundle_engine.current_limit(self.wire_data, self.selected_insulation, WireSize,
+                                                 NumWire, PercLoad, SafetyFactor)
             self.result_label2.setText(f"Current Limit: {result:.2f} A")
         except Exception:
             self.result_label2.setText("Error: Invalid Input")
@@ -571,23 +821,32 @@ class HarnessCalculator(QWidget):
         try:
             chosencurrent = float(self.input_curr.text() or 0)
             distance = float(self.input_lenght.text() or 0)
-            resistivity = self.material_resistance.get(self.operation_dropdown4.currentText(), 0.00000172)
-            # use core conductor area (single core table) for voltage drop calculation
             gauge = self.operation_dropdown3.currentText()
-            core_entry = self.core_table.get(gauge, {})
-            area_conductor_mm2 = float(core_entry.get("area", self.wire_data.get(self.selected_insulation, {}).get(gauge, {}).get("area", 0.0)))
-            area_mm2 = 0.75 * area_conductor_mm2
-            area_m2 = area_mm2 / 10000.0  # mm² to m²
-            if area_m2 <= 0:
-                raise ValueError
-            drop = chosencurrent * distance * resistivity / area_m2
+            drop = bundle_engine.voltage_drop(self.wire_data, self.selected_insulation, gauge, chosencurrent,
+                                              distance, self.operation_dropdown4.currentText())
             self.result_label3.setText(f"Voltage Drop: {drop:.2f} V")
         except Exception:
             self.result_label3.setText("Error: Invalid Input")
 
 
+def report_startup(imports_time, quit_after):
+    """Print the time from process start to the first shown window (and heavy modules loaded by then)."""
+    heavy = [name for name in ("matplotlib", "bundle_search", "multiprocessing.pool") if name in sys.modules]
+    print(f"startup: first window shown after {time.perf_counter() - _STARTED:.3f} s"
+          f" (imports {imports_time:.3f} s; heavy modules loaded: {', '.join(heavy) or 'none'})",
+          file=sys.stderr)
+    if quit_after:
+        QApplication.instance().quit()
+
+
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    # --startup-time: report time to first window and exit (HARNESSHELPER_STARTUP=1 reports and keeps running)
+    measure_only = "--startup-time" in sys.argv
+    imports_done = time.perf_counter() - _STARTED
+    app = QApplication([arg for arg in sys.argv if arg != "--startup-time"])
     window = HarnessCalculator()
     window.show()
+    if measure_only or os.environ.get("HARNESSHELPER_STARTUP"):
+        # a zero timer fires once the event loop has processed the show/paint events
+        QTimer.singleShot(0, lambda: report_startup(imports_done, measure_only))
     sys.exit(app.exec())
@@ -0,0 +1,308 @@
+"""Benchmarks for the bundle packer and the electrical calculators, no display needed.
+
+    python bench_bundle.py -o bench.json
+    python bench_bundle.py --sizes 10 50 200 -o after.json --compare bench.json
+
+Every case packs a fixed number of wires (one gauge, or a mix of gauges) with each
+insulation in wires.json and records wall time, peak traced memory, the number of
+candidate centres tried and the bundle diameter. Pratt mode grows roughly with the
+cube of the wire count, so it only runs up to --pratt-max wires; front-chain mode
+runs at every size. Results are written as JSON so two runs can be compared.
+The GUI's time to first window (BundleDiameterGUI.py --startup-time, offscreen
+unless a display platform is set) is recorded too, so startup regressions show up
+in the same comparison.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+import bundle_engine
+import bundle_thermal
+import gauge_sizing
+
+SIZES = (10, 50, 200, 1000, 5000)
+HOMOGENEOUS = {"22 Gauge": 1.0}
+MIXED = {"26 Gauge": 0.4, "22 Gauge": 0.3, "18 Gauge": 0.2, "14 Gauge": 0.1}
+PERC_LOADS = ("20", "40", "60", "80", "100")
+
+
+def mix_counts(shares, size):
+    """Split size wires over gauges by share, largest remainders first, so counts add up to size."""
+    raw = {wire: share * size for wire, share in shares.items()}
+    counts = {wire: int(math.floor(v)) for wire, v in raw.items()}
+    left = size - sum(counts.values())
+    for wire in sorted(raw, key=lambda w: raw[w] - counts[w], reverse=True)[:left]:
+        counts[wire] += 1
+    return counts
+
+
+def measure(func, memory=True, repeat=1):
+    """Best wall time of repeat runs of func and, if memory is set, the peak of one more run under tracemalloc."""
+    wall = float("inf")
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        value = func()
+        wall = min(wall, time.perf_counter() - start)
+    peak = None
+    if memory:
+        # tracing slows allocation down a lot, so it gets its own run
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return value, wall, peak
+
+
+def bench_packing(wire_data, sizes, modes, pratt_max, memory=True, repeat=1, log=None):
+    rows = []
+    insulations = bundle_engine.insulation_types(wire_data)
+    for mode in modes:
+        for insulation in insulations:
+            for mix_name, shares in (("homogeneous", HOMOGENEOUS), ("mixed", MIXED)):
+                for size in sizes:
+                    if mode == "pratt" and size > pratt_max:
+                        continue
+                    counts = mix_counts(shares, size)
+                    result, wall, peak = measure(
+                        lambda: bundle_engine.pack_bundle(counts, insulation, wire_data=wire_data, mode=mode),
+                        memory, repeat)
+                    row = {
+                        "name": f"pack/{mode}/{insulation}/{mix_name}/{size}",
+                        "mode": mode,
+                        "insulation": insulation,
+                        "mix": mix_name,
+                        "wires": result.total_wires,
+                        "wall_s": round(wall, 6),
+                        "peak_mb": None if peak is None else round(peak / 2 ** 20, 3),
+                        "candidates": result.stats.candidates,
+                        "phases": {k: round(v, 6) for k, v in result.stats.times.items()},
+                        "diameter": round(result.diameter, 4),
+                    }
+                    rows.append(row)
+                    if log:
+                        log(row)
+    return rows
+
+
+def bench_electrical(wire_data, calls, log=None):
+    """Throughput of current_limit and voltage_drop (Calculate_Amp / Calculate_drop) over a large batch,
+    one call per circuit and as one array pass (current_limits / voltage_drops)."""
+    rows = []
+    insulation = bundle_engine.insulation_types(wire_data)[0]
+    gauges = list(wire_data.core_gauges)
+    rng = np.random.default_rng(0)
+    gauge_idx = rng.integers(0, len(gauges), calls)
+    num_wires = rng.integers(1, 60, calls)
+    loads = rng.integers(0, len(PERC_LOADS), calls)
+    currents = rng.uniform(0.1, 20.0, calls)
+    lengths = rng.uniform(0.1, 10.0, calls)
+    batches = {
+        "current_limit": lambda k: bundle_engine.current_limit(wire_data, insulation, gauges[gauge_idx[k]],
+                                                               int(num_wires[k]), PERC_LOADS[loads[k]], 1.5),
+        "voltage_drop": lambda k: bundle_engine.voltage_drop(wire_data, insulation, gauges[gauge_idx[k]],
+                                                             float(currents[k]), float(lengths[k])),
+    }
+    gauge_names = np.array(gauges)[gauge_idx]
+    load_names = np.array(PERC_LOADS)[loads]
+    passes = {
+        "current_limits": lambda: bundle_engine.current_limits(wire_data, insulation, gauge_names, num_wires,
+                                                               load_names, 1.5),
+        "voltage_drops": lambda: bundle_engine.voltage_drops(wire_data, insulation, gauge_names, currents, lengths),
+    }
+    timed = {}
+    for name, call in batches.items():
+        start = time.perf_counter()
+        for k in range(calls):
+            call(k)
+        timed[name] = time.perf_counter() - start
+    for name, call in passes.items():
+        start = time.perf_counter()
+        call()
+        timed[name] = time.perf_counter() - start
+    for name, wall in timed.items():
+        row = {
+            "name": f"electrical/{name}",
+            "calls": calls,
+            "wall_s": round(wall, 6),
+            "calls_per_s": round(calls / wall, 1) if wall > 0 else None,
+        }
+        rows.append(row)
+        if log:
+            log(row)
+    return rows
+
+
+def bench_sizing(wire_data, sizes=(100, 500), repeat=1, log=None):
+    """Gauge sizing (size_gauges) for bundles of random circuits."""
+    rows = []
+    insulation = bundle_engine.insulation_types(wire_data)[0]
+    rng = np.random.default_rng(0)
+    for size in sizes:
+        currents = rng.uniform(0.2, 8.0, size)
+        lengths = rng.uniform(0.5, 6.0, size)
+        result, wall, _ = measure(lambda: gauge_sizing.size_gauges(currents, lengths, 0.5, insulation, wire_data),
+                                  False, repeat)
+        row = {"name": f"sizing/{insulation}/{size}", "circuits": size, "wall_s": round(wall, 6),
+               "iterations": result.iterations, "diameter": round(result.diameter, 4)}
+        rows.append(row)
+        if log:
+            log(row)
+    return rows
+
+
+def bench_thermal(wire_data, sizes=(500, 5000), repeat=1, log=None):
+    """Conductor temperature solve (bundle_thermal) of mixed bundles at 10 % of rated current."""
+    rows = []
+    insulation = bundle_engine.insulation_types(wire_data)[0]
+    for size in sizes:
+        packed = bundle_engine.pack_bundle(mix_counts(MIXED, size), insulation, wire_data=wire_data, mode="front")
+        currents = bundle_thermal.loading_currents(packed, wire_data, 10)
+        result, wall, _ = measure(lambda: bundle_thermal.solve(packed, currents, wire_data), False, repeat)
+        row = {"name": f"thermal/{insulation}/{size}", "wires": size, "wall_s": round(wall, 6),
+               "iterations": result.iterations,
+               "hot_spot": None if result.runaway else round(result.max_temperature, 2)}
+        rows.append(row)
+        if log:
+            log(row)
+    return rows
+
+
+def bench_compact(wire_data, sizes=(50000,), memory=True, log=None):
+    """Stress case of the compact (struct-of-arrays) packer: one run per size and mix, peak memory traced."""
+    rows = []
+    insulation = bundle_engine.insulation_types(wire_data)[0]
+    for mix_name, shares in (("homogeneous", HOMOGENEOUS), ("mixed", MIXED)):
+        for size in sizes:
+            counts = mix_counts(shares, size)
+            result, wall, peak = measure(
+                lambda: bundle_engine.pack_bundle(counts, insulation, wire_data=wire_data, compact=True), memory)
+            row = {
+                "name": f"compact/{insulation}/{mix_name}/{size}",
+                "mix": mix_name,
+                "wires": result.total_wires,
+                "wall_s": round(wall, 6),
+                "peak_mb": None if peak is None else round(peak / 2 ** 20, 3),
+                "positions_mb": round(result.positions.nbytes / 2 ** 20, 3),
+                "candidates": result.stats.candidates,
+                "diameter": round(result.diameter, 4),
+            }
+            rows.append(row)
+            if log:
+                log(row)
+    return rows
+
+
+def bench_startup(runs, log=None):
+    """Best time to first window of runs fresh GUI processes (empty if the GUI can't start here)."""
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    gui = Path(__file__).parent / "BundleDiameterGUI.py"
+    best = process = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, str(gui), "--startup-time"], env=env, capture_output=True, text=True,
+                              timeout=120)
+        elapsed = time.perf_counter() - start
+        found = re.search(r"first window shown after ([0-9.]+) s", proc.stderr)
+        if proc.returncode != 0 or not found:
+            print(f"startup benchmark skipped: {proc.stderr.strip().splitlines()[-1:]}", file=sys.stderr)
+            return []
+        # the reported time starts at the script's first line; process time adds interpreter start and exit
+        best = min(best, float(found.group(1)))
+        process = min(process, elapsed)
+    row = {"name": "startup/first_window", "runs": runs, "wall_s": round(best, 6), "process_s": round(process, 6)}
+    if log:
+        log(row)
+    return [row]
+
+
+def compare(current, baseline, threshold=0.10):
+    """Print time and diameter changes against a previous run; return the names that got worse."""
+    before = {row["name"]: row for row in baseline.get("results", [])}
+    worse = []
+    print(f"{'case':<44} {'time':>10} {'before':>10} {'ratio':>7} {'Ø':>9} {'before':>9}")
+    for row in current["results"]:
+        old = before.get(row["name"])
+        if old is None:
+            continue
+        ratio = row["wall_s"] / old["wall_s"] if old["wall_s"] else float("inf")
+        flag = ""
+        if ratio > 1.0 + threshold:
+            flag = " slower"
+        if "diameter" in row and row["diameter"] > old["diameter"] * (1.0 + 1e-6):
+            flag += " looser"
+        if flag:
+            worse.append(row["name"])
+        print(f"{row['name']:<44} {row['wall_s']:>10.4f} {old['wall_s']:>10.4f} {ratio:>7.2f} "
+              f"{row.get('diameter', float('nan')):>9.3f} {old.get('diameter', float('nan')):>9.3f}{flag}")
+    return worse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the bundle packer and electrical calculators")
+    parser.add_argument("--wires", default=str(bundle_engine.WIRES_JSON), help="wire table (default: wires.json)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="wires per bundle")
+    parser.add_argument("--modes", nargs="+", default=list(bundle_engine.MODES), choices=bundle_engine.MODES)
+    parser.add_argument("--pratt-max", type=int, default=200, help="largest bundle packed in pratt mode")
+    parser.add_argument("--compact-sizes", type=int, nargs="*", default=[50000],
+                        help="wires per compact-mode stress case (none to skip)")
+    parser.add_argument("--calls", type=int, default=200000, help="calls per electrical batch (0 to skip)")
+    parser.add_argument("--startup-runs", type=int, default=3, help="GUI starts timed, the best is kept (0 to skip)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the best time is kept")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run for peak memory")
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown reported as worse (default 10%%)")
+    parser.add_argument("--strict", action="store_true", help="exit with status 1 if anything got worse")
+    args = parser.parse_args(argv)
+
+    wire_data = bundle_engine.load_wire_data(args.wires)
+
+    def log(row):
+        print(json.dumps(row, ensure_ascii=False), file=sys.stderr)
+
+    results = bench_packing(wire_data, args.sizes, args.modes, args.pratt_max, not args.no_memory,
+                            args.repeat, log)
+    if args.compact_sizes:
+        results += bench_compact(wire_data, args.compact_sizes, not args.no_memory, log)
+    if args.calls > 0:
+        results += bench_electrical(wire_data, args.calls, log)
+        results += bench_sizing(wire_data, repeat=args.repeat, log=log)
+        results += bench_thermal(wire_data, repeat=args.repeat, log=log)
+    if args.startup_runs > 0:
+        results += bench_startup(args.startup_runs, log)
+    report = {
+        "meta": {
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1, ensure_ascii=False)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            worse = compare(report, json.load(f), args.threshold)
+        if worse and args.strict:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
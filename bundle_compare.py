@@ -0,0 +1,126 @@
+"""One bundle, every insulation: Ø, heat-shrink Ø, weight and derated currents side by side.
+
+compare_insulations packs the same wire counts with each insulation table of the
+wire data at once, one insulation per worker process, so the wall time is about
+that of the slowest single packing rather than the sum. Packings already in a
+PackCache are taken from it and fresh ones are added to it.
+
+Weight is an estimate per metre of bundle, conductor plus insulation plus heat
+shrink, from the section areas and the densities below (wires.json has no mass
+data); it is good for comparing insulations, not for a parts list.
+"""
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+
+import bundle_engine
+
+# g/cm³, which is also g/m per mm² of section
+CONDUCTOR_DENSITY = {"Cu": 8.96, "Ag": 10.49, "CuS": 8.96}
+INSULATION_DENSITY = {"PVC": 1.38, "TXL": 0.93, "Raychem": 1.7}
+DEFAULT_INSULATION_DENSITY = 1.4
+HEATSHRINK_DENSITY = 1.3
+
+
+def _pack_insulation(insulation):
+    wire_counts, custom, wire_data, mode = bundle_engine.worker_job()
+    try:
+        return insulation, bundle_engine.pack_bundle(wire_counts, insulation, custom=custom, wire_data=wire_data,
+                                                     mode=mode), None
+    except Exception as e:
+        return insulation, None, str(e)
+
+
+@dataclass
+class InsulationRow:
+    """One insulation's packing and ratings of the compared bundle."""
+    insulation: str
+    result: object = None  # PackResult (heat shrink applied), None if it couldn't be packed
+    weight: float = float("nan")  # g per metre of bundle
+    current_limits: dict = field(default_factory=dict)  # gauge -> derated current limit, A
+    error: str = ""
+
+    @property
+    def diameter(self):
+        return self.result.diameter if self.result is not None else float("nan")
+
+    @property
+    def diameter_with_hs(self):
+        return self.result.diameter_with_hs if self.result is not None else float("nan")
+
+    def as_dict(self):
+        row = {"insulation": self.insulation}
+        if self.result is not None:
+            row.update(diameter=round(self.diameter, 4), diameter_with_hs=round(self.diameter_with_hs, 4),
+                       weight=round(self.weight, 2),
+                       current_limits={g: round(a, 3) for g, a in self.current_limits.items()})
+        if self.error:
+            row["error"] = self.error
+        return row
+
+
+def bundle_weight(result, material="Cu"):
+    """Estimated mass of a packed bundle in g/m: conductors, insulation walls and heat shrink."""
+    if not result.positions:
+        return 0.0
+    _, _, r, core_area = bundle_engine.position_arrays(result.positions)
+    outer_area = np.pi * r ** 2
+    core_area = np.minimum(core_area, outer_area)
+    weight = CONDUCTOR_DENSITY.get(material, 8.96) * core_area.sum()
+    weight += INSULATION_DENSITY.get(result.insulation, DEFAULT_INSULATION_DENSITY) * (outer_area - core_area).sum()
+    if result.heatshrink > 0:
+        r = result.bundle_outer
+        weight += HEATSHRINK_DENSITY * np.pi * ((r + result.heatshrink) ** 2 - r ** 2)
+    return float(weight)
+
+
+def rate(result, wire_data, load="100", safety_factor=1.0, material="Cu"):
+    """InsulationRow of a PackResult: weight and the derated limit of every gauge in it."""
+    gauges = [g for g in result.wire_counts if g != "Custom"]
+    limits = bundle_engine.current_limits(wire_data, result.insulation, gauges, result.total_wires, load,
+                                          safety_factor) if gauges else []
+    return InsulationRow(result.insulation, result, bundle_weight(result, material),
+                         {g: float(a) for g, a in zip(gauges, limits)})
+
+
+def compare_insulations(wire_counts, heatshrink=0.0, custom=None, wire_data=None, mode="pratt", insulations=None,
+                        load="100", safety_factor=1.0, material="Cu", workers=None, cache=None, context=None):
+    """Pack and rate one bundle with every insulation (or those named); a list of InsulationRow in that order.
+
+    Insulations missing one of the gauges get a row with error set. cache is an
+    optional PackCache to read from and add to; context names a multiprocessing
+    start method ("spawn" from a GUI thread).
+    """
+    catalog = bundle_engine.load_wire_data() if wire_data is None else bundle_engine.as_catalog(wire_data)
+    insulations = list(insulations or bundle_engine.insulation_types(catalog))
+    heatshrink = max(0.0, float(heatshrink or 0.0))
+    packed = {}
+    if cache is not None:
+        for insulation in insulations:
+            try:
+                known = cache.lookup(wire_counts, insulation, custom=custom, mode=mode)
+            except Exception:
+                known = None
+            if known is not None:
+                packed[insulation] = (known, None)
+    todo = [insulation for insulation in insulations if insulation not in packed]
+    job = (wire_counts, custom, catalog, mode)
+
+    workers = max(1, min(len(todo), workers or os.cpu_count() or 1))
+    with bundle_engine.job_pool(job, workers, context) as pool:
+        done = map(_pack_insulation, todo) if pool is None else pool.imap_unordered(_pack_insulation, todo)
+        for insulation, result, error in done:
+            packed[insulation] = (result, error)
+            if result is not None and cache is not None:
+                cache.store(result, custom)
+
+    rows = []
+    for insulation in insulations:
+        result, error = packed[insulation]
+        if result is None:
+            rows.append(InsulationRow(insulation, error=error))
+            continue
+        result.heatshrink = heatshrink
+        rows.append(rate(result, catalog, load, safety_factor, material))
+    return rows
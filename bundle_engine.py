@@ -0,0 +1,1687 @@
+"""Headless bundle packing, diameter and electrical calculations.
+
+Nothing in here imports Qt or matplotlib, so the same code runs behind the GUI,
+in batch jobs (see harness_cli.py) and in worker processes. Wire data is a
+WireCatalog (see wire_catalog.py); the functions also accept the raw wires.json
+dict and compile it on the fly, which is fine for one-off calls.
+"""
+import logging
+import math
+import time
+from array import array
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from wire_catalog import WIRES_JSON, as_catalog, load_catalog, name_codes
+
+log = logging.getLogger(__name__)
+
+SQRT3 = math.sqrt(3.0)
+
+# packing modes understood by pack_bundle
+MODES = ("pratt", "front")
+
+# seeded variants (see pack_bundle) pick one of each: how far wires may jump the
+# largest-first order (radius scale factor) and how loosely near-equal candidates tie
+ORDER_JITTERS = (0.0, 0.1, 0.25, 0.5)
+TIE_JITTERS = (0.001, 0.01, 0.03)
+
+# the largest group of identical wires is laid out on a lattice (see lattice_layout)
+# when it has at least LATTICE_MIN wires and makes up LATTICE_SHARE of the bundle;
+# the rest of the bundle is placed around it by the selected mode's search, and that
+# is kept only if it beats searching every wire (see pack_entries)
+LATTICE_MIN = 20
+LATTICE_SHARE = 0.5
+
+# bundles of at least COMPACT_MIN wires are packed in compact mode (see pack_entries):
+# struct-of-arrays positions, an array-backed grid and a vectorized front chain
+COMPACT_MIN = 10000
+
+# bumped whenever the same wires pack differently, so stored layouts get dropped
+PACKER_VERSION = 5
+
+
+class PackCancelled(Exception):
+    """Raised from a progress callback to abandon a packing."""
+
+
+# material resistivity
+MATERIAL_RESISTANCE = {"Cu": 0.00000172, "Ag": 0.00000159, "CuS": 0.00000159}
+
+
+def load_wire_data(path=None):
+    """Load the wire table (core table plus one table per insulation type) as a WireCatalog."""
+    return load_catalog(path)
+
+
+def insulation_types(wire_data):
+    return list(as_catalog(wire_data).insulations)
+
+
+class SpatialGrid:
+    """Uniform grid of placed circles so overlap tests only visit nearby cells."""
+
+    def __init__(self, cell_size):
+        self.cell_size = max(float(cell_size), 1e-6)
+        self.cells = {}
+        self.max_r = 0.0  # largest radius stored, bounds the neighbourhood to scan
+        self.checks = 0  # overlaps_any calls, for PackStats
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def copy(self):
+        grid = SpatialGrid(self.cell_size)
+        grid.cells = {cell: list(circles) for cell, circles in self.cells.items()}
+        grid.max_r = self.max_r
+        return grid
+
+    def insert(self, x, y, r):
+        self.cells.setdefault(self._cell(x, y), []).append((x, y, r))
+        if r > self.max_r:
+            self.max_r = r
+
+    def overlaps_any(self, x, y, r):
+        # any stored circle overlapping (x, y, r) has its centre within r + max_r
+        self.checks += 1
+        reach = r + self.max_r
+        cx0, cy0 = self._cell(x - reach, y - reach)
+        cx1, cy1 = self._cell(x + reach, y + reach)
+        cells = self.cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                for (px, py, pr) in cells.get((cx, cy), ()):
+                    if (x - px) ** 2 + (y - py) ** 2 < (r + pr - 1e-8) ** 2:
+                        return True
+        return False
+
+
+class CellGrid:
+    """SpatialGrid without per-wire objects, for compact packing.
+
+    Circles are referred to by index into the x, y, r arrays of source (a Layout),
+    in insertion order. A dense table holds the first circle of every cell and an
+    int array links each circle to the next one in its cell. The table covers
+    +-extent mm around the origin and is doubled (and refilled) when a circle lands
+    outside it.
+    """
+
+    def __init__(self, cell_size, source, extent):
+        self.cell_size = max(float(cell_size), 1e-6)
+        self.source = source
+        self.max_r = 0.0
+        self.checks = 0
+        self.count = 0
+        self.next = array("i")
+        self._table(extent)
+
+    def _table(self, extent):
+        self.half = int(math.ceil(max(extent, self.cell_size) / self.cell_size)) + 1
+        self.width = 2 * self.half + 1
+        self.head = array("i", [-1]) * (self.width * self.width)
+        self.next = array("i", [-1]) * self.count
+        x, y = self.source.x, self.source.y
+        for k in range(self.count):
+            self._link(k, float(x[k]), float(y[k]))
+
+    def copy(self, source):
+        """The same grid over source, a copy of the Layout this one indexes."""
+        grid = CellGrid.__new__(CellGrid)
+        grid.__dict__.update(self.__dict__)
+        grid.source = source
+        grid.checks = 0
+        grid.head = array("i", self.head)
+        grid.next = array("i", self.next)
+        return grid
+
+    def _link(self, k, x, y):
+        cx = math.floor(x / self.cell_size) + self.half
+        cy = math.floor(y / self.cell_size) + self.half
+        cell = cx * self.width + cy
+        self.next[k] = self.head[cell]
+        self.head[cell] = k
+
+    def insert(self, x, y, r):
+        k = self.count
+        self.count += 1
+        self.next.append(-1)
+        if r > self.max_r:
+            self.max_r = r
+        limit = (self.half - 1) * self.cell_size
+        if abs(x) + r > limit or abs(y) + r > limit:
+            self._table(2.0 * max(abs(x), abs(y), limit) + r)
+        else:
+            self._link(k, x, y)
+
+    def overlaps_any(self, x, y, r):
+        self.checks += 1
+        reach = r + self.max_r
+        half, width, size = self.half, self.width, self.cell_size
+        cx0 = max(0, math.floor((x - reach) / size) + half)
+        cx1 = min(width - 1, math.floor((x + reach) / size) + half)
+        cy0 = max(0, math.floor((y - reach) / size) + half)
+        cy1 = min(width - 1, math.floor((y + reach) / size) + half)
+        head, nxt = self.head, self.next
+        # memoryviews index to plain floats, much faster than NumPy scalars
+        sx, sy, sr = memoryview(self.source.x), memoryview(self.source.y), memoryview(self.source.r)
+        for cx in range(cx0, cx1 + 1):
+            base = cx * width
+            for cy in range(cy0, cy1 + 1):
+                k = head[base + cy]
+                while k >= 0:
+                    if (x - sx[k]) ** 2 + (y - sy[k]) ** 2 < (r + sr[k] - 1e-8) ** 2:
+                        return True
+                    k = nxt[k]
+        return False
+
+
+def tangent_point(x1, y1, R1, x2, y2, R2):
+    # centre at distance R1 from c1 and R2 from c2, on the right-hand side of c1 -> c2
+    dx = x2 - x1
+    dy = y2 - y1
+    d2 = dx * dx + dy * dy
+    if d2 == 0:
+        return None
+    d = math.sqrt(d2)
+    if d > (R1 + R2) + 1e-8 or d < abs(R1 - R2) - 1e-8:
+        return None
+    a = (R1 * R1 - R2 * R2 + d2) / (2 * d)
+    h = math.sqrt(max(0.0, R1 * R1 - a * a))
+    return (x1 + (a * dx + h * dy) / d, y1 + (a * dy - h * dx) / d)
+
+
+def circle_intersections_batch(x1, y1, R1, x2, y2, R2):
+    """Intersection points of whole arrays of circle pairs (c1, R1) / (c2, R2).
+
+    Returns (xs, ys) with the points of each pair in pair order, first point then
+    second; touching pairs give a single point and disjoint or concentric pairs none.
+    """
+    dx = x2 - x1
+    dy = y2 - y1
+    d2 = dx * dx + dy * dy
+    ok = d2 > 0
+    d = np.sqrt(d2)
+    # no solutions
+    ok &= ~((d > (R1 + R2) + 1e-8) | (d < np.abs(R1 - R2) - 1e-8))
+    x1, y1, R1, R2, dx, dy, d = (v[ok] for v in (x1, y1, R1, R2, dx, dy, d))
+    a = (R1 * R1 - R2 * R2 + d * d) / (2 * d)
+    h2 = np.maximum(0.0, R1 * R1 - a * a)
+    xm = x1 + a * dx / d
+    ym = y1 + a * dy / d
+    h = np.sqrt(h2)
+    rx = -dy * (h / d)
+    ry = dx * (h / d)
+    xs = np.stack((xm + rx, xm - rx), axis=1)
+    ys = np.stack((ym + ry, ym - ry), axis=1)
+    # tangent pairs only have the midpoint
+    keep = np.ones(xs.shape, dtype=bool)
+    keep[:, 1] = h2 != 0
+    return xs[keep], ys[keep]
+
+
+GAP_RAYS = 72  # directions searched by nearest_gap
+
+
+def nearest_gap(px, py, pr, r, rays=GAP_RAYS, start=0.0):
+    """Nearest free centre for a circle of radius r among placed circles (px, py, pr arrays).
+
+    Along each of rays directions from the origin, every placed circle blocks one
+    interval of distances; sweeping the sorted intervals gives the first free
+    distance, either a hole inside the bundle or just past its rim. The nearest of
+    those over all rays is returned as (x, y). Work is rays x placed circles, and the
+    spot is always free, so nothing ever needs to be forced outside the bundle.
+    start counts distances below it as covered: with only the outer shell of a
+    bundle passed in, start = inner edge of the shell + r keeps the spot off the
+    circles left out.
+    """
+    thetas = np.linspace(0, 2 * math.pi, rays, endpoint=False)
+    ux = np.cos(thetas)[:, None]
+    uy = np.sin(thetas)[:, None]
+    # |t*u - c|^2 < R^2  <=>  t in (b - sqrt(disc), b + sqrt(disc))
+    b = ux * px + uy * py
+    disc = b * b - (px * px + py * py - (pr + r) ** 2)
+    hit = disc > 0
+    root = np.sqrt(np.where(hit, disc, 0.0))
+    lo = np.where(hit, b - root, np.inf)
+    hi = np.where(hit, b + root, -np.inf)
+    order = np.argsort(lo, axis=1)
+    lo = np.take_along_axis(lo, order, axis=1)
+    hi = np.take_along_axis(hi, order, axis=1)
+    # furthest point covered by the intervals before each one; the first interval that
+    # starts beyond it leaves a gap there (misses sort last with lo = inf, so a ray
+    # always ends in a gap past the rim)
+    covered = np.maximum.accumulate(np.concatenate((np.full((rays, 1), float(start)), hi), axis=1), axis=1)
+    gap = np.concatenate((lo, np.full((rays, 1), np.inf)), axis=1) > covered
+    first = gap.argmax(axis=1)
+    t = covered[np.arange(rays), first]
+    k = int(t.argmin())
+    return float(t[k] * ux[k, 0]), float(t[k] * uy[k, 0])
+
+
+def layout_front(x, y, r):
+    """Indices of the circles of a packed layout seen from outside, counter-clockwise.
+
+    Rays from the origin, about four per smallest circle along the rim, each pick
+    the circle they leave last; that outline is the front a front-chain packing
+    carries on from (see place_wires with initial wires).
+    """
+    reach = np.hypot(x, y) + r
+    outer = float(reach.max())
+    # anything that can show on the rim of a hexagon-ish layout: the inradius of a hexagon is 0.87 R
+    band = np.flatnonzero(reach >= 0.8 * outer - 2.0 * float(r.max()))
+    rays = max(12, int(4.0 * math.pi * outer / max(float(r[band].min()), 1e-6)))
+    thetas = np.linspace(0, 2 * math.pi, rays, endpoint=False)
+    bx, by, br = x[band], y[band], r[band]
+    seen = np.empty(rays, dtype=np.intp)
+    for s0 in range(0, rays, 256):
+        ux = np.cos(thetas[s0:s0 + 256])[:, None]
+        uy = np.sin(thetas[s0:s0 + 256])[:, None]
+        b = ux * bx + uy * by
+        disc = b * b - (bx * bx + by * by - br * br)
+        exit_ = np.where(disc >= 0, b + np.sqrt(np.maximum(disc, 0.0)), -np.inf)
+        seen[s0:s0 + 256] = band[exit_.argmax(axis=1)]
+    # one entry per run of rays on the same circle, wrapping around
+    keep = seen != np.roll(seen, 1)
+    front = seen[keep] if keep.any() else seen[:1]
+    return front if len(front) < 2 or front[0] != front[-1] else front[:-1]
+
+
+class FrontChain:
+    """Front-chain circle packer (after Wang et al.): only the outer front of the bundle
+    is kept, as a counter-clockwise linked list, and each new circle is placed tangent
+    to two neighbouring front circles."""
+
+    tries = 8  # nearest front spots tried before cutting the front back
+
+    def __init__(self, rng=None, jitter=0.0):
+        # with an rng, spot distances are scaled by up to 1 + jitter to vary tie-breaks
+        self.rng = rng
+        self.jitter = jitter if rng is not None else 0.0
+        self.x = []
+        self.y = []
+        self.r = []
+        self.nxt = {}
+        self.prv = {}
+        self.head = None  # any circle currently on the front
+        self.tested = 0  # tangent spots computed and overlap tests done, for PackStats
+        self.checks = 0
+
+    def seed(self, x, y, r):
+        """Start from circles already packed (x, y, r arrays, at least three): their outline is the front."""
+        self.x, self.y, self.r = x.tolist(), y.tolist(), r.tolist()
+        ring = layout_front(x, y, r).tolist()
+        self.nxt = dict(zip(ring, ring[1:] + ring[:1]))
+        self.prv = {n: m for m, n in self.nxt.items()}
+        self.head = ring[0]
+
+    def _overlaps(self, k, x, y, r):
+        self.checks += 1
+        return (x - self.x[k]) ** 2 + (y - self.y[k]) ** 2 < (r + self.r[k] - 1e-8) ** 2
+
+    def candidate(self, r):
+        """Return (x, y, m, n) for a circle of radius r, or None if the front can't fit it."""
+        count = len(self.x)
+        if count == 0:
+            return (0.0, 0.0, None, None)
+        if count == 1:
+            return (self.x[0] + self.r[0] + r, self.y[0], 0, None)
+        if count == 2:
+            # left of 0 -> 1, so that the first three circles run counter-clockwise
+            pt = tangent_point(self.x[1], self.y[1], self.r[1] + r, self.x[0], self.y[0], self.r[0] + r)
+            return None if pt is None else (pt[0], pt[1], 0, 1)
+
+        # tangent spot for every neighbouring pair on the front, nearest the origin first
+        spots = []
+        m = self.head
+        while True:
+            n = self.nxt[m]
+            pt = tangent_point(self.x[m], self.y[m], self.r[m] + r, self.x[n], self.y[n], self.r[n] + r)
+            self.tested += 1
+            if pt is not None:
+                dist = math.hypot(pt[0], pt[1])
+                if self.jitter:
+                    dist *= 1.0 + self.jitter * self.rng.random()
+                spots.append((dist, pt[0], pt[1], m, n))
+            m = n
+            if m == self.head:
+                break
+        spots.sort()
+        for _, x, y, m, n in spots[:self.tries]:
+            if self._clash(x, y, r, m, n) is None:
+                return (x, y, m, n)
+
+        # none of the nearest spots is free: Wang's rule, cut the front back from the
+        # nearest spot until the new circle fits
+        if not spots:
+            return None
+        _, x, y, m, n = spots[0]
+        for _ in range(count):
+            clash = self._clash(x, y, r, m, n)
+            if clash is None:
+                return (x, y, m, n)
+            if clash[0] == "n":
+                n = clash[1]
+            else:
+                m = clash[1]
+            if m == n:
+                return None
+            pt = tangent_point(self.x[m], self.y[m], self.r[m] + r, self.x[n], self.y[n], self.r[n] + r)
+            self.tested += 1
+            if pt is None:
+                return None
+            x, y = pt
+        return None
+
+    def _clash(self, x, y, r, m, n):
+        # walk the front both ways from the m-n gap, the nearest clash decides which
+        # side gets cut off the front
+        others = []
+        j = self.nxt[n]
+        while j != m:
+            others.append(j)
+            j = self.nxt[j]
+        last = len(others) - 1
+        for t in range(len(others)):
+            if t > last - t:
+                break
+            if self._overlaps(others[t], x, y, r):
+                return ("n", others[t])
+            if self._overlaps(others[last - t], x, y, r):
+                return ("m", others[last - t])
+        return None
+
+    def add(self, x, y, r, m, n):
+        k = len(self.x)
+        self.x.append(x)
+        self.y.append(y)
+        self.r.append(r)
+        if k < 2:
+            return
+        if k == 2:
+            self.nxt = {0: 1, 1: 2, 2: 0}
+            self.prv = {1: 0, 2: 1, 0: 2}
+            self.head = 2
+            return
+        # circles strictly between m and n drop off the front
+        j = self.nxt[m]
+        while j != n:
+            nj = self.nxt[j]
+            del self.nxt[j]
+            del self.prv[j]
+            j = nj
+        self.nxt[m] = k
+        self.prv[k] = m
+        self.nxt[k] = n
+        self.prv[n] = k
+        self.head = k
+
+    def front(self):
+        """Indices of the circles currently on the front."""
+        if self.head is None:
+            return list(range(len(self.x)))
+        out = [self.head]
+        k = self.nxt[self.head]
+        while k != self.head:
+            out.append(k)
+            k = self.nxt[k]
+        return out
+
+
+class FrontArray:
+    """FrontChain for compact packing: the same placement rules over the arrays of a Layout.
+
+    The front is an index array in counter-clockwise order instead of linked dicts,
+    all tangent spots along it are computed in one batch into buffers that are
+    reused from wire to wire, and clash tests run against the whole front at once.
+    """
+
+    tries = FrontChain.tries
+
+    def __init__(self, layout, rng=None, jitter=0.0):
+        self.layout = layout
+        self.rng = rng
+        self.jitter = jitter if rng is not None else 0.0
+        self.order = np.empty(0, dtype=np.intp)  # circles on the front, counter-clockwise
+        self.tested = 0
+        self.checks = 0
+        self._buffers = {}
+
+    def _buffer(self, name, size):
+        buf = self._buffers.get(name)
+        if buf is None or len(buf) < size:
+            buf = np.empty(max(64, 2 * size))
+            self._buffers[name] = buf
+        return buf[:size]
+
+    def _spots(self, r):
+        """Tangent spot (x, y) right of every front pair (order[t], order[t + 1]), NaN where there is none."""
+        lay = self.layout
+        m = self.order
+        n = np.concatenate((m[1:], m[:1]))
+        size = len(m)
+        x1, y1 = lay.x[m], lay.y[m]
+        dx = np.subtract(lay.x[n], x1, out=self._buffer("dx", size))
+        dy = np.subtract(lay.y[n], y1, out=self._buffer("dy", size))
+        r1 = np.add(lay.r[m], r, out=self._buffer("r1", size))
+        r2 = np.add(lay.r[n], r, out=self._buffer("r2", size))
+        d2 = np.add(dx * dx, dy * dy, out=self._buffer("d2", size))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d = np.sqrt(d2, out=self._buffer("d", size))
+            a = np.divide(r1 * r1 - r2 * r2 + d2, 2.0 * d, out=self._buffer("a", size))
+            h = np.sqrt(np.maximum(r1 * r1 - a * a, 0.0), out=self._buffer("h", size))
+            sx = x1 + (a * dx + h * dy) / d
+            sy = y1 + (a * dy - h * dx) / d
+        bad = (d2 == 0) | (d > r1 + r2 + 1e-8) | (d < np.abs(r1 - r2) - 1e-8)
+        sx[bad] = np.nan
+        sy[bad] = np.nan
+        self.tested += size
+        return sx, sy
+
+    def _tangent(self, m, n, r):
+        lay = self.layout
+        return tangent_point(float(lay.x[m]), float(lay.y[m]), float(lay.r[m]) + r,
+                             float(lay.x[n]), float(lay.y[n]), float(lay.r[n]) + r)
+
+    def _clash(self, x, y, r, mp, np_):
+        # front positions strictly between n and m (counter-clockwise from n), the
+        # nearest clash to either end decides the side cut off, as FrontChain._clash
+        size = len(self.order)
+        between = (np.arange(np_ + 1, np_ + 1 + (mp - np_ - 1) % size) % size)
+        if not len(between):
+            return None
+        others = self.order[between]
+        lay = self.layout
+        self.checks += len(others)
+        hit = np.flatnonzero((x - lay.x[others]) ** 2 + (y - lay.y[others]) ** 2 < (r + lay.r[others] - 1e-8) ** 2)
+        if not len(hit):
+            return None
+        last = len(others) - 1
+        if hit[0] <= last - hit[-1]:
+            return ("n", int(between[hit[0]]))
+        return ("m", int(between[hit[-1]]))
+
+    def candidate(self, r):
+        """(x, y, m, n) for a circle of radius r, m and n being front positions, or None."""
+        lay = self.layout
+        count = lay.count
+        if count == 0:
+            return (0.0, 0.0, None, None)
+        if count == 1:
+            return (float(lay.x[0] + lay.r[0]) + r, float(lay.y[0]), 0, None)
+        if count == 2:
+            pt = self._tangent(1, 0, r)
+            return None if pt is None else (pt[0], pt[1], 0, 1)
+
+        size = len(self.order)
+        sx, sy = self._spots(r)
+        dist = np.hypot(sx, sy)
+        if self.jitter:
+            dist *= 1.0 + self.jitter * self.rng.random(size)
+        valid = np.flatnonzero(~np.isnan(dist))
+        if not len(valid):
+            return None
+        if len(valid) > self.tries:
+            valid = valid[np.argpartition(dist[valid], self.tries - 1)[:self.tries]]
+        nearest = valid[np.argsort(dist[valid], kind="stable")]
+        # clash test of all tried spots against the whole front in one broadcast; a
+        # spot may touch its own pair (positions t and t + 1)
+        lay = self.layout
+        fx, fy, fr = lay.x[self.order], lay.y[self.order], lay.r[self.order]
+        cx, cy = sx[nearest], sy[nearest]
+        hit = (cx[:, None] - fx) ** 2 + (cy[:, None] - fy) ** 2 < (r + fr - 1e-8) ** 2
+        rows = np.arange(len(nearest))
+        hit[rows, nearest] = False
+        hit[rows, (nearest + 1) % size] = False
+        self.checks += hit.size
+        free = np.flatnonzero(~hit.any(axis=1))
+        if len(free):
+            t = int(nearest[free[0]])
+            return (float(sx[t]), float(sy[t]), t, (t + 1) % size)
+
+        # none of the nearest spots is free: cut the front back from the nearest one
+        mp = int(nearest[0])
+        np_ = (mp + 1) % size
+        x, y = float(sx[mp]), float(sy[mp])
+        for _ in range(count):
+            clash = self._clash(x, y, r, mp, np_)
+            if clash is None:
+                return (x, y, mp, np_)
+            if clash[0] == "n":
+                np_ = clash[1]
+            else:
+                mp = clash[1]
+            if mp == np_:
+                return None
+            pt = self._tangent(self.order[mp], self.order[np_], r)
+            self.tested += 1
+            if pt is None:
+                return None
+            x, y = pt
+        return None
+
+    def add(self, k, mp, np_):
+        """Put circle k (already added to the layout) on the front between positions mp and np_."""
+        if k < 2:
+            return
+        if k == 2:
+            self.order = np.arange(3, dtype=np.intp)
+            return
+        # circles strictly between m and n drop off the front: keep n ... m, then k
+        order = self.order
+        if np_ <= mp:
+            self.order = np.append(order[np_:mp + 1], k)
+        else:
+            self.order = np.concatenate((order[np_:], order[:mp + 1], [k]))
+
+    def front(self):
+        return self.order if self.layout.count >= 3 else np.arange(self.layout.count)
+
+
+class PackStats:
+    """Counters and per-phase timings (seconds) collected while packing one bundle."""
+
+    PHASES = ("lattice", "candidates", "sort", "overlap", "fallback")  # sort includes dedup
+
+    def __init__(self):
+        self.wires = 0
+        self.candidates = 0  # candidate centres generated (tangent spots and probes)
+        self.dedup_hits = 0  # candidates dropped as duplicates of a nearer one
+        self.overlap_checks = 0  # candidate centres tested against placed wires
+        self.fallback_runs = 0  # wires no candidate fitted, placed by nearest_gap
+        self.fallback_checks = 0  # ray x circle interval tests done by nearest_gap
+        self.lattice_wires = 0  # wires placed by lattice_layout, no candidate search
+        self.times = dict.fromkeys(self.PHASES, 0.0)
+        self.total_time = 0.0
+
+    @property
+    def candidates_per_wire(self):
+        return self.candidates / self.wires if self.wires else 0.0
+
+    def as_dict(self):
+        data = dict(vars(self))
+        data["times"] = dict(self.times)
+        data["candidates_per_wire"] = self.candidates_per_wire
+        return data
+
+    def summary(self):
+        """One line for a log or status bar."""
+        phases = " ".join(f"{name} {self.times[name]:.3f}s" for name in self.PHASES if self.times[name])
+        line = (f"{self.wires} wires in {self.total_time:.3f}s ({phases}); "
+                f"{self.candidates_per_wire:.0f} candidates/wire, {self.dedup_hits} dedup hits, "
+                f"{self.overlap_checks} overlap checks")
+        if self.lattice_wires:
+            line += f", {self.lattice_wires} on a lattice"
+        if self.fallback_runs:
+            line += f", gap fallback for {self.fallback_runs} wires ({self.fallback_checks} interval tests)"
+        return line
+
+
+def profile_call(path, func, *args, **kwargs):
+    """Run func(*args, **kwargs) under cProfile, dump the profile to path and return func's result.
+
+    The dump can be read with pstats (python -m pstats path) or snakeviz.
+    """
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        profiler.dump_stats(str(path))
+
+
+_worker_job = None  # per worker process, set by job_pool
+
+
+def _set_worker_job(job):
+    global _worker_job
+    _worker_job = job
+
+
+def worker_job():
+    """The job of the job_pool this process works for."""
+    return _worker_job
+
+
+@contextmanager
+def job_pool(job, workers, context=None, inline=True):
+    """Process pool whose workers all read job through worker_job(); terminated on exit.
+
+    With one worker and inline set, no pool is started: the job is set in this process
+    and None is yielded, for the caller to run its tasks in place. context names a
+    multiprocessing start method.
+    """
+    if workers <= 1 and inline:
+        _set_worker_job(job)
+        yield None
+        return
+    import multiprocessing
+    pool = multiprocessing.get_context(context).Pool(workers, initializer=_set_worker_job, initargs=(job,))
+    try:
+        yield pool
+    finally:
+        # don't wait for tasks still in flight, the callers have what they need
+        pool.terminate()
+        pool.join()
+
+
+@dataclass
+class PackResult:
+    """Placed wires and resulting diameters of one bundle section."""
+    positions: list  # (x, y, outer_r, core_area, label) per wire
+    bundle_outer: float  # radius of the enclosing circle, without heat shrink
+    heatshrink: float = 0.0
+    insulation: str = ""
+    mode: str = "pratt"
+    wire_counts: dict = field(default_factory=dict)
+    # grid and centre arrays kept for incremental repacking, handed on to the next result
+    layout: object = field(default=None, repr=False, compare=False)
+    stats: object = field(default=None, repr=False, compare=False)  # PackStats of a fresh packing
+    seed: object = 0  # pack_bundle seed that reproduces this layout, None after incremental repacking
+
+    @property
+    def total_wires(self):
+        return len(self.positions)
+
+    @property
+    def diameter(self):
+        return 2.0 * self.bundle_outer
+
+    @property
+    def diameter_with_hs(self):
+        return 2.0 * (self.bundle_outer + self.heatshrink)
+
+
+class WireArrays:
+    """Wire positions as a struct of arrays, for very large bundles (see pack_entries).
+
+    x, y, r and core_area are float arrays and each wire's label is an integer id
+    into types, so a wire type's label is stored once instead of once per wire. It
+    reads like the usual positions list: len(), indexing, slicing (a copy) and
+    iteration give (x, y, outer_r, core_area, label) tuples, built on demand.
+    """
+
+    def __init__(self, capacity=0):
+        capacity = max(16, int(capacity))
+        self.count = 0
+        self._x = np.empty(capacity)
+        self._y = np.empty(capacity)
+        self._r = np.empty(capacity)
+        self._core_area = np.empty(capacity)
+        self._type_id = np.empty(capacity, dtype=np.int32)
+        self.types = []  # label per type id
+        self._ids = {}
+
+    @classmethod
+    def from_arrays(cls, x, y, r, core_area, labels):
+        """WireArrays of equal-length geometry arrays and a label per wire."""
+        wires = cls(len(x))
+        ids = np.array([wires.intern(label) for label in labels], dtype=np.int32).reshape(-1)
+        wires.extend(x, y, r, core_area, ids)
+        return wires
+
+    def intern(self, label):
+        """Type id of a label, adding it to types on first use."""
+        k = self._ids.get(label)
+        if k is None:
+            k = self._ids[label] = len(self.types)
+            self.types.append(label)
+        return k
+
+    def _reserve(self, extra):
+        need = self.count + extra
+        if need <= len(self._x):
+            return
+        size = max(need, 2 * len(self._x))
+        for name in ("_x", "_y", "_r", "_core_area", "_type_id"):
+            old = getattr(self, name)
+            grown = np.empty(size, dtype=old.dtype)
+            grown[:self.count] = old[:self.count]
+            setattr(self, name, grown)
+
+    def append(self, pos):
+        x, y, r, core_area, label = pos
+        self._reserve(1)
+        k = self.count
+        self._x[k], self._y[k], self._r[k], self._core_area[k] = x, y, r, core_area
+        self._type_id[k] = self.intern(label)
+        self.count += 1
+
+    def extend(self, x, y, r, core_area, type_id):
+        """Append whole arrays of wires; type_id are ids from intern()."""
+        n = len(x)
+        self._reserve(n)
+        end = self.count + n
+        self._x[self.count:end] = x
+        self._y[self.count:end] = y
+        self._r[self.count:end] = r
+        self._core_area[self.count:end] = core_area
+        self._type_id[self.count:end] = type_id
+        self.count = end
+
+    def trim(self):
+        """Drop spare capacity."""
+        for name in ("_x", "_y", "_r", "_core_area", "_type_id"):
+            setattr(self, name, getattr(self, name)[:self.count].copy())
+        return self
+
+    @property
+    def x(self):
+        return self._x[:self.count]
+
+    @property
+    def y(self):
+        return self._y[:self.count]
+
+    @property
+    def r(self):
+        return self._r[:self.count]
+
+    @property
+    def core_area(self):
+        return self._core_area[:self.count]
+
+    @property
+    def type_id(self):
+        return self._type_id[:self.count]
+
+    @property
+    def labels(self):
+        return [self.types[k] for k in self.type_id.tolist()]
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in ("_x", "_y", "_r", "_core_area", "_type_id"))
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            part = WireArrays(0)
+            part.types = list(self.types)
+            part._ids = dict(self._ids)
+            part.extend(self.x[k], self.y[k], self.r[k], self.core_area[k], self.type_id[k])
+            return part
+        if k < 0:
+            k += self.count
+        if not 0 <= k < self.count:
+            raise IndexError("wire index out of range")
+        return (float(self._x[k]), float(self._y[k]), float(self._r[k]), float(self._core_area[k]),
+                self.types[self._type_id[k]])
+
+    def __iter__(self):
+        # in blocks, so iterating a huge section never materializes it all at once
+        for s in range(0, self.count, 4096):
+            e = min(s + 4096, self.count)
+            types = self.types
+            yield from zip(self._x[s:e].tolist(), self._y[s:e].tolist(), self._r[s:e].tolist(),
+                           self._core_area[s:e].tolist(), [types[k] for k in self._type_id[s:e].tolist()])
+
+
+def position_arrays(positions):
+    """(x, y, outer_r, core_area) float arrays of a positions list or WireArrays."""
+    if isinstance(positions, WireArrays):
+        return positions.x, positions.y, positions.r, positions.core_area
+    geom = np.array([pos[:4] for pos in positions], dtype=float).reshape(-1, 4)
+    return geom[:, 0], geom[:, 1], geom[:, 2], geom[:, 3]
+
+
+def position_labels(positions):
+    """Label per wire of a positions list or WireArrays."""
+    if isinstance(positions, WireArrays):
+        return positions.labels
+    return [pos[4] for pos in positions]
+
+
+def wire_entries(wire_data, insulation, wire_counts, custom=None):
+    """Expand counts into (outer_radius, core_area, label) tuples, one per wire.
+
+    wire_counts maps gauge name to count; custom is an optional (count, area_mm2)
+    pair for uninsulated wires of a given core area.
+    """
+    catalog = as_catalog(wire_data)
+    i = catalog.insulation_id(insulation)
+    entries = []
+    for wire, count in wire_counts.items():
+        count = int(count)
+        if count < 0:
+            raise ValueError(f"Invalid input for {wire}")
+        if count == 0:
+            continue
+        # outer radius from the insulation table, core area from the core table (see WireCatalog)
+        j = catalog.gauge_id(wire)
+        if not catalog.has[i, j]:
+            raise ValueError(f"No {insulation} data for {wire}")
+        entries.extend([(float(catalog.radius[i, j]), float(catalog.pack_area[i, j]), wire)] * count)
+
+    # custom wires: assume provided area is core area; outer radius = core radius (no insulation)
+    if custom:
+        cc, ca = int(custom[0]), float(custom[1])
+        if cc < 0 or ca <= 0:
+            raise ValueError("Invalid custom wire values")
+        core_radius = math.sqrt(ca / math.pi)
+        entries.extend([(core_radius, ca, "Custom")] * cc)
+    return entries
+
+
+def place_wires(radii, core_areas, labels, cell_size, mode="pratt", progress=None, stats=None, rng=None,
+                jitter=0.0, initial=None):
+    """Place circles of the given radii (largest first) and return the positions list.
+
+    progress, if given, is called as progress(placed, total) after every wire;
+    raising PackCancelled from it stops the packing. Counters are added to stats
+    (a PackStats) if given. With an rng, candidate distances are scaled by random
+    factors up to 1 + jitter, so near-equal candidates are picked in varying order.
+    initial is a positions list already in place (a lattice, see pack_entries);
+    the new wires are searched around it and appended to a copy of it.
+    """
+    if rng is None:
+        jitter = 0.0
+    if mode not in MODES:
+        raise ValueError(f"Unknown packing mode: {mode}")
+    if stats is None:
+        stats = PackStats()
+    # Pratt-style placement (or front-chain, see below):
+    positions = list(initial or [])  # list of (x,y,outer_r, core_area, label)
+    base = len(positions)
+    # placed circles are also kept in a uniform grid; cells are one largest
+    # insulation diameter wide so an overlap query only touches neighbours
+    grid = SpatialGrid(cell_size)
+    # placed centres and radii as arrays for batched candidate evaluation
+    placed_x = np.empty(base + len(radii))
+    placed_y = np.empty(base + len(radii))
+    placed_r = np.empty(base + len(radii))
+    for k, (x, y, r, *_) in enumerate(positions):
+        placed_x[k], placed_y[k], placed_r[k] = x, y, r
+        grid.insert(x, y, r)
+    # front-chain mode only builds candidates from neighbouring circles on the outer front
+    front = None
+    if mode == "front":
+        front = FrontChain(rng, jitter)
+        if base:
+            front.seed(placed_x[:base], placed_y[:base], placed_r[:base])
+    if not base:
+        # place first at origin
+        positions.append((0.0, 0.0, radii[0], core_areas[0], labels[0]))
+        grid.insert(0.0, 0.0, radii[0])
+        placed_x[0], placed_y[0], placed_r[0] = 0.0, 0.0, radii[0]
+        if front is not None:
+            front.add(0.0, 0.0, radii[0], None, None)
+
+    def place(x, y, r, core_area, label):
+        k = len(positions)
+        placed_x[k], placed_y[k], placed_r[k] = x, y, r
+        positions.append((x, y, r, core_area, label))
+        grid.insert(x, y, r)
+
+    # same angles as the scalar probes, evaluated once
+    probe_thetas = np.linspace(0, 2 * math.pi, 36, endpoint=False)
+    probe_cos = np.array([math.cos(t) for t in probe_thetas])
+    probe_sin = np.array([math.sin(t) for t in probe_thetas])
+
+    times = stats.times
+    clock = time.perf_counter
+    started = clock()
+
+    # place remaining with Pratt-like candidate generation (tangent to pairs + angle probes)
+    for idx in range(0 if base else 1, len(radii)):
+        if progress is not None:
+            progress(idx, len(radii))
+        r_new = radii[idx]
+        core_area_new = core_areas[idx]
+        label_new = labels[idx]
+        placed = False
+
+        if front is not None:
+            t0 = clock()
+            cand = front.candidate(r_new)
+            t1 = clock()
+            fits = cand is not None and not grid.overlaps_any(cand[0], cand[1], r_new)
+            times["candidates"] += t1 - t0
+            times["overlap"] += clock() - t1
+            if fits:
+                place(cand[0], cand[1], r_new, core_area_new, label_new)
+                front.add(cand[0], cand[1], r_new, cand[2], cand[3])
+                placed = True
+            else:
+                # chain can't take it: probe around front circles only, interior
+                # circles are buried and can't offer a free tangent spot
+                t0 = clock()
+                probes = []
+                for k in front.front():
+                    px, py, pr = front.x[k], front.y[k], front.r[k]
+                    for theta in np.linspace(0, 2 * math.pi, 36, endpoint=False):
+                        probes.append((px + (pr + r_new) * math.cos(theta), py + (pr + r_new) * math.sin(theta)))
+                stats.candidates += len(probes)
+                t1 = clock()
+                probes.sort(key=lambda pt: math.hypot(pt[0], pt[1]))
+                t2 = clock()
+                for (x, y) in probes:
+                    if not grid.overlaps_any(x, y, r_new):
+                        place(x, y, r_new, core_area_new, label_new)
+                        placed = True
+                        break
+                times["candidates"] += t1 - t0
+                times["sort"] += t2 - t1
+                times["overlap"] += clock() - t2
+        else:
+            t0 = clock()
+            count = len(positions)
+            px = placed_x[:count]
+            py = placed_y[:count]
+            pr = placed_r[:count]
+
+            # 1) positions tangent to every placed circle at many angles (single circle probes)
+            reach = (pr + r_new)[:, None]
+            probe_x = (px[:, None] + reach * probe_cos).ravel()
+            probe_y = (py[:, None] + reach * probe_sin).ravel()
+
+            # 2) positions tangent to pairs of existing circles (intersection of circles of R = pr + r_new)
+            i, j = np.triu_indices(count, 1)
+            pair_x, pair_y = circle_intersections_batch(px[i], py[i], pr[i] + r_new, px[j], py[j], pr[j] + r_new)
+
+            cand_x = np.concatenate((probe_x, pair_x))
+            cand_y = np.concatenate((probe_y, pair_y))
+            stats.candidates += len(cand_x)
+            t1 = clock()
+
+            # sort by distance to origin (prefer compact), stable so ties keep generation order;
+            # math.hypot, not np.hypot: their last bits differ at times, and near-ties must
+            # break exactly as in the scalar packer
+            dist = np.fromiter(map(math.hypot, cand_x.tolist(), cand_y.tolist()), float, len(cand_x))
+            if jitter:
+                dist *= 1.0 + jitter * rng.random(len(dist))
+            order = np.argsort(dist, kind="stable")
+            cand_x = cand_x[order]
+            cand_y = cand_y[order]
+
+            # remove duplicates: first occurrence of each point rounded to 1e-6
+            keys = np.round(np.stack((cand_x, cand_y), axis=1), 6)
+            _, first = np.unique(keys, axis=0, return_index=True)
+            first.sort()
+            stats.dedup_hits += len(cand_x) - len(first)
+            cand_x = cand_x[first]
+            cand_y = cand_y[first]
+            t2 = clock()
+
+            # broadcast overlap test against all placed centres, in chunks so the
+            # candidate x placed matrix stays small; nearest feasible wins
+            limit = (r_new + pr - 1e-8) ** 2
+            chunk = max(64, (1 << 20) // count)
+            for start in range(0, len(cand_x), chunk):
+                cx = cand_x[start:start + chunk]
+                cy = cand_y[start:start + chunk]
+                blocked = (((cx[:, None] - px) ** 2 + (cy[:, None] - py) ** 2) < limit).any(axis=1)
+                stats.overlap_checks += len(cx)
+                free = np.flatnonzero(~blocked)
+                if free.size:
+                    place(float(cx[free[0]]), float(cy[free[0]]), r_new, core_area_new, label_new)
+                    placed = True
+                    break
+            times["candidates"] += t1 - t0
+            times["sort"] += t2 - t1
+            times["overlap"] += clock() - t2
+
+        if not placed:
+            # no candidate fits: nearest free gap around the placed wires, bounded work
+            t0 = clock()
+            count = len(positions)
+            x, y = nearest_gap(placed_x[:count], placed_y[:count], placed_r[:count], r_new)
+            place(x, y, r_new, core_area_new, label_new)
+            stats.fallback_runs += 1
+            stats.fallback_checks += GAP_RAYS * count
+            times["fallback"] += clock() - t0
+
+    stats.wires += len(radii)
+    stats.overlap_checks += grid.checks
+    if front is not None:
+        stats.candidates += front.tested
+        stats.overlap_checks += front.checks
+    stats.total_time += clock() - started
+    if progress is not None:
+        progress(len(radii), len(radii))
+    return positions
+
+
+def place_wires_compact(radii, core_areas, type_ids, wires, cell_size, progress=None, stats=None, rng=None,
+                        jitter=0.0):
+    """Front-chain placement of radii arrays (largest first) for compact mode; appends to wires (WireArrays).
+
+    Same rules as place_wires in front mode, but nothing is kept per wire except
+    array slots: a Layout with a CellGrid, a FrontArray and candidate buffers reused
+    from wire to wire. When nothing fits, the gap fallback only looks at the outer
+    shell of the bundle, so its work stays bounded too. Memory is a few dozen bytes
+    per wire on top of the result arrays. Wires already in wires (a lattice, see
+    pack_entries) stay where they are and the new ones are packed around them.
+    """
+    if rng is None:
+        jitter = 0.0
+    if stats is None:
+        stats = PackStats()
+    n = len(radii)
+    base = len(wires)
+    # a dense-ish bundle of these wires has about this radius; the grid grows if not
+    area = float(np.square(radii).sum()) + (float(np.square(wires.r).sum()) if base else 0.0)
+    extent = 1.2 * math.sqrt(area / 0.6) + 2.0 * float(radii.max()) if n else 0.0
+    layout = Layout(wires, cell_size, compact=True, extent=extent, capacity=base + n)
+    grid = layout.grid
+    front = FrontArray(layout, rng, jitter)
+    if base >= 3:
+        front.order = layout_front(layout.x[:base], layout.y[:base], layout.r[:base])
+    thetas = np.linspace(0, 2 * math.pi, 36, endpoint=False)
+    probe_cos = np.cos(thetas)
+    probe_sin = np.sin(thetas)
+    times = stats.times
+    clock = time.perf_counter
+    started = clock()
+
+    for idx in range(n):
+        if progress is not None and idx:
+            progress(idx, n)
+        r_new = float(radii[idx])
+        t0 = clock()
+        cand = front.candidate(r_new)
+        t1 = clock()
+        fits = cand is not None and not grid.overlaps_any(cand[0], cand[1], r_new)
+        times["candidates"] += t1 - t0
+        times["overlap"] += clock() - t1
+        if fits:
+            layout.add(cand[0], cand[1], r_new)
+            front.add(layout.count - 1, cand[2], cand[3])
+            continue
+        # chain can't take it: probe around front circles, nearest the origin first
+        t0 = clock()
+        ring = front.front()
+        reach = (layout.r[ring] + r_new)[:, None]
+        probe_x = (layout.x[ring][:, None] + reach * probe_cos).ravel()
+        probe_y = (layout.y[ring][:, None] + reach * probe_sin).ravel()
+        stats.candidates += len(probe_x)
+        t1 = clock()
+        order = np.argsort(np.hypot(probe_x, probe_y), kind="stable")
+        t2 = clock()
+        spot = None
+        for k in order.tolist():
+            x, y = float(probe_x[k]), float(probe_y[k])
+            if not grid.overlaps_any(x, y, r_new):
+                spot = (x, y)
+                break
+        times["candidates"] += t1 - t0
+        times["sort"] += t2 - t1
+        times["overlap"] += clock() - t2
+        if spot is None:
+            t0 = clock()
+            count = layout.count
+            reach = layout.reach[:count]
+            inner = max(0.0, float(reach.max()) - 2.0 * (grid.max_r + r_new))
+            shell = np.flatnonzero(reach >= inner)
+            spot = nearest_gap(layout.x[shell], layout.y[shell], layout.r[shell], r_new,
+                               start=inner + r_new if inner > 0 else 0.0)
+            stats.fallback_runs += 1
+            stats.fallback_checks += GAP_RAYS * len(shell)
+            times["fallback"] += clock() - t0
+        layout.add(spot[0], spot[1], r_new)
+
+    wires.extend(layout.x[base:base + n], layout.y[base:base + n], radii, core_areas, type_ids)
+    stats.wires += n
+    stats.overlap_checks += grid.checks + front.checks
+    stats.candidates += front.tested
+    stats.total_time += clock() - started
+    if progress is not None:
+        progress(n, n)
+    return wires
+
+
+def hex_layout(n, r):
+    """Centres of n equal circles of radius r: the n points of a hexagonal lattice nearest a centre.
+
+    The lattice centre is tried on a lattice point, on a triangle centre and on an
+    edge midpoint; the one with the smallest enclosing circle wins.
+    """
+    d = 2.0 * r
+    # lattice rows/columns enough to hold n points around the centre, with a margin
+    m = int((r * math.sqrt(n / 0.9069) + 2.0 * d) / (d * SQRT3 / 2.0)) + 2
+    a, b = np.meshgrid(np.arange(-m, m + 1), np.arange(-m, m + 1))
+    lx = (a * d + b * (d / 2.0)).ravel()
+    ly = (b * (d * SQRT3 / 2.0)).ravel()
+    best = None
+    for ox, oy in ((0.0, 0.0), (d / 2.0, d / (2.0 * SQRT3)), (d / 2.0, 0.0)):
+        x, y = lx - ox, ly - oy
+        dist = np.hypot(x, y)
+        nearest = np.argpartition(dist, n - 1)[:n]
+        outer = float(dist[nearest].max())
+        if best is None or outer < best[0] - 1e-9:
+            best = (outer, x[nearest], y[nearest])
+    return best[1], best[2]
+
+
+def ring_layout(n, r, first):
+    """Centres of n equal circles of radius r on concentric rings, each ring 2r further out.
+
+    first is the number of circles on the innermost ring (1 puts one in the centre);
+    every further ring takes as many circles as fit around it.
+    """
+    xs, ys = [], []
+    radius = 0.0 if first == 1 else r / math.sin(math.pi / first)
+    fit = first
+    while len(xs) < n:
+        k = min(fit, n - len(xs))
+        theta = 2.0 * math.pi * np.arange(k) / k
+        xs.extend((radius * np.cos(theta)).tolist())
+        ys.extend((radius * np.sin(theta)).tolist())
+        radius += 2.0 * r
+        fit = int(math.pi / math.asin(min(1.0, r / radius)) + 1e-9)
+    return np.array(xs), np.array(ys)
+
+
+def lattice_layout(n, r):
+    """Centres (x, y arrays, nearest the origin first) of n equal circles of radius r, without any search.
+
+    Takes the tightest of the hexagonal lattice layouts (best for larger n) and the
+    concentric ring layouts (sometimes better for a few dozen). Cost grows about
+    linearly with n: 1000 wires take well under a millisecond.
+    """
+    if n <= 0:
+        return np.empty(0), np.empty(0)
+    if n == 1:
+        return np.zeros(1), np.zeros(1)
+    layouts = [hex_layout(n, r)] + [ring_layout(n, r, first) for first in range(1, min(n, 6) + 1)]
+    x, y = min(layouts, key=lambda xy: float(np.hypot(xy[0], xy[1]).max()))
+    order = np.argsort(np.hypot(x, y), kind="stable")
+    return x[order], y[order]
+
+
+def lattice_group(entries, minimum=LATTICE_MIN, share=LATTICE_SHARE):
+    """(entry, count) of the largest group of identical entries if it should go on a lattice, else None."""
+    if not minimum or len(entries) < minimum:
+        return None
+    groups = {}
+    for entry in entries:
+        groups[entry] = groups.get(entry, 0) + 1
+    # most wires first, the larger wire on equal counts
+    entry, count = max(groups.items(), key=lambda item: (item[1], item[0][0]))
+    if count < minimum or count < share * len(entries):
+        return None
+    return entry, count
+
+
+def bundle_outer_radius(positions):
+    if isinstance(positions, WireArrays):
+        return float((np.hypot(positions.x, positions.y) + positions.r).max()) if len(positions) else 0.0
+    # compute bundle outer radius
+    bundle_outer = 0.0
+    for x, y, r, *_ in positions:
+        dist = math.hypot(x, y) + r
+        if dist > bundle_outer:
+            bundle_outer = dist
+    return bundle_outer
+
+
+def pack_bundle(wire_counts, insulation, heatshrink=0.0, custom=None, wire_data=None, mode="pratt", progress=None,
+                seed=0, lattice=True, compact=None):
+    """Pack a bundle section and return a PackResult.
+
+    wire_counts maps gauge name ("22 Gauge") to number of wires, insulation names a
+    table in wires.json and heatshrink is the sleeve wall thickness in mm. See
+    place_wires for progress.
+
+    seed 0 is the plain largest-first greedy packing. Any other seed packs a variant:
+    the largest-first order is shuffled a little (radii scaled by random factors) and
+    near-equal candidates are tie-broken at random. The same seed always gives the
+    same layout, see bundle_search for picking the best of many seeds.
+
+    Large groups of identical wires are laid out on a hexagonal or ring lattice
+    (see pack_entries); lattice=False turns that off. compact is passed on to
+    pack_entries.
+    """
+    catalog = load_wire_data() if wire_data is None else as_catalog(wire_data)
+    if insulation not in catalog.insulation_ids:
+        raise ValueError(f"Unknown insulation type: {insulation}")
+    entries = wire_entries(catalog, insulation, wire_counts, custom)
+    counts = {k: int(v) for k, v in wire_counts.items() if int(v)}
+    largest = max(entry[0] for entry in entries) if entries else 0.0
+    return pack_entries(entries, grid_cell_size(catalog, insulation, largest), heatshrink, insulation, mode, counts,
+                        progress, seed, lattice, compact)
+
+
+def pack_entries(entries, cell_size, heatshrink=0.0, insulation="", mode="pratt", wire_counts=None, progress=None,
+                 seed=0, lattice=True, compact=None):
+    """Pack (outer_radius, core_area, label) entries (see wire_entries) and return a PackResult.
+
+    This is pack_bundle without the wire table: entries may mix insulations, as in a
+    harness segment carrying circuits of several kinds. cell_size is the spatial grid
+    cell, at least one largest wire diameter (see grid_cell_size).
+
+    A bundle of one wire type with at least LATTICE_MIN wires is laid out on a
+    lattice without any search. If the largest group of identical wires is only
+    most of the bundle (lattice_group), the bundle is packed twice with the selected
+    mode: once around the lattice core, once wire by wire. The smaller section is
+    kept, so the lattice never makes a bundle bigger. lattice=False skips it.
+
+    compact (default: for COMPACT_MIN wires or more) returns the positions as
+    WireArrays and packs with array-backed structures only (CellGrid, FrontArray),
+    so memory stays a few dozen bytes per wire whatever the bundle size. Compact
+    packing always uses the front chain, Pratt mode's all-pairs candidates don't
+    scale to such bundles; its seeded variants differ from the non-compact ones.
+    """
+    heatshrink = max(0.0, float(heatshrink or 0.0))
+    counts = dict(wire_counts or {})
+    if not entries:
+        return PackResult([], 0.0, heatshrink, insulation, mode, counts, stats=PackStats(), seed=seed)
+    cell_size = max(cell_size, 2.0 * max(entry[0] for entry in entries))
+    if compact is None:
+        compact = len(entries) >= COMPACT_MIN
+    if compact and mode != "front":
+        log.info("%s: %d wires packed in compact mode, front chain instead of %s", insulation, len(entries), mode)
+        mode = "front"
+
+    def lattice_core(stats):
+        # the group on a lattice, in one step
+        (r, core_area, label), count = group
+        started = time.perf_counter()
+        x, y = lattice_layout(count, r)
+        if compact:
+            core = WireArrays(len(entries))
+            core.extend(x, y, np.full(count, r), np.full(count, core_area),
+                        np.full(count, core.intern(label), dtype=np.int32))
+        else:
+            core = [(px, py, r, core_area, label) for px, py in zip(x.tolist(), y.tolist())]
+        stats.wires += count
+        stats.lattice_wires += count
+        stats.times["lattice"] += time.perf_counter() - started
+        stats.total_time += time.perf_counter() - started
+        return core
+
+    def search(entries, stats, initial=None, offset=0, grand=None):
+        # the selected mode's wire-by-wire search, around initial wires if given; progress
+        # runs from offset to grand over both searches of a mixed lattice bundle
+        report = None
+        if progress is not None:
+            placed = len(initial) if initial is not None else 0
+
+            def report(done, total):
+                progress(offset + placed + done, grand or placed + total)
+        # sort by outer radius descending for better packing
+        entries = sorted(entries, key=lambda t: t[0], reverse=True)
+        rng = None
+        jitter = 0.0
+        if seed:
+            rng = np.random.default_rng(seed)
+            noise = 1.0 + ORDER_JITTERS[rng.integers(len(ORDER_JITTERS))] * rng.random(len(entries))
+            jitter = TIE_JITTERS[rng.integers(len(TIE_JITTERS))]
+            order = sorted(range(len(entries)), key=lambda k: entries[k][0] * noise[k], reverse=True)
+            entries = [entries[k] for k in order]
+        if compact:
+            wires = initial if initial is not None else WireArrays(len(entries))
+            ids = np.array([wires.intern(entry[2]) for entry in entries], dtype=np.int32)
+            return place_wires_compact(np.array([entry[0] for entry in entries]),
+                                       np.array([entry[1] for entry in entries]), ids, wires, cell_size, report,
+                                       stats, rng, jitter)
+        radii = [entry[0] for entry in entries]  # outer radii
+        core_areas = [entry[1] for entry in entries]
+        labels = [entry[2] for entry in entries]
+        return place_wires(radii, core_areas, labels, cell_size, mode, report, stats, rng, jitter, initial)
+
+    # a large group of identical wires goes on a lattice (see lattice_group)
+    stats = PackStats()
+    group = lattice_group(entries) if lattice else None
+    if group is not None and group[1] == len(entries):
+        positions = lattice_core(stats)
+        if progress is not None:
+            progress(len(positions), len(positions))
+    elif group is not None:
+        # with other wires around it the lattice core isn't always the smaller section
+        # (its flat rim leaves them poor spots), so pack both ways and keep the smaller
+        rest = [entry for entry in entries if entry != group[0]]
+        around = search(rest, stats, lattice_core(stats), grand=2 * len(entries))
+        plain_stats = PackStats()
+        plain = search(entries, plain_stats, offset=len(entries), grand=2 * len(entries))
+        outer, plain_outer = bundle_outer_radius(around), bundle_outer_radius(plain)
+        log.info("%s %s pack: lattice core %.3f mm, searched %.3f mm", insulation, mode, 2.0 * outer,
+                 2.0 * plain_outer)
+        if plain_outer <= outer:
+            plain_stats.total_time += stats.total_time
+            positions, stats = plain, plain_stats
+        else:
+            stats.total_time += plain_stats.total_time
+            positions = around
+    else:
+        positions = search(entries, stats)
+    log.info("%s %s pack: %s", insulation, mode, stats.summary())
+    if stats.fallback_runs:
+        log.warning("%s %s pack: no tangent spot for %d of %d wires, placed by gap fallback", insulation, mode,
+                    stats.fallback_runs, stats.wires)
+    return PackResult(positions, bundle_outer_radius(positions), heatshrink, insulation, mode, counts, stats=stats,
+                      seed=seed)
+
+
+def grid_cell_size(wire_data, insulation, largest=0.0):
+    # one largest insulation diameter of the table (or of the bundle, if bigger)
+    return 2.0 * max(as_catalog(wire_data).max_radius(insulation), largest)
+
+
+def repack_incremental(previous, wire_counts, insulation, heatshrink=0.0, custom=None, wire_data=None, mode="pratt",
+                       progress=None):
+    """Pack a bundle by adding wires to a previous PackResult, leaving placed wires where they are.
+
+    Only the added wires are placed, into gaps near the rim or onto the outer front,
+    so small edits cost about the same whatever the bundle size. A full pack_bundle
+    is done instead when there is no previous layout, the insulation or mode changed,
+    or a wire type lost wires or changed size, since the old layout no longer holds.
+    """
+    wire_data = load_wire_data() if wire_data is None else as_catalog(wire_data)
+    # compact results are front-chain packings whatever mode was asked for (see pack_entries)
+    if (previous is None or not previous.positions or previous.insulation != insulation
+            or (previous.mode != mode and not isinstance(previous.positions, WireArrays))):
+        return pack_bundle(wire_counts, insulation, heatshrink, custom, wire_data, mode, progress)
+
+    entries = wire_entries(wire_data, insulation, wire_counts, custom)
+    compact = isinstance(previous.positions, WireArrays)
+    old = {}
+    if compact:
+        # one entry per type id, without going through the wires one by one
+        ids, first, count = np.unique(previous.positions.type_id, return_index=True, return_counts=True)
+        for k, f, c in zip(ids.tolist(), first.tolist(), count.tolist()):
+            old[previous.positions.types[k]] = (c, (float(previous.positions.r[f]),
+                                                    float(previous.positions.core_area[f])))
+    else:
+        for _, _, r, core_area, label in previous.positions:
+            count, _ = old.get(label, (0, None))
+            old[label] = (count + 1, (r, core_area))
+    new = {}
+    for r, core_area, label in entries:
+        count, _ = new.get(label, (0, None))
+        new[label] = (count + 1, (r, core_area))
+    for label, (count, size) in old.items():
+        if label not in new or new[label][0] < count or new[label][1] != size:
+            return pack_bundle(wire_counts, insulation, heatshrink, custom, wire_data, mode, progress)
+
+    added = []
+    for label, (count, (r, core_area)) in new.items():
+        extra = count - old.get(label, (0, None))[0]
+        added.extend([(r, core_area, label)] * extra)
+    added.sort(key=lambda t: t[0], reverse=True)
+
+    # copies, so previous keeps its own wires and layout; compact results stay WireArrays
+    positions = previous.positions[:] if compact else list(previous.positions)
+    if previous.layout is not None:
+        layout = previous.layout.copy()
+    else:
+        largest = max(added[0][0] if added else 0.0, float(position_arrays(positions)[2].max()))
+        layout = Layout(positions, grid_cell_size(wire_data, insulation, largest), compact)
+    stats = PackStats()
+    if added:
+        extend_packing(positions, added, layout, progress, stats)
+        log.info("%s %s incremental: %s", insulation, mode, stats.summary())
+        if stats.fallback_runs:
+            log.warning("%s %s incremental: no tangent spot for %d of %d added wires, placed by gap fallback",
+                        insulation, mode, stats.fallback_runs, stats.wires)
+    heatshrink = max(0.0, float(heatshrink or 0.0))
+    counts = {k: int(v) for k, v in wire_counts.items() if int(v)}
+    return PackResult(positions, layout.bundle_outer, heatshrink, insulation, previous.mode, counts, layout, stats,
+                      None)
+
+
+class Layout:
+    """Spatial grid plus growable centre/radius arrays of an existing layout.
+
+    compact uses a CellGrid over these arrays instead of a SpatialGrid of tuples;
+    extent is the expected bundle radius it is sized for (it grows if needed).
+    """
+
+    def __init__(self, positions, cell_size, compact=False, extent=0.0, capacity=0):
+        self.count = 0
+        self.x = np.empty(max(16, 2 * len(positions), capacity))
+        self.y = np.empty_like(self.x)
+        self.r = np.empty_like(self.x)
+        self.reach = np.empty_like(self.x)  # distance of each circle's far edge from the origin
+        if compact:
+            extent = max(extent, 1.5 * bundle_outer_radius(positions) if len(positions) else 0.0)
+            self.grid = CellGrid(cell_size, self, extent)
+        else:
+            self.grid = SpatialGrid(cell_size)
+        if isinstance(positions, WireArrays):
+            for x, y, r in zip(positions.x.tolist(), positions.y.tolist(), positions.r.tolist()):
+                self.add(x, y, r)
+        else:
+            for x, y, r, *_ in positions:
+                self.add(x, y, r)
+
+    @property
+    def bundle_outer(self):
+        return float(self.reach[:self.count].max()) if self.count else 0.0
+
+    def copy(self):
+        """An independent Layout of the same circles, to grow without touching this one."""
+        layout = Layout.__new__(Layout)
+        layout.count = self.count
+        for name in ("x", "y", "r", "reach"):
+            setattr(layout, name, getattr(self, name).copy())
+        # a CellGrid indexes the arrays of its Layout, so its copy has to follow them
+        layout.grid = self.grid.copy(layout) if isinstance(self.grid, CellGrid) else self.grid.copy()
+        return layout
+
+    def add(self, x, y, r):
+        if self.count == len(self.x):
+            for name in ("x", "y", "r", "reach"):
+                old = getattr(self, name)
+                grown = np.empty(2 * len(old))
+                grown[:self.count] = old[:self.count]
+                setattr(self, name, grown)
+        k = self.count
+        self.x[k], self.y[k], self.r[k] = x, y, r
+        self.reach[k] = math.hypot(x, y) + r
+        self.count += 1
+        self.grid.insert(x, y, r)
+
+
+def extend_packing(positions, added, layout, progress=None, stats=None):
+    """Place added (outer_r, core_area, label) wires around an existing layout, in place.
+
+    Candidates only come from circles in the outer shell of the bundle: tangent to
+    neighbouring shell pairs and probes around shell circles. The shell is about
+    sqrt(n) circles, so the work per added wire barely grows with bundle size.
+    Counters are added to stats (a PackStats) if given.
+    """
+    if stats is None:
+        stats = PackStats()
+    grid = layout.grid
+    checks_before = grid.checks
+    times = stats.times
+    clock = time.perf_counter
+    started = clock()
+    thetas = np.linspace(0, 2 * math.pi, 36, endpoint=False)
+    probe_cos = np.cos(thetas)
+    probe_sin = np.sin(thetas)
+
+    for done, (r_new, core_area_new, label_new) in enumerate(added):
+        if progress is not None:
+            progress(done, len(added))
+        t0 = clock()
+        count = layout.count
+        reach = layout.reach[:count]
+        outer = float(reach.max())
+        # circles close enough to the rim to border a free spot for this wire
+        shell = np.flatnonzero(reach >= outer - (grid.max_r + 2.0 * r_new))
+        sx, sy, sr = layout.x[shell], layout.y[shell], layout.r[shell]
+
+        i, j = np.triu_indices(len(shell), 1)
+        near = (sx[i] - sx[j]) ** 2 + (sy[i] - sy[j]) ** 2 <= (sr[i] + sr[j] + 2.0 * r_new) ** 2
+        i, j = i[near], j[near]
+        pair_x, pair_y = circle_intersections_batch(sx[i], sy[i], sr[i] + r_new, sx[j], sy[j], sr[j] + r_new)
+        probe_x = sx[:, None] + (sr + r_new)[:, None] * probe_cos
+        probe_y = sy[:, None] + (sr + r_new)[:, None] * probe_sin
+        # probes on the inward side of a shell circle point into the bundle, where
+        # tangent pairs already cover any gap: only keep those facing outwards
+        outward = sx[:, None] * probe_cos + sy[:, None] * probe_sin >= 0.0
+        cand_x = np.concatenate((pair_x, probe_x[outward]))
+        cand_y = np.concatenate((pair_y, probe_y[outward]))
+        stats.candidates += len(cand_x)
+        t1 = clock()
+
+        order = np.argsort(np.hypot(cand_x, cand_y), kind="stable")
+        cand_x = cand_x[order]
+        cand_y = cand_y[order]
+        t2 = clock()
+
+        # most near-origin candidates sit on the inner side of the shell: screen them
+        # against the shell with one broadcast per chunk, the grid confirms survivors
+        spot = None
+        limit = (r_new + sr - 1e-8) ** 2
+        for start in range(0, len(cand_x), 512):
+            cx = cand_x[start:start + 512]
+            cy = cand_y[start:start + 512]
+            blocked = (((cx[:, None] - sx) ** 2 + (cy[:, None] - sy) ** 2) < limit).any(axis=1)
+            stats.overlap_checks += len(cx)
+            free = np.flatnonzero(~blocked)
+            if free.size > 8:
+                # many survivors (flat stretches of rim, as around a lattice core): settle
+                # them with broadcasts against every placed circle instead of grid lookups
+                ax, ay = layout.x[:count], layout.y[:count]
+                full = (r_new + layout.r[:count] - 1e-8) ** 2
+                step = max(16, (1 << 20) // count)
+                for s0 in range(0, free.size, step):
+                    part = free[s0:s0 + step]
+                    hit = (((cx[part, None] - ax) ** 2 + (cy[part, None] - ay) ** 2) < full).any(axis=1)
+                    stats.overlap_checks += len(part)
+                    open_ = part[~hit]
+                    if open_.size:
+                        spot = (float(cx[open_[0]]), float(cy[open_[0]]))
+                        break
+            else:
+                for c in free:
+                    x, y = float(cx[c]), float(cy[c])
+                    if not grid.overlaps_any(x, y, r_new):
+                        spot = (x, y)
+                        break
+            if spot is not None:
+                break
+        times["candidates"] += t1 - t0
+        times["sort"] += t2 - t1
+        times["overlap"] += clock() - t2
+        if spot is None:
+            t0 = clock()
+            spot = nearest_gap(layout.x[:count], layout.y[:count], layout.r[:count], r_new)
+            stats.fallback_runs += 1
+            stats.fallback_checks += GAP_RAYS * count
+            times["fallback"] += clock() - t0
+        x, y = spot
+        positions.append((x, y, r_new, core_area_new, label_new))
+        layout.add(x, y, r_new)
+    stats.wires += len(added)
+    stats.overlap_checks += grid.checks - checks_before
+    stats.total_time += clock() - started
+    return positions
+
+
+def harness_diameter(wire_data, insulation, wire_counts, custom=None):
+    """Quick area-based estimate: 1.3 * sqrt(total wire area)."""
+    catalog = as_catalog(wire_data)
+    i = catalog.insulation_id(insulation)
+    total_area = 0.0
+    for wire, count in wire_counts.items():
+        count = int(count)
+        if count < 0:
+            raise ValueError(f"Invalid input for {wire}")
+        # insulation area if the table gives one, otherwise the core conductor area
+        total_area += count * float(catalog.bundle_area[i, catalog.gauge_id(wire)])
+
+    # custom wires
+    if custom:
+        cc, ca = int(custom[0]), float(custom[1])
+        if cc < 0 or ca <= 0:
+            raise ValueError("Invalid custom wire values")
+        total_area += cc * ca
+
+    if total_area <= 0:
+        return 0.0
+    return 1.3 * math.sqrt(total_area)
+
+
+# bundle derating curves per loading percentage: a + b * exp(-c * wires in bundle)
+LOAD_CURVES = {
+    "20": (0.4566806, 0.5809375, 0.06637023),
+    "40": (0.3831531, 0.674138, 0.09878993),
+    "60": (0.3254571, 0.7533654, 0.1164914),
+    "80": (0.3005456, 0.7738705, 0.1294528),
+    "100": (0.2701568, 0.8338723, 0.1363069),
+}
+
+
+def coeff_load(num_wires, perc_load):
+    """Bundle derating factor for a number of wires at a bundle loading percentage."""
+    curve = LOAD_CURVES.get(str(perc_load))
+    if curve is None:
+        return 1.0
+    a, b, c = curve
+    return a + b * math.exp(-c * num_wires)
+
+
+def current_limit(wire_data, insulation, gauge, num_wires, perc_load, safety_factor=1.0):
+    """Derated current limit (A) of one wire in a bundle."""
+    if safety_factor == 0:
+        raise ValueError("Safety factor must not be 0")
+    # amp_limit remains per-insulation (depends on insulation)
+    catalog = as_catalog(wire_data)
+    amp_limit = float(catalog.amp_limit[catalog.insulation_id(insulation), catalog.gauge_id(gauge)])
+    return coeff_load(num_wires, perc_load) * amp_limit / safety_factor
+
+
+def voltage_drop(wire_data, insulation, gauge, current, length, material="Cu"):
+    """Voltage drop (V) over length metres of one conductor carrying current amps."""
+    resistivity = MATERIAL_RESISTANCE.get(material, 0.00000172)
+    # use core conductor area (single core table) for voltage drop calculation
+    catalog = as_catalog(wire_data)
+    area_conductor_mm2 = float(catalog.conductor_area[catalog.insulation_id(insulation), catalog.gauge_id(gauge)])
+    area_mm2 = 0.75 * area_conductor_mm2
+    area_m2 = area_mm2 / 10000.0  # mm² to m²
+    if area_m2 <= 0:
+        raise ValueError(f"No conductor area for {gauge}")
+    return current * length * resistivity / area_m2
+
+
+def _lookup(keys, table, default):
+    """Map an array of keys through a dict."""
+    names = np.array(sorted(table), dtype=str)
+    values = np.array([table[k] for k in names.tolist()] + [default], dtype=float)
+    return values[name_codes(keys, names)]
+
+
+def coeff_loads(num_wires, perc_load):
+    """coeff_load over arrays (broadcast together), one NumPy pass."""
+    num_wires, perc_load = np.broadcast_arrays(np.asarray(num_wires, dtype=float), np.asarray(perc_load))
+    names = np.array(sorted(LOAD_CURVES), dtype=str)
+    # curve a, b, c per load, unknown loads derate by 1.0
+    curves = np.array([LOAD_CURVES[k] for k in names.tolist()] + [(1.0, 0.0, 0.0)])
+    a, b, c = np.moveaxis(curves[name_codes(perc_load, names)], -1, 0)
+    return a + b * np.exp(-c * num_wires)
+
+
+def current_limits(wire_data, insulation, gauge, num_wires, perc_load, safety_factor=1.0):
+    """current_limit over arrays of circuits (all arguments broadcast together).
+
+    Rows with a zero safety factor come out as NaN instead of raising.
+    """
+    insulation, gauge, num_wires, perc_load, safety_factor = np.broadcast_arrays(
+        np.asarray(insulation), np.asarray(gauge), np.asarray(num_wires, dtype=float), np.asarray(perc_load),
+        np.asarray(safety_factor, dtype=float))
+    catalog = as_catalog(wire_data)
+    amp_limit = catalog.amp_limit[catalog.insulation_codes(insulation), catalog.gauge_codes(gauge)]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(safety_factor == 0, np.nan, coeff_loads(num_wires, perc_load) * amp_limit / safety_factor)
+
+
+def voltage_drops(wire_data, insulation, gauge, current, length, material="Cu"):
+    """voltage_drop over arrays of circuits (all arguments broadcast together).
+
+    Rows without a conductor area for their gauge come out as NaN instead of raising.
+    """
+    insulation, gauge, current, length, material = np.broadcast_arrays(
+        np.asarray(insulation), np.asarray(gauge), np.asarray(current, dtype=float), np.asarray(length, dtype=float),
+        np.asarray(material))
+    catalog = as_catalog(wire_data)
+    area_m2 = 0.75 * catalog.conductor_area[catalog.insulation_codes(insulation), catalog.gauge_codes(gauge)] / 10000.0
+    resistivity = _lookup(material, MATERIAL_RESISTANCE, 0.00000172)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(area_m2 > 0, current * length * resistivity / area_m2, np.nan)
@@ -0,0 +1,154 @@
+"""Vector export of packed bundle sections: SVG, DXF (R12, ASCII) and JSON geometry.
+
+Each writer streams one wire at a time straight to the file, so nothing but the
+PackResult itself is held in memory and matplotlib is never imported. Drawings
+are in millimetres with the bundle centre at the origin: every wire as an outer
+(insulation) circle and a core circle, the heat-shrink ring if there is one, the
+bundle outline and the Ø annotations.
+
+    export(result, "trunk-3.svg")  # format from the file extension
+"""
+import json
+import math
+from pathlib import Path
+
+FORMATS = ("svg", "dxf", "json")
+
+# same colours as the section view, one pair per wire label in order of appearance
+INSULATION_COLORS = ("#66c2a5", "#8da0cb", "#fc8d62", "#a6d854", "#ffd92f")
+CORE_COLORS = ("#2b7a5b", "#2f4a8a", "#b04532", "#4a7a2a", "#b07a02")
+# nearest AutoCAD colour index per insulation colour, for DXF
+DXF_COLORS = (3, 5, 30, 82, 2)
+
+
+def core_radius(outer_r, core_area):
+    """Drawn core radius: from the conductor area, kept just inside the insulation."""
+    r = math.sqrt(max(core_area, 0.0) / math.pi)
+    return outer_r * 0.98 if r >= outer_r else r
+
+
+def label_colors(positions):
+    """Colour index per wire label, in order of first appearance (as the section view)."""
+    index = {}
+    # WireArrays already hold their labels in order of first appearance
+    for label in getattr(positions, "types", None) or (pos[4] for pos in positions):
+        if label not in index:
+            index[label] = len(index) % len(INSULATION_COLORS)
+    return index
+
+
+def _annotation(result):
+    text = f"Bundle Ø = {result.diameter:.2f} mm"
+    if result.heatshrink > 0:
+        text += f"  |  with HS Ø = {result.diameter_with_hs:.2f} mm"
+    return text
+
+
+def _g(value):
+    # coordinates to the micrometre are plenty and keep the files small
+    return f"{value:.4f}".rstrip("0").rstrip(".")
+
+
+def write_svg(result, f, title=None):
+    outer = result.bundle_outer + max(result.heatshrink, 0.0)
+    margin = max(1.0, 0.05 * outer)
+    half = outer + margin
+    text_h = max(1.0, 0.06 * half)
+    colors = label_colors(result.positions)
+    # SVG y points down; flip so the drawing matches the plotted section
+    f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    f.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{_g(2 * half)}mm" '
+            f'height="{_g(2 * half + 3 * text_h)}mm" viewBox="{_g(-half)} {_g(-half)} {_g(2 * half)} '
+            f'{_g(2 * half + 3 * text_h)}">\n')
+    if title:
+        f.write(f"<title>{_escape(title)}</title>\n")
+    stroke = _g(max(0.01, 0.002 * half))
+    f.write(f'<g transform="scale(1,-1)" stroke="#000" stroke-width="{stroke}">\n')
+    if result.heatshrink > 0:
+        f.write(f'<circle cx="0" cy="0" r="{_g(outer)}" fill="#d9d9d9" stroke="#555"/>\n')
+    f.write(f'<circle cx="0" cy="0" r="{_g(result.bundle_outer)}" fill="#fff" stroke="#000"/>\n')
+    for x, y, r, core_area, label in result.positions:
+        k = colors[label]
+        f.write(f'<circle cx="{_g(x)}" cy="{_g(y)}" r="{_g(r)}" fill="{INSULATION_COLORS[k]}"/>'
+                f'<circle cx="{_g(x)}" cy="{_g(y)}" r="{_g(core_radius(r, core_area))}" fill="{CORE_COLORS[k]}" '
+                f'stroke="none"/>\n')
+    f.write("</g>\n")
+    f.write(f'<g font-family="sans-serif" font-size="{_g(text_h)}" fill="#000">\n')
+    f.write(f'<text x="{_g(-half + margin)}" y="{_g(half + 1.2 * text_h)}">{_escape(_annotation(result))}</text>\n')
+    legend = ", ".join(f"{count} × {label}" for label, count in sorted(result.wire_counts.items()))
+    f.write(f'<text x="{_g(-half + margin)}" y="{_g(half + 2.5 * text_h)}" font-size="{_g(0.7 * text_h)}">'
+            f"{_escape(legend)}</text>\n")
+    f.write("</g>\n</svg>\n")
+
+
+def _escape(text):
+    return str(text).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _dxf_circle(f, layer, color, x, y, r):
+    f.write(f"0\nCIRCLE\n8\n{layer}\n62\n{color}\n10\n{_g(x)}\n20\n{_g(y)}\n30\n0\n40\n{_g(r)}\n")
+
+
+def _dxf_text(f, layer, x, y, height, text):
+    f.write(f"0\nTEXT\n8\n{layer}\n10\n{_g(x)}\n20\n{_g(y)}\n30\n0\n40\n{_g(height)}\n1\n{text}\n")
+
+
+def write_dxf(result, f, title=None):
+    """R12 ASCII DXF: layers INSULATION, CORE, HEATSHRINK, OUTLINE and TEXT, colours per wire label."""
+    colors = label_colors(result.positions)
+    outer = result.bundle_outer + max(result.heatshrink, 0.0)
+    text_h = max(1.0, 0.06 * outer)
+    # R12 drawings carry no unit ($INSUNITS came with R2000): say it in a comment
+    f.write("999\nunits: mm\n0\nSECTION\n2\nHEADER\n9\n$ACADVER\n1\nAC1009\n0\nENDSEC\n")
+    f.write("0\nSECTION\n2\nENTITIES\n")
+    if result.heatshrink > 0:
+        _dxf_circle(f, "HEATSHRINK", 8, 0.0, 0.0, outer)
+    _dxf_circle(f, "OUTLINE", 7, 0.0, 0.0, result.bundle_outer)
+    for x, y, r, core_area, label in result.positions:
+        color = DXF_COLORS[colors[label]]
+        _dxf_circle(f, "INSULATION", color, x, y, r)
+        _dxf_circle(f, "CORE", color, x, y, core_radius(r, core_area))
+    # DXF text is plain ASCII in R12, spell out the diameter sign
+    annotation = _annotation(result).replace("Ø", "%%c")
+    _dxf_text(f, "TEXT", -outer, -outer - 1.5 * text_h, text_h, annotation)
+    if title:
+        _dxf_text(f, "TEXT", -outer, -outer - 3.0 * text_h, 0.7 * text_h, str(title))
+    f.write("0\nENDSEC\n0\nEOF\n")
+
+
+def write_json(result, f, title=None):
+    """Geometry as JSON: bundle values, then one wire object per line (x, y, r, core_r, label)."""
+    head = {
+        "title": title,
+        "units": "mm",
+        "insulation": result.insulation,
+        "mode": result.mode,
+        "seed": result.seed,
+        "wire_counts": result.wire_counts,
+        "bundle_outer": round(result.bundle_outer, 6),
+        "heatshrink": result.heatshrink,
+        "diameter": round(result.diameter, 6),
+        "diameter_with_hs": round(result.diameter_with_hs, 6),
+    }
+    f.write(json.dumps(head, ensure_ascii=False)[:-1] + ',\n"wires": [')
+    for k, (x, y, r, core_area, label) in enumerate(result.positions):
+        wire = {"x": round(x, 6), "y": round(y, 6), "r": r, "core_r": round(core_radius(r, core_area), 6),
+                "label": label}
+        f.write(("\n" if k == 0 else ",\n") + json.dumps(wire, ensure_ascii=False))
+    f.write("\n]}\n")
+
+
+WRITERS = {"svg": write_svg, "dxf": write_dxf, "json": write_json}
+
+
+def export(result, path, fmt=None, title=None):
+    """Write a PackResult to path; fmt (svg/dxf/json) defaults to the file extension."""
+    path = Path(path)
+    fmt = (fmt or path.suffix.lstrip(".")).lower()
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format: {fmt!r} (use one of {', '.join(FORMATS)})")
+    # DXF R12 is read as cp1252 by most CAD tools, the others are UTF-8
+    encoding = "cp1252" if fmt == "dxf" else "utf-8"
+    with open(path, "w", encoding=encoding, errors="replace", newline="\n") as f:
+        WRITERS[fmt](result, f, title)
+    return path
@@ -0,0 +1,84 @@
+"""Bundle section view: one persistent matplotlib canvas embedded in the Qt window.
+
+All wires are drawn with two EllipseCollections (insulation and cores) instead of
+two Circle patches per wire, and the same figure is redrawn on every click, so
+redraw time and memory don't grow with repeated use.
+"""
+import time
+
+import numpy as np
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
+from matplotlib.collections import EllipseCollection
+from matplotlib.figure import Figure
+from matplotlib.patches import Circle
+from PyQt6.QtWidgets import QVBoxLayout, QWidget
+
+
+class BundleSectionView(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.figure = Figure(figsize=(6, 6))
+        self.canvas = FigureCanvasQTAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.canvas)
+        self.setLayout(layout)
+        self.setMinimumSize(420, 420)
+        # time from show_section to the finished render, passed to drawn(seconds) if set
+        self.drawn = None
+        self._draw_started = None
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _on_draw(self, event):
+        if self._draw_started is not None:
+            elapsed = time.perf_counter() - self._draw_started
+            self._draw_started = None
+            if self.drawn is not None:
+                self.drawn(elapsed)
+
+    def show_section(self, result, plot_data):
+        """Draw a PackResult using the arrays from section_plot_data."""
+        self._draw_started = time.perf_counter()
+        ax = self.ax
+        ax.clear()
+        ax.set_aspect('equal')
+        bundle_outer = result.bundle_outer
+        hs_thickness = result.heatshrink
+
+        # draw outer heat shrink ring first (as faint fill)
+        if hs_thickness > 0:
+            ax.add_patch(Circle((0, 0), radius=bundle_outer + hs_thickness, edgecolor='red',
+                                facecolor=(1, 0.8, 0.8, 0.3), linewidth=1.0))
+            # inner boundary of heatshrink (bundle outer)
+            ax.add_patch(Circle((0, 0), radius=bundle_outer, edgecolor='red', facecolor='none', linestyle='--'))
+
+        # insulation outer (color A) and core (color B), one collection each
+        xy = plot_data["xy"]
+        if len(xy):
+            outer_d = 2.0 * plot_data["outer_radii"]
+            core_d = 2.0 * plot_data["core_radii"]
+            # wires over their temperature rating (bundle_thermal) get a red outline
+            hot = plot_data.get("hot")
+            edges = np.where(hot, 'red', 'k') if hot is not None else 'k'
+            widths = np.where(hot, 1.8, 0.6) if hot is not None else 0.6
+            ax.add_collection(EllipseCollection(outer_d, outer_d, np.zeros(len(xy)), units='xy', offsets=xy,
+                                                offset_transform=ax.transData, facecolors=plot_data["insulation_colors"],
+                                                edgecolors=edges, linewidths=widths, zorder=1))
+            ax.add_collection(EllipseCollection(core_d, core_d, np.zeros(len(xy)), units='xy', offsets=xy,
+                                                offset_transform=ax.transData, facecolors=plot_data["core_colors"],
+                                                edgecolors='k', linewidths=0.3, zorder=2))
+
+        # annotate on plot
+        ax.set_title(f"Estimated Bundle Section — {result.total_wires} wires\nInsulation: {result.insulation}", fontsize=12)
+        margin = 0.12 * (bundle_outer + hs_thickness + 1.0)
+        ax.text(0, bundle_outer + hs_thickness + margin * 0.2, f"Bundle Ø = {result.diameter:.2f} mm",
+                ha='center', fontsize=10, color='black')
+        if hs_thickness > 0:
+            ax.text(0, -(bundle_outer + hs_thickness + margin * 0.1), f"With heatshrink Ø = {result.diameter_with_hs:.2f} mm",
+                    ha='center', fontsize=9, color='red')
+
+        ax.set_xlim(-bundle_outer - hs_thickness - margin, bundle_outer + hs_thickness + margin)
+        ax.set_ylim(-bundle_outer - hs_thickness - margin, bundle_outer + hs_thickness + margin)
+        ax.axis('off')
+        self.canvas.draw_idle()
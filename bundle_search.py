@@ -0,0 +1,85 @@
+"""Anytime "best bundle Ø within N seconds" search.
+
+Packs the same bundle many times on a process pool, each with a different
+pack_bundle seed (seed 0 is the plain largest-first packing, other seeds vary the
+order and the tie-breaks), and keeps the smallest diameter found. The search stops
+when the time budget runs out, whatever the bundle size, and the best result can be
+reproduced with pack_bundle(..., seed=best.seed).
+"""
+import os
+import time
+from dataclasses import dataclass, field
+
+import bundle_engine
+
+def _pack_seed(seed):
+    wire_counts, insulation, custom, wire_data, mode = bundle_engine.worker_job()
+    return bundle_engine.pack_bundle(wire_counts, insulation, custom=custom, wire_data=wire_data, mode=mode,
+                                     seed=seed)
+
+
+@dataclass
+class SearchResult:
+    """Best packing of a search and how it got there."""
+    best: object  # PackResult with the smallest diameter (None if nothing finished), best.seed reproduces it
+    tried: int = 0  # packings finished within the budget
+    elapsed: float = 0.0
+    history: list = field(default_factory=list)  # (seconds, seed, diameter) per improvement
+
+
+def search(wire_counts, insulation, heatshrink=0.0, custom=None, wire_data=None, mode="pratt", budget=10.0,
+           workers=None, first_seed=0, initial=None, improved=None, stop=None, context=None):
+    """Pack seeds first_seed, first_seed + 1, ... in parallel for budget seconds and return a SearchResult.
+
+    initial is an already known PackResult of the same bundle (say the plain packing
+    from the cache) to start from. improved(search_result), if given, is called in
+    this process every time a smaller diameter turns up; stop(), if given, is polled
+    and ends the search early when it returns True. Packings still running at the
+    deadline are abandoned, so best is None if a single packing takes longer than the
+    budget and there was no initial result. context names a multiprocessing start
+    method ("spawn" is safest from a GUI thread).
+    """
+    if wire_data is None:
+        wire_data = bundle_engine.load_wire_data()
+    workers = max(1, workers or os.cpu_count() or 1)
+    start = time.perf_counter()
+    deadline = start + max(0.0, float(budget))
+    result = SearchResult(initial)
+    heatshrink = max(0.0, float(heatshrink or 0.0))
+    if initial is not None:
+        initial.heatshrink = heatshrink
+        result.history.append((0.0, initial.seed, initial.diameter))
+
+    # always a pool, even for one worker: a packing running at the deadline must be abandonable
+    job = (wire_counts, insulation, custom, wire_data, mode)
+    with bundle_engine.job_pool(job, workers, context, inline=False) as pool:
+        pending = []
+        next_seed = first_seed
+        if initial is not None and initial.seed == next_seed:
+            next_seed += 1
+        while True:
+            now = time.perf_counter()
+            if now >= deadline or (stop is not None and stop()):
+                break
+            # keep every worker busy plus one queued task each, no more, so the pool
+            # never holds much work past the deadline
+            while len(pending) < 2 * workers:
+                pending.append(pool.apply_async(_pack_seed, (next_seed,)))
+                next_seed += 1
+            ready = [task for task in pending if task.ready()]
+            if not ready:
+                pending[0].wait(min(0.05, max(0.001, deadline - now)))
+                continue
+            for task in ready:
+                pending.remove(task)
+                packed = task.get()
+                result.tried += 1
+                if result.best is None or packed.bundle_outer < result.best.bundle_outer - 1e-9:
+                    packed.heatshrink = heatshrink
+                    result.best = packed
+                    result.elapsed = time.perf_counter() - start
+                    result.history.append((result.elapsed, packed.seed, packed.diameter))
+                    if improved is not None:
+                        improved(result)
+    result.elapsed = time.perf_counter() - start
+    return result
@@ -0,0 +1,237 @@
+"""Steady-state conductor temperatures of a packed bundle section.
+
+current_limit derates with a curve of wire count and loading only; this looks at
+where each wire sits. The section of a long, uniform bundle is a thermal network
+per metre of length: one node per conductor plus one for the bundle surface,
+
+- each conductor makes I² R'(T) watts per metre, R' from the core area (as
+  voltage_drop: 0.75 of it carries current) growing with temperature;
+- touching wires exchange heat through both insulation walls and the air wedge
+  between them: 1 / (SECTORS R_wall_i + SECTORS R_wall_j + 1 / CONTACT_CONDUCTANCE),
+  R_wall = ln(r_outer / r_core) / (2 pi k) being the wall of the whole wire;
+- the outer ring of wires passes heat to the bundle surface the same way, and the
+  surface to ambient through the heat-shrink wall and SURFACE_COEFFICIENT.
+
+The resistance rise is linear in T, so the network is one sparse symmetric linear
+system, solved by conjugate gradients over the contact pairs (no matrix is
+built); 500 wires take a few milliseconds. When the heating outgrows the cooling
+there is no steady state (thermal runaway) and every temperature comes out inf.
+A wire with no heat path at all (no contacts, not on the outer ring) is a runaway
+only if it carries current; without, it stays at ambient.
+
+The constants are rough defaults for PVC-class insulation in still air; the
+hot-spot-vs-outer-ring picture matters more than the last degree.
+"""
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+import bundle_engine
+
+# continuous conductor temperature rating per insulation, °C
+MAX_TEMPERATURE = {"PVC": 105.0, "TXL": 125.0, "Raychem": 150.0}
+DEFAULT_MAX_TEMPERATURE = 105.0
+# thermal conductivity of the insulation wall, W/(m K)
+INSULATION_CONDUCTIVITY = {"PVC": 0.19, "TXL": 0.29, "Raychem": 0.25}
+DEFAULT_CONDUCTIVITY = 0.2
+HEATSHRINK_CONDUCTIVITY = 0.2  # W/(m K)
+# resistance temperature coefficient per material (resistivities are at 20 °C), 1/K
+TEMPERATURE_COEFFICIENT = {"Cu": 0.00393, "Ag": 0.0038, "CuS": 0.00393}
+CONTACT_CONDUCTANCE = 1.0  # air wedge between two touching wires, W/(m K) per metre of bundle
+SURFACE_COEFFICIENT = 10.0  # convection + radiation from the bundle surface, W/(m² K)
+SECTORS = 6  # a packed wire touches about six neighbours, each through a sixth of its wall
+CONTACT_GAP = 0.02  # mm; wires closer than this (plus 2% of the smaller radius) touch
+STRAND_FILL = 0.75  # share of the core area carrying current, as voltage_drop
+
+
+@dataclass
+class ThermalResult:
+    """Conductor temperatures of one bundle section, per wire in PackResult.positions order."""
+    temperature: np.ndarray  # °C (inf everywhere on thermal runaway)
+    heat: np.ndarray  # W per metre of bundle, at the solved temperature
+    limit: np.ndarray  # rated temperature per wire, °C
+    outer: np.ndarray  # bool, wire in the outer ring (cooled through the surface)
+    surface: float  # bundle surface temperature, °C
+    ambient: float
+    runaway: bool = False
+    iterations: int = 0
+
+    @property
+    def overheated(self):
+        return self.temperature > self.limit
+
+    @property
+    def hot_spot(self):
+        """Index of the hottest wire (-1 for an empty bundle)."""
+        return int(np.argmax(self.temperature)) if len(self.temperature) else -1
+
+    @property
+    def max_temperature(self):
+        return float(self.temperature.max()) if len(self.temperature) else self.ambient
+
+    @property
+    def outer_temperature(self):
+        """Mean temperature of the outer ring."""
+        return float(self.temperature[self.outer].mean()) if self.outer.any() else self.ambient
+
+    def summary(self):
+        if self.runaway:
+            return "thermal runaway: the bundle can't shed this heat at any temperature"
+        if not len(self.temperature):
+            return "no wires"
+        over = int(self.overheated.sum())
+        text = (f"hot spot {self.max_temperature:.1f} °C, outer ring {self.outer_temperature:.1f} °C, "
+                f"surface {self.surface:.1f} °C (ambient {self.ambient:g} °C)")
+        return text + (f"; {over} wires over their rating" if over else "")
+
+
+def contact_pairs(x, y, r, gap=CONTACT_GAP):
+    """Index pairs (i < j) of touching wires, for any bundle size.
+
+    Wires are sorted by x and compared in blocks against the slab of x they can
+    reach, so memory and time stay near linear in the number of wires.
+    """
+    order = np.argsort(x, kind="stable")
+    xs, ys, rs = x[order], y[order], r[order]
+    reach = 2.0 * float(rs.max()) + gap if len(rs) else 0.0
+    first, second = [], []
+    for s in range(0, len(xs), 256):
+        e = min(s + 256, len(xs))
+        lo = s  # pairs with earlier wires were found from their block
+        hi = int(np.searchsorted(xs, xs[e - 1] + reach, side="right"))
+        dx = xs[lo:hi][None, :] - xs[s:e, None]
+        dy = ys[lo:hi][None, :] - ys[s:e, None]
+        rr = rs[lo:hi][None, :] + rs[s:e, None]
+        slack = gap + 0.02 * np.minimum(rs[lo:hi][None, :], rs[s:e, None])
+        a, b = np.nonzero(dx * dx + dy * dy < (rr + slack) ** 2)
+        a += s
+        b += lo
+        keep = a < b
+        first.append(a[keep])
+        second.append(b[keep])
+    if not first:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    i, j = order[np.concatenate(first)], order[np.concatenate(second)]
+    return np.minimum(i, j), np.maximum(i, j)
+
+
+def wire_currents(result, currents):
+    """Per-wire current array from a scalar, a {label: amps} dict or a sequence in positions order."""
+    n = len(result.positions)
+    if isinstance(currents, dict):
+        labels = bundle_engine.position_labels(result.positions)
+        return np.array([float(currents.get(label, 0.0)) for label in labels], dtype=float)
+    currents = np.asarray(currents, dtype=float)
+    if currents.ndim == 0:
+        return np.full(n, float(currents))
+    if currents.shape != (n,):
+        raise ValueError(f"Expected {n} wire currents, got {currents.shape[0]}")
+    return currents
+
+
+def loading_currents(result, wire_data, loading):
+    """Per-wire currents of a bundle loaded to loading % of each gauge's rated (un-derated) current."""
+    catalog = bundle_engine.as_catalog(wire_data)
+    labels = bundle_engine.position_labels(result.positions)
+    rated = catalog.amp_limit[catalog.insulation_id(result.insulation), catalog.gauge_codes(labels)] if labels \
+        else np.zeros(0)
+    return float(loading) / 100.0 * rated
+
+
+def _solve_cg(diag, i, j, g, rhs, tol=1e-10, max_iterations=None):
+    """Solve the network (diag on the diagonal, -g between i and j) by Jacobi-preconditioned CG.
+
+    Returns (solution, iterations), or (None, iterations) when the system is not
+    positive definite, i.e. the heating outgrows the cooling.
+    """
+    n = len(diag)
+    if (diag <= 0).any():
+        return None, 0
+
+    def apply(v):
+        return diag * v - np.bincount(i, g * v[j], n) - np.bincount(j, g * v[i], n)
+
+    t = rhs / diag
+    res = rhs - apply(t)
+    z = res / diag
+    p = z.copy()
+    rz = res @ z
+    limit = tol * max(float(np.abs(rhs).max()), 1e-300)
+    for step in range(max_iterations or 4 * n + 20):
+        if float(np.abs(res).max()) <= limit:
+            return t, step
+        ap = apply(p)
+        curvature = p @ ap
+        if curvature <= 0:
+            return None, step
+        alpha = rz / curvature
+        t += alpha * p
+        res -= alpha * ap
+        z = res / diag
+        rz, rz_old = res @ z, rz
+        p = z + (rz / rz_old) * p
+    return t, step + 1
+
+
+def solve(result, currents, wire_data=None, ambient=25.0, material="Cu", max_temperature=None, insulation=None):
+    """Steady conductor temperatures of a PackResult carrying currents (see wire_currents); a ThermalResult.
+
+    insulation defaults to the packing's (for the wall conductivity and the rating);
+    max_temperature overrides the rating for every wire.
+    """
+    catalog = bundle_engine.load_wire_data() if wire_data is None else bundle_engine.as_catalog(wire_data)
+    insulation = insulation or result.insulation
+    limit_value = float(max_temperature if max_temperature is not None
+                        else MAX_TEMPERATURE.get(insulation, DEFAULT_MAX_TEMPERATURE))
+    n = len(result.positions)
+    if not n:
+        empty = np.zeros(0)
+        return ThermalResult(empty, empty, empty, empty.astype(bool), ambient, ambient)
+    x, y, r_outer, core_area = bundle_engine.position_arrays(result.positions)
+    current = wire_currents(result, currents)
+
+    # heat: I² R'(T) = q0 + a T, per metre; resistivity is in ohm cm, areas in mm²
+    resistivity = bundle_engine.MATERIAL_RESISTANCE.get(material, 0.00000172) * 1e-2
+    alpha = TEMPERATURE_COEFFICIENT.get(material, 0.00393)
+    with np.errstate(divide="ignore"):
+        r20 = np.where(core_area > 0, resistivity / (STRAND_FILL * core_area * 1e-6), 0.0)
+    a = current ** 2 * r20 * alpha
+    q0 = current ** 2 * r20 * (1.0 - 20.0 * alpha)
+
+    # insulation wall resistance of each whole wire, K m / W
+    k_wall = INSULATION_CONDUCTIVITY.get(insulation, DEFAULT_CONDUCTIVITY)
+    r_core = np.minimum(np.sqrt(core_area / math.pi), 0.98 * r_outer)
+    wall = np.log(r_outer / np.maximum(r_core, 1e-6)) / (2.0 * math.pi * k_wall)
+    sector = SECTORS * wall + 1.0 / CONTACT_CONDUCTANCE
+
+    i, j = contact_pairs(x, y, r_outer)
+    g = 1.0 / (sector[i] + sector[j])
+    # outer ring: within one own radius of the bundle outline, cooled through the surface node n
+    bundle_outer = result.bundle_outer
+    outer = np.hypot(x, y) + 2.0 * r_outer >= bundle_outer - 1e-9
+    ring = np.nonzero(outer)[0]
+    i = np.concatenate([i, ring])
+    j = np.concatenate([j, np.full(len(ring), n)])
+    g = np.concatenate([g, 1.0 / sector[ring]])
+    hs = max(float(result.heatshrink or 0.0), 0.0)
+    outside = (bundle_outer + hs) * 1e-3
+    to_ambient = 1.0 / (math.log((bundle_outer + hs) / bundle_outer) / (2.0 * math.pi * HEATSHRINK_CONDUCTIVITY)
+                        + 1.0 / (SURFACE_COEFFICIENT * 2.0 * math.pi * outside))
+
+    diag = np.bincount(i, g, n + 1) + np.bincount(j, g, n + 1)
+    # a wire without contacts, off the outer ring and carrying no current has no
+    # equation to speak of: it just sits at ambient (it's no runaway, nothing heats it)
+    idle = (diag[:n] == 0) & (a == 0) & (q0 == 0)
+    diag[:n] -= a
+    diag[n] += to_ambient
+    rhs = np.append(q0, to_ambient * ambient)
+    diag[:n][idle] = 1.0
+    rhs[:n][idle] = ambient
+    t, iterations = _solve_cg(diag, i, j, g, rhs)
+    limit = np.full(n, limit_value)
+    if t is None or not np.isfinite(t).all():
+        inf = np.full(n, np.inf)
+        return ThermalResult(inf, inf, limit, outer, math.inf, ambient, True, iterations)
+    temperature = t[:n]
+    return ThermalResult(temperature, q0 + a * temperature, limit, outer, float(t[n]), ambient, False, iterations)
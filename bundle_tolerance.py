@@ -0,0 +1,228 @@
+"""Bundle Ø distribution under insulation OD tolerances (Monte Carlo).
+
+The section view packs nominal radii, but the outer diameter of real insulation
+varies from lot to lot. Catalog entries may carry a "radius_tol" (± mm on the
+radius, read as a 3-sigma bound); diameter_distribution samples radii within it
+and reports the spread of the bundle Ø, e.g. P95/P99 for picking grommets and
+clips.
+
+Tolerance model: one lot per wire type and sample, i.e. all wires of the same
+label in a bundle get the same radius factor, drawn from a normal distribution
+with sigma = tol / 3 and clipped at ±tol. Wires without a catalog tolerance (and
+Custom wires) use default_tolerance, a fraction of the radius (0 = exact).
+
+Samples are not repacked from scratch. The nominal layout is the warm start: it
+is scaled by the sample's mean radius factor and the remaining overlaps are
+pushed apart by a few relaxation steps, vectorized over a whole batch of samples
+at once. That keeps the neighbourhood of the greedy packing (as a repack of
+nearly equal radii would) at a fraction of the cost; the batches run on a
+process pool until the sample count or the time budget is reached.
+"""
+import math
+import os
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+import bundle_engine
+
+RELAX_TOL = 1e-3  # mm of remaining overlap accepted between two wires
+RELAX_STEP = 0.6  # share of an overlap each wire of the pair moves per relaxation step
+RELAX_ITERATIONS = 500
+PERCENTILES = (50, 95, 99)
+
+
+def neighbour_pairs(x, y, r, gap):
+    """Index pairs (i < j) of wires whose gap is under gap, in blocks to bound memory."""
+    first, second = [], []
+    for s in range(0, len(x), 512):
+        near = (x[s:s + 512, None] - x) ** 2 + (y[s:s + 512, None] - y) ** 2 < (r[s:s + 512, None] + r + gap) ** 2
+        a, b = np.nonzero(near)
+        a += s
+        keep = a < b
+        first.append(a[keep])
+        second.append(b[keep])
+    if not first:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    return np.concatenate(first), np.concatenate(second)
+
+
+def relax(x, y, r, i, j, iterations=RELAX_ITERATIONS):
+    """Push overlapping pairs (i, j) apart in place; x, y, r are samples x wires. Returns the steps taken."""
+    samples, n = x.shape
+    if not len(i):
+        return 0
+    offset = (np.arange(samples) * n)[:, None]
+    ii = (i + offset).ravel()
+    jj = (j + offset).ravel()
+    size = samples * n
+    for step in range(iterations):
+        dx = x[:, j] - x[:, i]
+        dy = y[:, j] - y[:, i]
+        d = np.hypot(dx, dy)
+        over = np.maximum(r[:, i] + r[:, j] - d, 0.0)
+        if over.max() < RELAX_TOL:
+            return step
+        # both wires of a pair move RELAX_STEP of the overlap apart along the centre line
+        f = RELAX_STEP * over / np.maximum(d, 1e-12)
+        px = (f * dx).ravel()
+        py = (f * dy).ravel()
+        x += (np.bincount(jj, px, size) - np.bincount(ii, px, size)).reshape(samples, n)
+        y += (np.bincount(jj, py, size) - np.bincount(ii, py, size)).reshape(samples, n)
+    return iterations
+
+
+def perturbed_outer(x0, y0, r0, types, tol, i, j, rng, count):
+    """Bundle outer radius of count samples: radii drawn per wire type, nominal layout relaxed."""
+    sigma = tol / 3.0
+    factor = 1.0 + np.clip(rng.normal(0.0, 1.0, (count, len(tol))) * sigma, -tol, tol)
+    r = r0[None, :] * factor[:, types]
+    scale = (r / r0).mean(axis=1)[:, None]
+    x = x0[None, :] * scale
+    y = y0[None, :] * scale
+    relax(x, y, r, i, j)
+    return (np.hypot(x, y) + r).max(axis=1)
+
+
+def _sample_batch(index):
+    x0, y0, r0, types, tol, i, j, seed, batch = bundle_engine.worker_job()
+    return perturbed_outer(x0, y0, r0, types, tol, i, j, np.random.default_rng([seed, index]), batch)
+
+
+@dataclass
+class ToleranceResult:
+    """Bundle Ø distribution of a tolerance run."""
+    nominal: object  # PackResult of the nominal radii
+    outer: np.ndarray = field(default_factory=lambda: np.zeros(0))  # bundle outer radius per sample, mm
+    elapsed: float = 0.0
+    batches: int = 0
+
+    @property
+    def samples(self):
+        return len(self.outer)
+
+    @property
+    def diameters(self):
+        """Ø per sample including the heat shrink wall, like diameter_with_hs."""
+        return 2.0 * (self.outer + self.nominal.heatshrink)
+
+    def percentile(self, q):
+        return float(np.percentile(self.diameters, q)) if self.samples else float("nan")
+
+    def histogram(self, bins=20):
+        """(counts, bin edges) of the sampled diameters."""
+        return np.histogram(self.diameters, bins=bins)
+
+    def summary(self, bins=20):
+        d = self.diameters
+        counts, edges = self.histogram(bins) if self.samples else (np.zeros(0, dtype=int), np.zeros(0))
+        row = {
+            "nominal": round(self.nominal.diameter_with_hs, 4),
+            "mean": round(float(d.mean()), 4) if self.samples else None,
+            "std": round(float(d.std()), 4) if self.samples else None,
+        }
+        for q in PERCENTILES:
+            row[f"p{q}"] = round(self.percentile(q), 4) if self.samples else None
+        row["max"] = round(float(d.max()), 4) if self.samples else None
+        row["samples"] = self.samples
+        row["elapsed"] = round(self.elapsed, 3)
+        row["histogram"] = {"edges": [round(float(e), 4) for e in edges], "counts": counts.tolist()}
+        return row
+
+
+def wire_tolerances(catalog, insulation, labels, radii, default_tolerance=0.0):
+    """Relative ± tolerance per label: catalog radius_tol / radius, else default_tolerance."""
+    i = catalog.insulation_id(insulation)
+    tol = []
+    for label, r in zip(labels, radii):
+        abs_tol = float(catalog.radius_tol[i, catalog.gauge_id(label)]) if label != "Custom" else 0.0
+        tol.append(abs_tol / r if abs_tol > 0 and r > 0 else float(default_tolerance))
+    return np.array(tol, dtype=float)
+
+
+def diameter_distribution(wire_counts, insulation, heatshrink=0.0, custom=None, wire_data=None, mode="pratt",
+                          samples=10000, budget=10.0, default_tolerance=0.0, workers=None, seed=0, batch=64,
+                          context=None, progress=None, stop=None):
+    """Sample the bundle Ø under radius tolerances and return a ToleranceResult.
+
+    Runs batches of batch samples until samples are done or budget seconds have
+    passed, whichever comes first (batches still running at the deadline are
+    dropped, and so are finished ones after the first of them). default_tolerance
+    is the ± fraction of the radius for wires the catalog gives no tolerance for.
+    progress(done, samples) and stop() work as in place_wires and bundle_search;
+    context names a multiprocessing start method. The same seed and batch size give
+    the same samples, whatever the worker count; a run cut short by the budget gives
+    a prefix of them.
+    """
+    catalog = bundle_engine.load_wire_data() if wire_data is None else bundle_engine.as_catalog(wire_data)
+    start = time.perf_counter()
+    deadline = start + max(0.0, float(budget))
+    nominal = bundle_engine.pack_bundle(wire_counts, insulation, heatshrink, custom, catalog, mode)
+    result = ToleranceResult(nominal)
+    samples = max(0, int(samples))
+    if not nominal.positions or not samples:
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    x0, y0, r0, _ = bundle_engine.position_arrays(nominal.positions)
+    labels = bundle_engine.position_labels(nominal.positions)
+    names = list(dict.fromkeys(labels))
+    types = np.array([names.index(label) for label in labels])
+    type_radius = [float(r0[labels.index(name)]) for name in names]
+    tol = wire_tolerances(catalog, insulation, names, type_radius, default_tolerance)
+    if not tol.any():
+        # nothing varies: every sample is the nominal packing
+        result.outer = np.full(samples, nominal.bundle_outer)
+        result.elapsed = time.perf_counter() - start
+        return result
+    # pairs that can touch once radii grow by the tolerance; a little slack for the relaxation
+    gap = 2.0 * float((tol[types] * r0).max()) + 0.1 * float(r0.max())
+    i, j = neighbour_pairs(x0, y0, r0, gap)
+    batch = max(1, int(batch))
+    n_batches = math.ceil(samples / batch)
+    job = (x0, y0, r0, types, tol, i, j, seed, batch)
+
+    done = {}
+
+    def finished():
+        if progress is not None:
+            progress(min(samples, len(done) * batch), samples)
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    with bundle_engine.job_pool(job, workers, context) as pool:
+        if pool is None:
+            for index in range(n_batches):
+                if time.perf_counter() >= deadline or (stop is not None and stop()):
+                    break
+                done[index] = _sample_batch(index)
+                finished()
+        else:
+            pending = {}
+            index = 0
+            while len(done) < n_batches:
+                now = time.perf_counter()
+                if now >= deadline or (stop is not None and stop()):
+                    break
+                # as bundle_search: two tasks per worker in flight, no more
+                while len(pending) < 2 * workers and index < n_batches:
+                    pending[index] = pool.apply_async(_sample_batch, (index,))
+                    index += 1
+                ready = [k for k, task in pending.items() if task.ready()]
+                if not ready:
+                    next(iter(pending.values())).wait(min(0.05, max(0.001, deadline - now)))
+                    continue
+                for k in ready:
+                    done[k] = pending.pop(k).get()
+                finished()
+
+    # only batches 0, 1, ... without a gap: the samples stay a prefix of the seeded
+    # stream when the deadline cut some batches short
+    prefix = 0
+    while prefix in done:
+        prefix += 1
+    if prefix:
+        result.outer = np.concatenate([done[k] for k in range(prefix)])[:samples]
+    result.batches = prefix
+    result.elapsed = time.perf_counter() - start
+    return result
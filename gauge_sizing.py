@@ -0,0 +1,168 @@
+"""Smallest wire gauges for the circuits of one bundle.
+
+Picking a gauge by hand is a loop: the bundle derating (current_limit) depends on
+how loaded the bundle is, the bundle loading percentage is the circuits' current
+over the rated current of the gauges chosen, and the gauges depend on the derating.
+size_gauges runs that loop for all circuits at once:
+
+1. start every circuit on the smallest gauge that meets its voltage drop budget
+   and its un-derated current;
+2. bundle loading = sum of currents / sum of rated currents of the chosen gauges,
+   rounded up to the next curve in LOAD_CURVES (20, 40, ... 100 %);
+3. move every circuit to the smallest gauge whose derated limit (current_limits,
+   bundle of len(current) wires at that loading) carries its current and whose
+   drop (voltage_drops) stays within budget, never to a smaller gauge than before;
+4. repeat from 2 until no gauge changes;
+5. going down: try each circuit one gauge smaller (the next one within its drop
+   budget) and keep it if every circuit still meets its derated limit at the
+   loading of the new choice; repeat until no circuit can go down.
+
+Gauges only ever grow in 2-4, so the loading only ever falls and that loop ends
+after at most one round per gauge step. Its fixed point can still be larger than
+needed (a bigger gauge elsewhere lowered the loading enough), which 5 takes back;
+every step down is checked at its own loading, so the result meets both limits.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+import bundle_engine
+
+# bundle loading curves, lowest first, as numbers for rounding up
+LOAD_STEPS = sorted(int(k) for k in bundle_engine.LOAD_CURVES)
+
+
+@dataclass
+class SizingResult:
+    gauges: list  # per circuit, None where no gauge meets both limits
+    current_limit: np.ndarray  # derated limit of the chosen gauge, A (NaN where infeasible)
+    voltage_drop: np.ndarray  # V (NaN where infeasible)
+    loading: float  # bundle loading, % (sum of currents / sum of rated currents)
+    load: str  # LOAD_CURVES key the limits were derated with
+    iterations: int
+    diameter: float  # quick bundle Ø estimate of the chosen gauges (harness_diameter), mm
+
+    @property
+    def feasible(self):
+        return all(g is not None for g in self.gauges)
+
+
+def load_step(loading):
+    """LOAD_CURVES key for a loading percentage, rounded up (100 for anything above)."""
+    for step in LOAD_STEPS:
+        if loading <= step + 1e-9:
+            return str(step)
+    return str(LOAD_STEPS[-1])
+
+
+def size_gauges(current, length, max_drop, insulation, wire_data=None, material="Cu", safety_factor=1.0,
+                gauges=None, max_iterations=100):
+    """Smallest gauges meeting derated ampacity and voltage drop for the circuits of one bundle.
+
+    current (A), length (m), max_drop (V), insulation, material and safety_factor are
+    per circuit or scalars (broadcast together); max_drop may be inf or NaN for no
+    drop limit. gauges restricts the choice to those names (default: every gauge
+    of the catalog with a current rating and conductor area). Returns a SizingResult.
+    """
+    catalog = bundle_engine.load_wire_data() if wire_data is None else bundle_engine.as_catalog(wire_data)
+    current, length, max_drop, insulation, material, safety_factor = np.broadcast_arrays(
+        np.asarray(current, dtype=float), np.asarray(length, dtype=float), np.asarray(max_drop, dtype=float),
+        np.asarray(insulation), np.asarray(material), np.asarray(safety_factor, dtype=float))
+    n = len(current)
+    names = np.array(catalog.gauges if gauges is None else [catalog.gauge_name(g) for g in gauges], dtype=str)
+
+    # circuits x gauges, gauges ordered by conductor area so "smallest" is the first fit
+    ins = catalog.insulation_codes(insulation)[:, None]
+    cols = catalog.gauge_codes(names)[None, :]
+    rated = catalog.amp_limit[ins, cols]
+    usable = catalog.has[ins, cols] & (rated > 0) & (catalog.conductor_area[ins, cols] > 0)
+    order = np.argsort(catalog.conductor_area[:, cols[0]].max(axis=0), kind="stable")
+    names, rated, usable = names[order], rated[:, order], usable[:, order]
+    drop = bundle_engine.voltage_drops(catalog, insulation[:, None], names[None, :], current[:, None],
+                                       length[:, None], material[:, None])
+    with np.errstate(invalid="ignore"):
+        fits_drop = usable & ~(drop > max_drop[:, None])  # NaN budget = no limit
+
+    def first_fit(fits, floor):
+        # smallest gauge index >= floor where fits, len(names) if none
+        fits = fits & (np.arange(len(names))[None, :] >= floor[:, None])
+        return np.where(fits.any(axis=1), fits.argmax(axis=1), len(names))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        choice = first_fit(fits_drop & (rated / safety_factor[:, None] >= current[:, None]), np.zeros(n, dtype=int))
+    iterations = 0
+    load = load_step(100.0)
+    loading = 100.0
+    while True:
+        iterations += 1
+        ok = choice < len(names)
+        picked = rated[np.arange(n), np.minimum(choice, len(names) - 1)]
+        # circuits with no fitting gauge still count, on the largest, so the loading stays honest
+        total_rated = picked.sum()
+        loading = 100.0 * current.sum() / total_rated if total_rated > 0 else 100.0
+        load = load_step(loading)
+        limits = bundle_engine.current_limits(catalog, insulation[:, None], names[None, :], n, load,
+                                              safety_factor[:, None])
+        new = first_fit(fits_drop & (limits >= current[:, None]), np.where(ok, choice, 0))
+        if np.array_equal(new, choice) or iterations >= max_iterations:
+            choice = new
+            break
+        choice = new
+
+    # going down: a step of circuit k changes the loading to (total - old + new rated) and
+    # with it the derating of every circuit, so each try is checked against all circuits
+    # at its own load step; limits per step are coeff_loads(n, step) * rated / safety factor
+    rows = np.arange(n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_amp = np.where(safety_factor == 0, np.nan, 1.0 / safety_factor)
+    coeff = bundle_engine.coeff_loads(n, np.array([str(step) for step in LOAD_STEPS]))
+    steps = np.array(LOAD_STEPS, dtype=float)
+    below = np.where(fits_drop, np.arange(len(names))[None, :], -1)  # drop-fitting gauge index or -1
+    # every round takes one circuit one gauge down, so this ends without a round limit
+    while True:
+        iterations += 1
+        fitted = choice < len(names)
+        idx = np.minimum(choice, len(names) - 1)
+        picked = rated[rows, idx]
+        # next smaller gauge within the drop budget, -1 if none
+        smaller = np.where(below < choice[:, None], below, -1).max(axis=1)
+        smaller = np.where(fitted, smaller, -1)
+        tries = np.flatnonzero(smaller >= 0)
+        if not len(tries):
+            break
+        total = picked.sum() - picked[tries] + rated[tries, smaller[tries]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            trial_loading = np.where(total > 0, 100.0 * current.sum() / total, 100.0)
+        level = np.minimum(np.searchsorted(steps, trial_loading - 1e-9), len(steps) - 1)
+        # failing circuits per load step with the current choice, then the try's own circuit swapped
+        holds = coeff[:, None] * picked[None, :] * per_amp[None, :] >= current[None, :]
+        holds |= ~fitted[None, :]
+        failing = (~holds).sum(axis=1)
+        own = coeff[level] * rated[tries, smaller[tries]] * per_amp[tries] >= current[tries]
+        fine = own & (failing[level] - ~holds[level, tries] == 0)
+        if not fine.any():
+            break
+        k = tries[fine.argmax()]
+        choice = choice.copy()
+        choice[k] = smaller[k]
+        loading, load = float(trial_loading[fine.argmax()]), str(LOAD_STEPS[level[fine.argmax()]])
+
+    ok = choice < len(names)
+    idx = np.minimum(choice, len(names) - 1)
+    limits = bundle_engine.current_limits(catalog, insulation, names[idx], n, load, safety_factor)
+    chosen = [str(names[idx[k]]) if ok[k] else None for k in range(n)]
+    counts = {}
+    for k, g in enumerate(chosen):
+        if g is not None:
+            counts[g] = counts.get(g, 0) + 1
+    # quick Ø estimate; with mixed insulations use the first circuit's table
+    diameter = bundle_engine.harness_diameter(catalog, str(insulation[0]), counts) if n else 0.0
+    return SizingResult(
+        gauges=chosen,
+        current_limit=np.where(ok, limits, np.nan),
+        voltage_drop=np.where(ok, drop[rows, idx], np.nan),
+        loading=float(loading),
+        load=load,
+        iterations=iterations,
+        diameter=diameter,
+    )
@@ -0,0 +1,638 @@
+"""Command-line entry point for batch jobs over harness data, no display needed.
+
+    python harness_cli.py pack bundles.csv -o results.jsonl --workers 8
+    python harness_cli.py export bundles.csv -d drawings --formats svg dxf
+    python harness_cli.py profile bundles.csv --id trunk-3 -o pack.prof
+    python harness_cli.py search bundles.csv --budget 30 -o best.jsonl
+    python harness_cli.py compare bundles.csv --load 60 -o insulations.jsonl
+    python harness_cli.py tolerance bundles.csv --samples 5000 --tolerance 0.03 -o spread.jsonl
+    python harness_cli.py circuits circuits.csv --max-drop 0.5 -o checked.csv
+    python harness_cli.py harness harness.json -o segments.jsonl
+    python harness_cli.py size circuits.csv --max-drop 0.5 -o sized.csv
+
+Input bundles come from CSV (columns id, insulation, heatshrink, mode, seed,
+custom_count, custom_area and one column per gauge, e.g. "22 Gauge"), from a
+JSON list or from JSON lines ({"id": ..., "insulation": "PVC", "wires":
+{"22 Gauge": 12}, "custom": [count, area], "heatshrink": 0.5, "seed": 17}).
+Results are streamed to the output file in input order, one line per bundle.
+
+Circuit tables are CSV files with the columns of CIRCUIT_FIELDS; missing cells
+fall back to the command line defaults. They are read and checked in chunks, each
+chunk in one NumPy pass, so tables of any length stream through in bounded memory.
+
+Harness topologies (segments and the circuits routed through them) are JSON files,
+see harness_topology.py.
+"""
+import argparse
+import csv
+import itertools
+import json
+import logging
+import os
+import pstats
+import sys
+from functools import partial
+from multiprocessing import Pool
+
+import numpy as np
+
+import bundle_compare
+import bundle_engine
+import bundle_export
+import bundle_search
+import bundle_tolerance
+import gauge_sizing
+import harness_topology
+from pack_cache import PackCache
+
+CSV_FIELDS = ("id", "insulation", "heatshrink", "mode", "seed", "custom_count", "custom_area")
+RESULT_FIELDS = ("id", "insulation", "mode", "seed", "wires", "diameter", "diameter_with_hs", "tried", "error")
+
+CIRCUIT_FIELDS = ("id", "gauge", "insulation", "wires", "load", "safety_factor", "current", "length", "material",
+                  "max_drop")
+CIRCUIT_RESULT_FIELDS = CIRCUIT_FIELDS + ("current_limit", "voltage_drop", "violation")
+SIZED_FIELDS = ("bundle", "id", "insulation", "current", "length", "max_drop", "material", "safety_factor", "gauge",
+                "current_limit", "voltage_drop", "loading", "load", "error")
+
+_wire_data = None  # per worker process, loaded once by _init_worker
+_cache = None
+
+
+def _init_worker(wires_path, cache_path=None):
+    global _wire_data, _cache
+    _wire_data = bundle_engine.load_wire_data(wires_path)
+    _cache = PackCache(_wire_data, path=cache_path)
+
+
+def _cell(row, key, kind, default=None):
+    """A CSV cell converted by kind; a ValueError names the column."""
+    text = (row.get(key) or "").strip()
+    if not text:
+        return default
+    try:
+        return kind(text)
+    except ValueError:
+        raise ValueError(f"{key}: expected {'an integer' if kind is int else 'a number'}, got {text!r}") from None
+
+
+def read_bundles(path):
+    """Yield bundle dicts from a CSV, JSON or JSON lines file, one at a time where possible.
+
+    A CSV row with a cell that isn't a number yields {"id": ..., "error": ...}
+    instead, which the commands write as an error row without stopping the batch.
+    """
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            for n, row in enumerate(csv.DictReader(f)):
+                bundle_id = row.get("id") or str(n)
+                try:
+                    wires = {k: _cell(row, k, int) for k, v in row.items()
+                             if k not in CSV_FIELDS and v and v.strip()}
+                    custom = None
+                    if (row.get("custom_count") or "").strip() and (row.get("custom_area") or "").strip():
+                        custom = (_cell(row, "custom_count", int), _cell(row, "custom_area", float))
+                    bundle = {
+                        "id": bundle_id,
+                        "insulation": row.get("insulation") or "PVC",
+                        "heatshrink": _cell(row, "heatshrink", float, 0.0),
+                        "mode": row.get("mode") or "pratt",
+                        "seed": _cell(row, "seed", int, 0),
+                        "wires": wires,
+                        "custom": custom,
+                    }
+                except ValueError as e:
+                    bundle = {"id": bundle_id, "error": str(e)}
+                yield bundle
+        return
+
+    with open(path, encoding="utf-8") as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == "[":
+            items = json.load(f)
+        else:
+            items = (json.loads(line) for line in f if line.strip())
+        for n, item in enumerate(items):
+            item.setdefault("id", str(n))
+            yield item
+
+
+def pack_one(bundle, positions=False, stats=False):
+    """Pack one bundle dict in a worker; errors are reported in the result row."""
+    if "error" in bundle:
+        return {"id": bundle.get("id"), "error": bundle["error"]}
+    try:
+        result = _cache.pack(bundle.get("wires", {}), bundle.get("insulation", "PVC"), bundle.get("heatshrink", 0.0),
+                             custom=bundle.get("custom"), mode=bundle.get("mode", "pratt"),
+                             seed=int(bundle.get("seed") or 0))
+    except Exception as e:
+        return {"id": bundle.get("id"), "error": str(e)}
+    return result_row(bundle, result, positions, stats)
+
+
+def export_one(bundle, directory, formats):
+    """Pack one bundle in a worker and write its drawings; the result row lists the files."""
+    if "error" in bundle:
+        return {"id": bundle.get("id"), "error": bundle["error"]}
+    try:
+        result = _cache.pack(bundle.get("wires", {}), bundle.get("insulation", "PVC"), bundle.get("heatshrink", 0.0),
+                             custom=bundle.get("custom"), mode=bundle.get("mode", "pratt"),
+                             seed=int(bundle.get("seed") or 0))
+        name = "".join(c if c.isalnum() or c in "-_." else "_" for c in str(bundle.get("id") or "bundle"))
+        files = [str(bundle_export.export(result, os.path.join(directory, f"{name}.{fmt}"), fmt, bundle.get("id")))
+                 for fmt in formats]
+    except Exception as e:
+        return {"id": bundle.get("id"), "error": str(e)}
+    row = result_row(bundle, result)
+    row["files"] = files
+    return row
+
+
+def result_row(bundle, result, positions=False, stats=False):
+    row = {
+        "id": bundle.get("id"),
+        "insulation": result.insulation,
+        "mode": result.mode,
+        "seed": result.seed,
+        "wires": result.total_wires,
+        "diameter": round(result.diameter, 4),
+        "diameter_with_hs": round(result.diameter_with_hs, 4),
+    }
+    if stats and result.stats is not None:  # None when served from the cache
+        row["stats"] = result.stats.as_dict()
+    if positions:
+        row["positions"] = [[round(x, 5), round(y, 5), r, a, label] for x, y, r, a, label in result.positions]
+    return row
+
+
+class ResultWriter:
+    """Streams result rows as JSON lines, or as CSV when the file name ends in .csv."""
+
+    def __init__(self, path):
+        self.f = sys.stdout if path == "-" else open(path, "w", newline="", encoding="utf-8")
+        self.csv = csv.DictWriter(self.f, RESULT_FIELDS, extrasaction="ignore") if path.endswith(".csv") else None
+        if self.csv:
+            self.csv.writeheader()
+
+    def write(self, row):
+        if self.csv:
+            self.csv.writerow(row)
+        else:
+            self.f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def close(self):
+        if self.f is not sys.stdout:
+            self.f.close()
+
+
+def run_pool(func, items, writer, workers, wires_path, chunksize=4, cache_path=None):
+    """Map func over items on a process pool (in-process for one worker), writing as results arrive."""
+    count = 0
+    if workers <= 1:
+        _init_worker(wires_path, cache_path)
+        for row in map(func, items):
+            writer.write(row)
+            count += 1
+        return count
+    with Pool(workers, initializer=_init_worker, initargs=(wires_path, cache_path)) as pool:
+        for row in pool.imap(func, items, chunksize=chunksize):
+            writer.write(row)
+            count += 1
+    return count
+
+
+def cmd_pack(args):
+    writer = ResultWriter(args.output)
+    try:
+        func = partial(pack_one, positions=args.positions, stats=args.stats)
+        count = run_pool(func, read_bundles(args.input), writer, args.workers, args.wires, args.chunksize, args.cache)
+    finally:
+        writer.close()
+    print(f"packed {count} bundles -> {args.output}", file=sys.stderr)
+
+
+def cmd_export(args):
+    os.makedirs(args.directory, exist_ok=True)
+    writer = ResultWriter(args.output)
+    try:
+        func = partial(export_one, directory=args.directory, formats=args.formats)
+        count = run_pool(func, read_bundles(args.input), writer, args.workers, args.wires, args.chunksize, args.cache)
+    finally:
+        writer.close()
+    print(f"exported {count} bundles -> {args.directory}", file=sys.stderr)
+
+
+def cmd_profile(args):
+    """Pack one bundle under cProfile (no cache), dump the profile and print the hottest calls."""
+    wire_data = bundle_engine.load_wire_data(args.wires)
+    for bundle in read_bundles(args.input):
+        if args.id is None or str(bundle.get("id")) == args.id:
+            break
+    else:
+        sys.exit(f"no bundle with id {args.id} in {args.input}")
+    if "error" in bundle:
+        sys.exit(f"{bundle.get('id')}: {bundle['error']}")
+    result = bundle_engine.profile_call(args.output, bundle_engine.pack_bundle, bundle.get("wires", {}),
+                                        bundle.get("insulation", "PVC"), bundle.get("heatshrink", 0.0),
+                                        custom=bundle.get("custom"), wire_data=wire_data,
+                                        mode=args.mode or bundle.get("mode", "pratt"), seed=int(bundle.get("seed") or 0))
+    print(f"{bundle.get('id')}: Ø {result.diameter:.3f} mm, {result.stats.summary()}", file=sys.stderr)
+    print(f"profile written to {args.output}", file=sys.stderr)
+    pstats.Stats(args.output, stream=sys.stderr).sort_stats(args.sort).print_stats(args.top)
+
+
+def cmd_search(args):
+    """Multi-start search per bundle, one bundle at a time, each using the whole pool for --budget seconds."""
+    wire_data = bundle_engine.load_wire_data(args.wires)
+    writer = ResultWriter(args.output)
+    count = 0
+    try:
+        for bundle in read_bundles(args.input):
+            if "error" in bundle:
+                writer.write({"id": bundle.get("id"), "error": bundle["error"]})
+                continue
+            try:
+                search = bundle_search.search(bundle.get("wires", {}), bundle.get("insulation", "PVC"),
+                                              bundle.get("heatshrink", 0.0), custom=bundle.get("custom"),
+                                              wire_data=wire_data, mode=args.mode or bundle.get("mode", "pratt"),
+                                              budget=args.budget, workers=args.workers)
+            except Exception as e:
+                writer.write({"id": bundle.get("id"), "error": str(e)})
+                continue
+            if search.best is None:
+                row = {"id": bundle.get("id"), "tried": 0, "error": f"no packing finished in {args.budget:g} s"}
+            else:
+                row = result_row(bundle, search.best, args.positions)
+                row["tried"] = search.tried
+                row["history"] = [[round(t, 3), seed, round(d, 4)] for t, seed, d in search.history]
+            writer.write(row)
+            count += 1
+    finally:
+        writer.close()
+    print(f"searched {count} bundles -> {args.output}", file=sys.stderr)
+
+
+def cmd_compare(args):
+    """Every bundle with every insulation (or --insulations), the insulations of a bundle packed in parallel."""
+    wire_data = bundle_engine.load_wire_data(args.wires)
+    cache = PackCache(wire_data, path=args.cache) if args.cache else None
+    writer = ResultWriter(args.output)
+    count = 0
+    try:
+        for bundle in read_bundles(args.input):
+            if "error" in bundle:
+                writer.write({"id": bundle.get("id"), "error": bundle["error"]})
+                continue
+            try:
+                rows = bundle_compare.compare_insulations(
+                    bundle.get("wires", {}), bundle.get("heatshrink", 0.0), custom=bundle.get("custom"),
+                    wire_data=wire_data, mode=args.mode or bundle.get("mode", "pratt"),
+                    insulations=args.insulations, load=args.load, safety_factor=args.safety_factor,
+                    material=args.material, workers=args.workers, cache=cache)
+            except Exception as e:
+                writer.write({"id": bundle.get("id"), "error": str(e)})
+                continue
+            for row in rows:
+                writer.write({"id": bundle.get("id"), **row.as_dict()})
+            count += 1
+    finally:
+        writer.close()
+        if cache is not None:
+            cache.close()
+    print(f"compared {count} bundles -> {args.output}", file=sys.stderr)
+
+
+def cmd_tolerance(args):
+    """Ø distribution per bundle under insulation tolerances, one bundle at a time on the whole pool."""
+    wire_data = bundle_engine.load_wire_data(args.wires)
+    writer = ResultWriter(args.output)
+    count = 0
+    try:
+        for bundle in read_bundles(args.input):
+            if "error" in bundle:
+                writer.write({"id": bundle.get("id"), "error": bundle["error"]})
+                continue
+            try:
+                spread = bundle_tolerance.diameter_distribution(
+                    bundle.get("wires", {}), bundle.get("insulation", "PVC"), bundle.get("heatshrink", 0.0),
+                    custom=bundle.get("custom"), wire_data=wire_data, mode=args.mode or bundle.get("mode", "pratt"),
+                    samples=args.samples, budget=args.budget, default_tolerance=args.tolerance,
+                    workers=args.workers, seed=args.seed)
+            except Exception as e:
+                writer.write({"id": bundle.get("id"), "error": str(e)})
+                continue
+            row = {"id": bundle.get("id"), "insulation": bundle.get("insulation", "PVC")}
+            row.update(spread.summary(args.bins))
+            if spread.samples < args.samples:
+                row["error"] = f"{spread.samples} of {args.samples} samples within {args.budget:g} s"
+            writer.write(row)
+            count += 1
+    finally:
+        writer.close()
+    print(f"sampled {count} bundles -> {args.output}", file=sys.stderr)
+
+
+def _numbers(rows, name, default, errors):
+    """One float column of a chunk; cells that don't parse become NaN and are noted in errors."""
+    values = np.empty(len(rows))
+    for k, row in enumerate(rows):
+        text = (row.get(name) or "").strip()
+        try:
+            values[k] = float(text) if text else default
+        except ValueError:
+            values[k] = np.nan
+            errors[k].append(f"bad {name}")
+    return values
+
+
+def check_circuits(rows, wire_data, args):
+    """Derated current limit, voltage drop and violations for a chunk of circuit rows."""
+    errors = [[] for _ in rows]
+    known = set(wire_data.gauges)
+    gauge = []
+    for k, row in enumerate(rows):
+        g = wire_data.gauge_name(row.get("gauge"))
+        if g not in known:
+            errors[k].append(f"unknown gauge {g!r}")
+        gauge.append(g)
+    insulation = [(row.get("insulation") or "").strip() or args.insulation for row in rows]
+    load = [(row.get("load") or "").strip() or args.load for row in rows]
+    material = [(row.get("material") or "").strip() or args.material for row in rows]
+    wires = _numbers(rows, "wires", 1.0, errors)
+    safety = _numbers(rows, "safety_factor", args.safety_factor, errors)
+    current = _numbers(rows, "current", np.nan, errors)
+    length = _numbers(rows, "length", np.nan, errors)
+    max_drop = _numbers(rows, "max_drop", np.nan if args.max_drop is None else args.max_drop, errors)
+
+    limit = bundle_engine.current_limits(wire_data, insulation, gauge, wires, load, safety)
+    limit[[g not in known for g in gauge]] = np.nan  # no amp_limit, not a 0 A limit
+    drop = bundle_engine.voltage_drops(wire_data, insulation, gauge, current, length, material)
+    with np.errstate(invalid="ignore"):
+        over_current = current > limit
+        over_drop = drop > max_drop
+    out = []
+    for k, row in enumerate(rows):
+        flags = []
+        if not errors[k]:
+            if over_current[k]:
+                flags.append("current")
+            if over_drop[k]:
+                flags.append("drop")
+            if np.isnan(limit[k]):
+                errors[k].append("safety factor 0")
+            if np.isnan(drop[k]) and not np.isnan(current[k]) and not np.isnan(length[k]):
+                errors[k].append(f"no conductor area for {gauge[k]}")
+        result = {name: row.get(name, "") for name in CIRCUIT_FIELDS}
+        result.update({
+            "gauge": gauge[k],
+            "insulation": insulation[k],
+            "load": load[k],
+            "material": material[k],
+            "safety_factor": safety[k],
+            "current_limit": None if np.isnan(limit[k]) else round(float(limit[k]), 4),
+            "voltage_drop": None if np.isnan(drop[k]) else round(float(drop[k]), 5),
+            "violation": "+".join(flags + ["error: " + ", ".join(errors[k])] if errors[k] else flags),
+        })
+        out.append(result)
+    return out
+
+
+def cmd_circuits(args):
+    wire_data = bundle_engine.load_wire_data(args.wires)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    writer = csv.DictWriter(out, CIRCUIT_RESULT_FIELDS, extrasaction="ignore") if args.output.endswith(".csv") else None
+    if writer:
+        writer.writeheader()
+    total = violations = 0
+    try:
+        with open(args.input, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            while True:
+                rows = list(itertools.islice(reader, args.chunk))
+                if not rows:
+                    break
+                for result in check_circuits(rows, wire_data, args):
+                    if args.violations_only and not result["violation"]:
+                        continue
+                    if writer:
+                        writer.writerow(result)
+                    else:
+                        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    violations += bool(result["violation"])
+                total += len(rows)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"checked {total} circuits, {violations} flagged -> {args.output}", file=sys.stderr)
+
+
+def size_bundle(bundle, rows, wire_data, args):
+    """Gauge sizing rows for the circuits of one bundle."""
+    errors = [[] for _ in rows]
+    current = _numbers(rows, "current", np.nan, errors)
+    length = _numbers(rows, "length", np.nan, errors)
+    max_drop = _numbers(rows, "max_drop", np.nan if args.max_drop is None else args.max_drop, errors)
+    safety = _numbers(rows, "safety_factor", args.safety_factor, errors)
+    insulation = [(row.get("insulation") or "").strip() or args.insulation for row in rows]
+    material = [(row.get("material") or "").strip() or args.material for row in rows]
+    for k in range(len(rows)):
+        if np.isnan(current[k]) or np.isnan(length[k]):
+            errors[k].append("current and length are needed")
+    valid = np.array([not e for e in errors], dtype=bool)
+    sized = gauge_sizing.size_gauges(current[valid], length[valid], max_drop[valid], np.array(insulation)[valid],
+                                     wire_data, np.array(material)[valid], safety[valid], args.gauges)
+    out = []
+    k_valid = 0
+    for k, row in enumerate(rows):
+        result = {
+            "bundle": bundle,
+            "id": row.get("id", ""),
+            "insulation": insulation[k],
+            "current": None if np.isnan(current[k]) else float(current[k]),
+            "length": None if np.isnan(length[k]) else float(length[k]),
+            "max_drop": None if np.isnan(max_drop[k]) else float(max_drop[k]),
+            "material": material[k],
+            "safety_factor": float(safety[k]),
+            "loading": round(sized.loading, 2),
+            "load": sized.load,
+            "error": ", ".join(errors[k]),
+        }
+        if valid[k]:
+            gauge = sized.gauges[k_valid]
+            result["gauge"] = gauge
+            if gauge is None:
+                result["error"] = "no gauge meets the current and drop limits"
+            else:
+                result["current_limit"] = round(float(sized.current_limit[k_valid]), 4)
+                result["voltage_drop"] = round(float(sized.voltage_drop[k_valid]), 5)
+            k_valid += 1
+        out.append(result)
+    return out, sized
+
+
+def cmd_size(args):
+    """Smallest gauge per circuit, one solve per bundle (the bundle column, or the whole file)."""
+    wire_data = bundle_engine.load_wire_data(args.wires)
+    bundles = {}
+    with open(args.input, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            bundles.setdefault((row.get("bundle") or "").strip(), []).append(row)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    writer = csv.DictWriter(out, SIZED_FIELDS, extrasaction="ignore") if args.output.endswith(".csv") else None
+    if writer:
+        writer.writeheader()
+    try:
+        for bundle, rows in bundles.items():
+            results, sized = size_bundle(bundle, rows, wire_data, args)
+            for result in results:
+                if writer:
+                    writer.writerow(result)
+                else:
+                    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            print(f"bundle {bundle or '-'}: {len(rows)} circuits, loading {sized.loading:.1f}% "
+                  f"({sized.load} % curve) after {sized.iterations} rounds, Ø ~{sized.diameter:.2f} mm",
+                  file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def cmd_harness(args):
+    """Ø and derating of every segment of a harness, and each circuit's limit along its route."""
+    if args.output.endswith(".csv"):
+        sys.exit("harness rows come in two shapes (segments, circuits), write them as JSON lines")
+    wire_data = bundle_engine.load_wire_data(args.wires)
+    try:
+        harness = harness_topology.load_topology(args.input, wire_data)
+        if args.mode:
+            harness.mode = args.mode
+        harness.evaluate()
+    except harness_topology.TopologyError as e:
+        sys.exit(f"{args.input}: {e}")
+    writer = ResultWriter(args.output)
+    try:
+        for row in harness.segment_rows():
+            writer.write(row)
+        for row in harness.circuit_rows():
+            if not args.overloaded_only or row["overloaded"]:
+                writer.write(row)
+    finally:
+        writer.close()
+    overloaded = sum(bool(result.overloaded) for result in harness.circuit_results.values())
+    print(f"{len(harness.segments)} segments ({harness.packed} packings), {len(harness.circuits)} circuits, "
+          f"{overloaded} overloaded -> {args.output}", file=sys.stderr)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="HarnessHelper batch tools")
+    parser.add_argument("--wires", default=str(bundle_engine.WIRES_JSON), help="wire table (default: wires.json)")
+    parser.add_argument("--cache", help="SQLite file for memoized packings shared across runs")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log a timing/counter line per packing")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("pack", help="pack bundle sections from a CSV/JSON file")
+    p.add_argument("input", help="bundles as .csv, .json or .jsonl")
+    p.add_argument("-o", "--output", default="-", help="result file, .csv or JSON lines (default: stdout)")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    p.add_argument("--chunksize", type=int, default=4, help="bundles handed to a worker at a time")
+    p.add_argument("--positions", action="store_true", help="include wire positions in JSON output")
+    p.add_argument("--stats", action="store_true", help="include packing counters and phase timings in JSON output")
+    p.set_defaults(func=cmd_pack)
+
+    p = sub.add_parser("export", help="pack bundles and write each section as SVG/DXF/JSON drawings")
+    p.add_argument("input", help="bundles as .csv, .json or .jsonl")
+    p.add_argument("-d", "--directory", default=".", help="folder for the drawings, one file per bundle and format")
+    p.add_argument("--formats", nargs="+", default=["svg"], choices=bundle_export.FORMATS, help="default: svg")
+    p.add_argument("-o", "--output", default="-", help="result rows, .csv or JSON lines (default: stdout)")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    p.add_argument("--chunksize", type=int, default=4, help="bundles handed to a worker at a time")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("search", help="smallest bundle Ø each bundle reaches within a time budget")
+    p.add_argument("input", help="bundles as .csv, .json or .jsonl")
+    p.add_argument("-o", "--output", default="-", help="result file, .csv or JSON lines (default: stdout)")
+    p.add_argument("--budget", type=float, default=10.0, help="seconds per bundle (default: 10)")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    p.add_argument("--mode", choices=bundle_engine.MODES, help="override the bundles' packing mode")
+    p.add_argument("--positions", action="store_true", help="include wire positions in JSON output")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("compare", help="Ø, heat-shrink Ø, weight and derated currents of each bundle per insulation")
+    p.add_argument("input", help="bundles as .csv, .json or .jsonl (their insulation column is ignored)")
+    p.add_argument("-o", "--output", default="-", help="JSON lines, one per bundle and insulation (default: stdout)")
+    p.add_argument("--insulations", nargs="+", help="insulations to compare (default: all in the wire table)")
+    p.add_argument("--load", default="100", help="bundle load %% for the derated currents (default: 100)")
+    p.add_argument("--safety-factor", type=float, default=1.0, help="safety factor for the derated currents")
+    p.add_argument("--material", default="Cu", choices=sorted(bundle_engine.MATERIAL_RESISTANCE),
+                   help="conductor material for the weight")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    p.add_argument("--mode", choices=bundle_engine.MODES, help="override the bundles' packing mode")
+    p.set_defaults(func=cmd_compare)
+
+    p = sub.add_parser("tolerance", help="bundle Ø distribution (mean, percentiles, histogram) under OD tolerances")
+    p.add_argument("input", help="bundles as .csv, .json or .jsonl")
+    p.add_argument("-o", "--output", default="-", help="JSON lines (default: stdout)")
+    p.add_argument("--samples", type=int, default=10000, help="perturbed packings per bundle (default: 10000)")
+    p.add_argument("--budget", type=float, default=10.0, help="seconds per bundle (default: 10)")
+    p.add_argument("--tolerance", type=float, default=0.0,
+                   help="± radius fraction for wires without radius_tol in the wire table (default: 0)")
+    p.add_argument("--bins", type=int, default=20, help="histogram bins (default: 20)")
+    p.add_argument("--seed", type=int, default=0, help="sampling seed")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    p.add_argument("--mode", choices=bundle_engine.MODES, help="override the bundles' packing mode")
+    p.set_defaults(func=cmd_tolerance)
+
+    p = sub.add_parser("circuits", help="derated current limits and voltage drops for a CSV of circuits")
+    p.add_argument("input", help="circuits CSV (columns: " + ", ".join(CIRCUIT_FIELDS) + ")")
+    p.add_argument("-o", "--output", default="-", help="result file, .csv or JSON lines (default: stdout)")
+    p.add_argument("--insulation", default="PVC", help="insulation where the column is empty")
+    p.add_argument("--load", default="100", help="bundle load %% where the column is empty")
+    p.add_argument("--material", default="Cu", choices=sorted(bundle_engine.MATERIAL_RESISTANCE),
+                   help="conductor material where the column is empty")
+    p.add_argument("--safety-factor", type=float, default=1.0, help="safety factor where the column is empty")
+    p.add_argument("--max-drop", type=float, help="allowed voltage drop (V) where the column is empty")
+    p.add_argument("--violations-only", action="store_true", help="only write flagged circuits")
+    p.add_argument("--chunk", type=int, default=50000, help="circuits computed per NumPy pass")
+    p.set_defaults(func=cmd_circuits)
+
+    p = sub.add_parser("size", help="smallest gauge per circuit meeting derated current and voltage drop")
+    p.add_argument("input", help="circuits CSV (columns: bundle, id, insulation, current, length, max_drop, "
+                                 "material, safety_factor; one solve per bundle)")
+    p.add_argument("-o", "--output", default="-", help="result file, .csv or JSON lines (default: stdout)")
+    p.add_argument("--insulation", default="PVC", help="insulation where the column is empty")
+    p.add_argument("--material", default="Cu", choices=sorted(bundle_engine.MATERIAL_RESISTANCE),
+                   help="conductor material where the column is empty")
+    p.add_argument("--safety-factor", type=float, default=1.0, help="safety factor where the column is empty")
+    p.add_argument("--max-drop", type=float, help="allowed voltage drop (V) where the column is empty")
+    p.add_argument("--gauges", nargs="+", help="only choose from these gauges (default: all in the wire table)")
+    p.set_defaults(func=cmd_size)
+
+    p = sub.add_parser("harness", help="Ø per segment and derated circuit limits of a harness topology")
+    p.add_argument("input", help="topology JSON (segments and circuits with their routes)")
+    p.add_argument("-o", "--output", default="-", help="JSON lines, segments first (default: stdout)")
+    p.add_argument("--mode", choices=bundle_engine.MODES, help="override the topology's default packing mode")
+    p.add_argument("--overloaded-only", action="store_true", help="only write circuits over their limit")
+    p.set_defaults(func=cmd_harness)
+
+    p = sub.add_parser("profile", help="profile packing one bundle with cProfile")
+    p.add_argument("input", help="bundles as .csv, .json or .jsonl")
+    p.add_argument("--id", help="bundle to pack (default: the first one)")
+    p.add_argument("--mode", choices=bundle_engine.MODES, help="override the bundle's packing mode")
+    p.add_argument("-o", "--output", default="pack.prof", help="profile dump (default: pack.prof)")
+    p.add_argument("--sort", default="cumulative", help="pstats sort key for the printed summary")
+    p.add_argument("--top", type=int, default=25, help="number of functions printed")
+    p.set_defaults(func=cmd_profile)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO, format="%(processName)s %(message)s")
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
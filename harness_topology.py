@@ -0,0 +1,366 @@
+"""Harness topology: segments joined at breakouts and splices, circuits routed through them.
+
+Every segment is a bundle section of its own, carrying one wire per circuit routed
+through it (insulations may be mixed). Harness.evaluate() packs each segment for its
+Ø and derates each circuit with the same bundle curves as current_limit, using the
+wire count of every segment it passes through; the tightest segment sets the limit.
+
+The harness keeps the segment -> circuits graph, so after a change only the
+segments the changed circuit runs through (on its old and new route) are evaluated
+again, and a segment whose wire mix did not change (say only a current changed)
+keeps its packing.
+
+    harness = load_topology("harness.json")
+    harness.evaluate()
+    harness.update_circuit("C12", gauge="20 Gauge")
+    harness.evaluate()  # repacks only the segments C12 runs through
+
+Topology files are JSON:
+
+    {"mode": "front", "load": "60", "safety_factor": 1.0, "insulation": "PVC",
+     "segments": [{"id": "S1", "from": "ECU", "to": "BK1", "heatshrink": 0.5, "load": "80"}, ...],
+     "circuits": [{"id": "C1", "gauge": "22", "insulation": "TXL", "current": 2.5,
+                   "route": ["S1", "S2"]}, ...]}
+
+Segment load/mode/heatshrink and circuit insulation/safety_factor fall back to the
+top-level defaults; a route lists adjoining segments in order.
+"""
+import json
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+import bundle_engine
+
+
+class TopologyError(ValueError):
+    """The topology refers to unknown segments or wires, or a route is broken."""
+
+
+@dataclass(frozen=True)
+class Segment:
+    id: str
+    start: str  # breakout / splice / connector names at either end
+    end: str
+    heatshrink: float = 0.0
+    load: str = None  # bundle loading percentage, None for the harness default
+    mode: str = None  # packing mode, None for the harness default
+
+
+@dataclass(frozen=True)
+class Circuit:
+    id: str
+    gauge: str
+    route: tuple  # segment ids, in order
+    insulation: str = None  # None for the harness default
+    current: float = None  # A, optional, checked against the derated limit
+    safety_factor: float = None  # None for the harness default
+
+
+@dataclass
+class SegmentResult:
+    segment: Segment
+    pack: object  # PackResult of the segment's wires
+    circuits: tuple  # circuit ids through the segment
+    derating: float  # coeff_load for the segment's wire count and load
+
+    @property
+    def wires(self):
+        return len(self.circuits)
+
+    @property
+    def diameter(self):
+        return self.pack.diameter
+
+    @property
+    def diameter_with_hs(self):
+        return self.pack.diameter_with_hs
+
+
+@dataclass
+class CircuitResult:
+    circuit: Circuit
+    current_limit: float  # A, lowest derated limit along the route
+    limiting_segment: str  # segment that sets it
+
+    @property
+    def overloaded(self):
+        """True/False if the circuit has a current, None otherwise."""
+        if self.circuit.current is None:
+            return None
+        return self.circuit.current > self.current_limit
+
+
+class Harness:
+    def __init__(self, segments, circuits=(), wire_data=None, insulation=None, load="60", safety_factor=1.0,
+                 mode="pratt"):
+        self.catalog = bundle_engine.load_wire_data() if wire_data is None else bundle_engine.as_catalog(wire_data)
+        self.insulation = insulation or self.catalog.insulations[0]
+        self.load = str(load)
+        self.safety_factor = float(safety_factor)
+        self.mode = mode
+        self.segments = {}
+        self.circuits = {}
+        self.segment_results = {}
+        self.circuit_results = {}
+        self.packed = 0  # segment packings actually run, for checking incremental updates
+        self._nodes = {}  # node -> segment ids ending there
+        self._through = {}  # segment id -> ids of the circuits routed through it
+        self._dirty_segments = set()
+        self._dirty_circuits = set()
+        self._mix = {}  # segment id -> packing key of its last evaluation
+        self._packs = {}  # packing key -> PackResult, shared by segments with the same wire mix
+        for segment in segments:
+            self.add_segment(segment)
+        for circuit in circuits:
+            self.add_circuit(circuit)
+
+    # -- editing -------------------------------------------------------------
+
+    def add_segment(self, segment):
+        if segment.id in self.segments:
+            raise TopologyError(f"duplicate segment {segment.id!r}")
+        if (segment.mode or self.mode) not in bundle_engine.MODES:
+            raise TopologyError(f"segment {segment.id}: unknown packing mode {segment.mode!r}")
+        self.segments[segment.id] = segment
+        self._through[segment.id] = set()
+        for node in (segment.start, segment.end):
+            self._nodes.setdefault(node, set()).add(segment.id)
+        self._dirty_segments.add(segment.id)
+
+    def update_segment(self, segment_id, **changes):
+        """Change heatshrink, load or mode of a segment; only that segment is evaluated again."""
+        old = self._segment(segment_id)
+        if "start" in changes or "end" in changes:
+            raise TopologyError("segment ends can't be moved, remove its circuits and add a new segment")
+        new = replace(old, **changes)
+        if (new.mode or self.mode) not in bundle_engine.MODES:
+            raise TopologyError(f"segment {segment_id}: unknown packing mode {new.mode!r}")
+        self.segments[segment_id] = new
+        self._touch(segment_id)
+
+    def add_circuit(self, circuit):
+        if circuit.id in self.circuits:
+            raise TopologyError(f"duplicate circuit {circuit.id!r}")
+        circuit = self._checked(circuit)
+        self.circuits[circuit.id] = circuit
+        for segment_id in circuit.route:
+            self._through[segment_id].add(circuit.id)
+            self._touch(segment_id)
+
+    def remove_circuit(self, circuit_id):
+        circuit = self._circuit(circuit_id)
+        del self.circuits[circuit_id]
+        self.circuit_results.pop(circuit_id, None)
+        self._dirty_circuits.discard(circuit_id)
+        for segment_id in circuit.route:
+            self._through[segment_id].discard(circuit_id)
+            self._touch(segment_id)
+
+    def update_circuit(self, circuit_id, **changes):
+        """Change gauge, insulation, current, safety_factor or route of a circuit.
+
+        Marks the segments on its old and new route for re-evaluation, nothing else.
+        """
+        old = self._circuit(circuit_id)
+        if "route" in changes:
+            changes["route"] = tuple(changes["route"])
+        new = self._checked(replace(old, **changes))
+        self.circuits[circuit_id] = new
+        for segment_id in old.route:
+            self._through[segment_id].discard(circuit_id)
+        for segment_id in new.route:
+            self._through[segment_id].add(circuit_id)
+        for segment_id in set(old.route) | set(new.route):
+            self._touch(segment_id)
+        self._dirty_circuits.add(circuit_id)
+
+    def _touch(self, segment_id):
+        # a segment's derating feeds every circuit through it, not just the changed one
+        self._dirty_segments.add(segment_id)
+        self._dirty_circuits.update(self._through[segment_id])
+
+    def _segment(self, segment_id):
+        try:
+            return self.segments[segment_id]
+        except KeyError:
+            raise TopologyError(f"unknown segment {segment_id!r}") from None
+
+    def _circuit(self, circuit_id):
+        try:
+            return self.circuits[circuit_id]
+        except KeyError:
+            raise TopologyError(f"unknown circuit {circuit_id!r}") from None
+
+    def _checked(self, circuit):
+        """circuit with its gauge name normalized, after checking its wire and route."""
+        circuit = replace(circuit, gauge=self.catalog.gauge_name(circuit.gauge), route=tuple(circuit.route))
+        insulation = circuit.insulation or self.insulation
+        if insulation not in self.catalog.insulation_ids:
+            raise TopologyError(f"circuit {circuit.id}: unknown insulation {insulation!r}")
+        if not self.catalog.has[self.catalog.insulation_id(insulation), self.catalog.gauge_id(circuit.gauge)]:
+            raise TopologyError(f"circuit {circuit.id}: no {insulation} data for {circuit.gauge}")
+        if not circuit.route:
+            raise TopologyError(f"circuit {circuit.id}: empty route")
+        if len(set(circuit.route)) != len(circuit.route):
+            raise TopologyError(f"circuit {circuit.id}: route passes a segment twice")
+        segments = [self._segment(segment_id) for segment_id in circuit.route]
+        # walk the route from either end of its first segment: each next segment has to go
+        # on from the node reached so far, sharing any node is not enough (A-B, B-C, B-D branches)
+        reached = 0
+        for node in (segments[0].end, segments[0].start):
+            k = 1
+            while k < len(segments) and node in (segments[k].start, segments[k].end):
+                node = segments[k].end if node == segments[k].start else segments[k].start
+                k += 1
+            if k == len(segments):
+                return circuit
+            reached = max(reached, k)
+        a, b = segments[reached - 1], segments[reached]
+        raise TopologyError(f"circuit {circuit.id}: segment {b.id} doesn't continue the route after {a.id}")
+
+    # -- evaluation ------------------------------------------------------------
+
+    def evaluate(self, progress=None):
+        """Bring segment_results and circuit_results up to date; return the ids of the segments evaluated.
+
+        progress, if given, is called as progress(done, total) per segment.
+        """
+        dirty = sorted(self._dirty_segments)
+        for k, segment_id in enumerate(dirty):
+            if progress is not None:
+                progress(k, len(dirty))
+            self.segment_results[segment_id] = self._evaluate_segment(segment_id)
+        # drop packings no segment uses any more
+        keys = set(self._mix.values())
+        self._packs = {key: pack for key, pack in self._packs.items() if key in keys}
+        self._evaluate_circuits(sorted(self._dirty_circuits))
+        self._dirty_segments.clear()
+        self._dirty_circuits.clear()
+        if progress is not None:
+            progress(len(dirty), len(dirty))
+        return dirty
+
+    def _evaluate_segment(self, segment_id):
+        segment = self.segments[segment_id]
+        circuits = tuple(sorted(self._through[segment_id]))
+        mode = segment.mode or self.mode
+        mix = {}
+        for circuit_id in circuits:
+            circuit = self.circuits[circuit_id]
+            wire = (circuit.insulation or self.insulation, circuit.gauge)
+            mix[wire] = mix.get(wire, 0) + 1
+        key = (mode, tuple(sorted(mix.items())))
+        self._mix[segment_id] = key
+        pack = self._packs.get(key)
+        if pack is None:
+            pack = self._pack(mix, mode)
+            self._packs[key] = pack
+            self.packed += 1
+        # heat shrink only changes the reported Ø, so segments can share a packing
+        pack = replace(pack, heatshrink=max(0.0, float(segment.heatshrink or 0.0)))
+        derating = bundle_engine.coeff_load(len(circuits), segment.load or self.load)
+        return SegmentResult(segment, pack, circuits, derating)
+
+    def _pack(self, mix, mode):
+        catalog = self.catalog
+        insulations = sorted({insulation for insulation, _ in mix})
+        entries = []
+        counts = {}
+        for (insulation, gauge), count in mix.items():
+            i, j = catalog.insulation_id(insulation), catalog.gauge_id(gauge)
+            # wires of different insulation but the same gauge are told apart in the section
+            label = gauge if len(insulations) == 1 else f"{gauge} ({insulation})"
+            entries.extend([(float(catalog.radius[i, j]), float(catalog.pack_area[i, j]), label)] * count)
+            counts[label] = count
+        largest = max(entry[0] for entry in entries) if entries else 0.0
+        cell_size = max([bundle_engine.grid_cell_size(catalog, insulation, largest) for insulation in insulations],
+                        default=0.0)
+        return bundle_engine.pack_entries(entries, cell_size, 0.0, "+".join(insulations), mode, counts)
+
+    def _evaluate_circuits(self, circuit_ids):
+        # one current_limits pass over every (circuit, segment on its route) pair
+        pairs = [(circuit_id, segment_id) for circuit_id in circuit_ids
+                 for segment_id in self.circuits[circuit_id].route]
+        if not pairs:
+            return
+        circuits = [self.circuits[circuit_id] for circuit_id, _ in pairs]
+        segments = [self.segments[segment_id] for _, segment_id in pairs]
+        limits = bundle_engine.current_limits(
+            self.catalog,
+            [c.insulation or self.insulation for c in circuits],
+            [c.gauge for c in circuits],
+            [len(self._through[s.id]) for s in segments],
+            [s.load or self.load for s in segments],
+            [self.safety_factor if c.safety_factor is None else c.safety_factor for c in circuits])
+        start = 0
+        for circuit_id in circuit_ids:
+            route = self.circuits[circuit_id].route
+            k = start + int(np.argmin(limits[start:start + len(route)]))
+            self.circuit_results[circuit_id] = CircuitResult(self.circuits[circuit_id], float(limits[k]),
+                                                             pairs[k][1])
+            start += len(route)
+
+    # -- output ------------------------------------------------------------------
+
+    def segment_rows(self):
+        rows = []
+        for segment_id in self.segments:
+            result = self.segment_results.get(segment_id)
+            if result is None:
+                continue
+            segment = result.segment
+            rows.append({
+                "segment": segment_id,
+                "from": segment.start,
+                "to": segment.end,
+                "wires": result.wires,
+                "diameter": round(result.diameter, 4),
+                "diameter_with_hs": round(result.diameter_with_hs, 4),
+                "load": segment.load or self.load,
+                "derating": round(result.derating, 4),
+                "mode": segment.mode or self.mode,
+            })
+        return rows
+
+    def circuit_rows(self):
+        rows = []
+        for circuit_id in self.circuits:
+            result = self.circuit_results.get(circuit_id)
+            if result is None:
+                continue
+            circuit = result.circuit
+            rows.append({
+                "circuit": circuit_id,
+                "gauge": circuit.gauge,
+                "insulation": circuit.insulation or self.insulation,
+                "route": list(circuit.route),
+                "current": circuit.current,
+                "current_limit": None if np.isnan(result.current_limit) else round(result.current_limit, 4),
+                "limiting_segment": result.limiting_segment,
+                "overloaded": result.overloaded,
+            })
+        return rows
+
+
+def harness_from_dict(data, wire_data=None):
+    """Harness from a parsed topology file (see the module docstring)."""
+    def number(value):
+        return None if value in (None, "") else float(value)
+
+    try:
+        segments = [Segment(str(s["id"]), str(s["from"]), str(s["to"]), float(s.get("heatshrink") or 0.0),
+                            None if s.get("load") in (None, "") else str(s["load"]), s.get("mode") or None)
+                    for s in data["segments"]]
+        circuits = [Circuit(str(c["id"]), str(c["gauge"]), tuple(str(r) for r in c["route"]),
+                            c.get("insulation") or None, number(c.get("current")), number(c.get("safety_factor")))
+                    for c in data.get("circuits", [])]
+    except KeyError as e:
+        raise TopologyError(f"missing field {e}") from None
+    return Harness(segments, circuits, wire_data, data.get("insulation"), data.get("load", "60"),
+                   data.get("safety_factor", 1.0), data.get("mode", "pratt"))
+
+
+def load_topology(path, wire_data=None):
+    with open(path, encoding="utf-8") as f:
+        return harness_from_dict(json.load(f), wire_data)
@@ -0,0 +1,134 @@
+"""Memoized bundle packing.
+
+Packing only depends on which wires go into the bundle, so results are keyed on
+the canonical multiset of (insulation, gauge, count), the custom wire area, the
+packing mode and a hash of the wire table. Heat shrink only changes the reported
+diameter and is applied on the way out. A bounded in-memory LRU sits in front of
+an optional SQLite store that survives restarts; rows packed against another
+version of wires.json are dropped when the store is opened.
+"""
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import bundle_engine
+from wire_catalog import as_catalog
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "harnesshelper" / "pack_cache.sqlite"
+
+
+class PackCache:
+    def __init__(self, wire_data, maxsize=256, path=None):
+        self.wire_data = wire_data
+        # stored layouts are only valid for this wire table and this packer
+        self.wires_hash = f"{as_catalog(wire_data).content_hash}-{bundle_engine.PACKER_VERSION}"
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()  # packing may run on a worker thread
+        self._db = None
+        if path:
+            self._open(Path(path))
+
+    def _open(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS packs (key TEXT PRIMARY KEY, wires_hash TEXT, data TEXT)")
+        # anything packed against a different wires.json is stale
+        self._db.execute("DELETE FROM packs WHERE wires_hash != ?", (self.wires_hash,))
+        self._db.commit()
+
+    def key(self, wire_counts, insulation, custom=None, mode="pratt", seed=0):
+        """Canonical key: same wires in any order or with zero counts give the same key."""
+        items = sorted((insulation, wire, int(count)) for wire, count in wire_counts.items() if int(count))
+        if custom and int(custom[0]):
+            items.append(("Custom", repr(float(custom[1])), int(custom[0])))
+        if seed:
+            return json.dumps([self.wires_hash, mode, items, int(seed)], separators=(",", ":"))
+        return json.dumps([self.wires_hash, mode, items], separators=(",", ":"))
+
+    def pack(self, wire_counts, insulation, heatshrink=0.0, custom=None, mode="pratt", progress=None, seed=0):
+        """Same as bundle_engine.pack_bundle, served from the cache when possible."""
+        key = self.key(wire_counts, insulation, custom, mode, seed)
+        with self._lock:
+            stored = self._get(key)
+        stats = None  # only a fresh packing has counters
+        if stored is None:
+            self.misses += 1
+            result = bundle_engine.pack_bundle(wire_counts, insulation, 0.0, custom=custom,
+                                               wire_data=self.wire_data, mode=mode, progress=progress, seed=seed)
+            stored = (result.positions, result.bundle_outer, result.wire_counts)
+            stats = result.stats
+            with self._lock:
+                self._put(key, stored)
+        else:
+            self.hits += 1
+        positions, bundle_outer, counts = stored
+        return bundle_engine.PackResult(positions[:], bundle_outer, max(0.0, float(heatshrink or 0.0)),
+                                        insulation, mode, dict(counts), stats=stats, seed=seed)
+
+    def lookup(self, wire_counts, insulation, heatshrink=0.0, custom=None, mode="pratt"):
+        """The cached PackResult for these wires, or None; never packs."""
+        with self._lock:
+            stored = self._get(self.key(wire_counts, insulation, custom, mode))
+        if stored is None:
+            return None
+        positions, bundle_outer, counts = stored
+        return bundle_engine.PackResult(positions[:], bundle_outer, max(0.0, float(heatshrink or 0.0)),
+                                        insulation, mode, dict(counts))
+
+    def store(self, result, custom=None):
+        """Remember a PackResult packed elsewhere (say on a process pool) from wires plus custom."""
+        if result.seed is None:
+            return  # incremental layouts depend on history, not just on the wires
+        key = self.key(result.wire_counts, result.insulation, custom, result.mode, result.seed)
+        with self._lock:
+            self._put(key, (result.positions, result.bundle_outer, result.wire_counts))
+
+    def _get(self, key):
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            return self._lru[key]
+        if self._db is None:
+            return None
+        row = self._db.execute("SELECT data FROM packs WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        data = json.loads(row[0])
+        positions = [tuple(p) for p in data["positions"]]
+        if len(positions) >= bundle_engine.COMPACT_MIN:
+            # as packed: very large bundles are kept as arrays
+            positions = bundle_engine.WireArrays.from_arrays(*zip(*positions))
+        stored = (positions, data["bundle_outer"], data["wire_counts"])
+        self._remember(key, stored)
+        return stored
+
+    def _put(self, key, stored):
+        self._remember(key, stored)
+        if self._db is not None:
+            positions, bundle_outer, counts = stored
+            data = json.dumps({"positions": list(positions), "bundle_outer": bundle_outer, "wire_counts": counts})
+            self._db.execute("INSERT OR REPLACE INTO packs VALUES (?, ?, ?)", (key, self.wires_hash, data))
+            self._db.commit()
+
+    def _remember(self, key, stored):
+        self._lru[key] = stored
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM packs")
+                self._db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,15 @@
+import numpy as np
+
+import bundle_engine
+import gauge_sizing
+
+
+def test_steps_back_down_after_the_fixed_point():
+    # the upward loop settles on 22 Gauge for the last circuit; 24 Gauge passes at its own loading
+    current = [0.96, 3.96, 3.08, 1.57]
+    result = gauge_sizing.size_gauges(current, 1.0, float("inf"), "PVC")
+    assert result.gauges == ["24 Gauge", "18 Gauge", "20 Gauge", "24 Gauge"]
+    assert result.load == gauge_sizing.load_step(result.loading)
+    limits = bundle_engine.current_limits(bundle_engine.load_wire_data(), "PVC", result.gauges, len(current),
+                                          result.load)
+    assert (limits >= np.array(current)).all()
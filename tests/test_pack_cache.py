@@ -0,0 +1,59 @@
+import copy
+import json
+
+import bundle_engine
+from pack_cache import PackCache
+from wire_catalog import WIRES_JSON
+
+WIRES = {"22 Gauge": 12, "18 Gauge": 4}
+
+
+def wire_table():
+    return json.loads(WIRES_JSON.read_text(encoding="utf-8"))
+
+
+def test_entry_survives_reopen(tmp_path):
+    path = tmp_path / "packs.sqlite"
+    cache = PackCache(wire_table(), path=path)
+    packed = cache.pack(WIRES, "PVC", heatshrink=0.5)
+    cache.close()
+
+    reopened = PackCache(wire_table(), path=path)
+    found = reopened.lookup(WIRES, "PVC", heatshrink=0.5)  # fresh LRU: this comes from disk
+    assert found is not None
+    assert list(found.positions) == list(packed.positions)
+    assert found.diameter_with_hs == packed.diameter_with_hs
+    reopened.close()
+
+
+def test_changed_wire_table_invalidates(tmp_path):
+    path = tmp_path / "packs.sqlite"
+    table = wire_table()
+    cache = PackCache(table, path=path)
+    cache.pack(WIRES, "PVC")
+    cache.close()
+
+    edited = copy.deepcopy(table)
+    edited["PVC"]["22 Gauge"]["radius"] += 0.01
+    changed = PackCache(edited, path=path)
+    assert changed.wires_hash != cache.wires_hash
+    assert changed.key(WIRES, "PVC") != cache.key(WIRES, "PVC")
+    assert changed.lookup(WIRES, "PVC") is None
+    changed.close()
+    # the stale row was dropped from the store, not just skipped
+    assert PackCache(table, path=path).lookup(WIRES, "PVC") is None
+
+
+def test_large_entry_reopens_as_wire_arrays(tmp_path):
+    path = tmp_path / "packs.sqlite"
+    wires = {"22 Gauge": bundle_engine.COMPACT_MIN}  # one wire type: a lattice, packed in milliseconds
+    cache = PackCache(wire_table(), path=path)
+    packed = cache.pack(wires, "PVC", mode="front")
+    assert isinstance(packed.positions, bundle_engine.WireArrays)
+    cache.close()
+
+    found = PackCache(wire_table(), path=path).lookup(wires, "PVC", mode="front")
+    assert isinstance(found.positions, bundle_engine.WireArrays)
+    assert len(found.positions) == bundle_engine.COMPACT_MIN
+    assert list(found.positions) == list(packed.positions)
+    assert found.bundle_outer == packed.bundle_outer
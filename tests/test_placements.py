@@ -0,0 +1,18 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import bundle_engine
+
+# Pratt placements of the scalar packer the GUI shipped with, recorded once; the
+# vectorized packer must reproduce them to the last bit
+BASELINE = json.loads((Path(__file__).parent / "baseline_positions.json").read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("case", BASELINE, ids=lambda case: f"{case['insulation']}-{'-'.join(case['wires'])}")
+def test_pratt_matches_baseline(case):
+    custom = tuple(case["custom"]) if case["custom"] else None
+    # no lattice: it replaces the search for homogeneous bundles on purpose
+    result = bundle_engine.pack_bundle(case["wires"], case["insulation"], custom=custom, mode="pratt", lattice=False)
+    assert [list(pos) for pos in result.positions] == case["positions"]
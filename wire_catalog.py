@@ -0,0 +1,222 @@
+"""Compiled wire catalog: wires.json validated once and turned into indexed arrays.
+
+Insulations and gauges (or part numbers) get integer ids, and every per-wire value
+the calculators need sits in a contiguous (insulation, gauge) array, with the
+fallbacks between the core table and the insulation tables already resolved. One
+extra row and column of zeros stands for unknown names, so lookups never branch.
+
+Compiled catalogs are cached as .npz files keyed by a hash of the source file, so
+a large catalog is parsed and validated once and then loads in milliseconds.
+"""
+import hashlib
+import json
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+
+WIRES_JSON = Path(__file__).parent / "wires.json"
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "harnesshelper"
+
+CACHE_VERSION = 2
+NUMERIC_FIELDS = ("radius", "radius_tol", "amp_limit", "area", "core_area")
+TABLES = ("radius", "radius_tol", "amp_limit", "pack_area", "conductor_area", "bundle_area", "has")
+
+
+class CatalogError(ValueError):
+    """wires.json does not have the expected shape."""
+
+
+def wire_data_hash(wire_data):
+    """Content hash of a wire table, independent of key order and formatting."""
+    blob = json.dumps(wire_data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def name_codes(keys, names, order=None):
+    """Vectorized name -> id lookup: order[i] (or i) for keys equal to names[i], len(names) for the rest.
+
+    names must be a sorted str array.
+    """
+    keys = np.asarray(keys)
+    if keys.dtype.kind != "U":
+        keys = keys.astype(str)
+    if not len(names):
+        return np.zeros(keys.shape, dtype=np.intp)
+    idx = np.minimum(np.searchsorted(names, keys), len(names) - 1)
+    return np.where(names[idx] == keys, idx if order is None else order[idx], len(names))
+
+
+def validate(wire_data):
+    """Raise CatalogError for anything the calculators can't use; return the insulation names."""
+    if not isinstance(wire_data, dict):
+        raise CatalogError("wire table must be a JSON object of tables")
+    for table_name, table in wire_data.items():
+        if not isinstance(table, dict):
+            raise CatalogError(f"{table_name}: must be an object of wire entries")
+        for wire, entry in table.items():
+            if not isinstance(entry, dict):
+                raise CatalogError(f"{table_name}/{wire}: must be an object")
+            for key in NUMERIC_FIELDS:
+                value = entry.get(key)
+                if value is None:
+                    continue
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) \
+                        or value < 0:
+                    raise CatalogError(f"{table_name}/{wire}/{key}: expected a non-negative number, got {value!r}")
+            if table_name != "core" and not entry.get("radius"):
+                raise CatalogError(f"{table_name}/{wire}: missing radius")
+            if entry.get("radius_tol") and entry["radius_tol"] >= entry.get("radius", 0.0):
+                raise CatalogError(f"{table_name}/{wire}/radius_tol: must be smaller than the radius")
+    insulations = [k for k in wire_data if k != "core"]
+    if not insulations:
+        raise CatalogError("no insulation tables")
+    return insulations
+
+
+class WireCatalog:
+    def __init__(self, insulations, gauges, core_gauges, tables, content_hash):
+        self.insulations = list(insulations)
+        self.gauges = list(gauges)
+        self.core_gauges = list(core_gauges)
+        self.content_hash = content_hash
+        self.insulation_ids = {name: i for i, name in enumerate(self.insulations)}
+        self.gauge_ids = {name: j for j, name in enumerate(self.gauges)}
+        # (insulations + 1) x (gauges + 1); the last row/column is the unknown-name sentinel
+        self.radius = tables["radius"]  # outer radius with insulation, mm
+        self.radius_tol = tables["radius_tol"]  # ± tolerance of that radius, mm (0 = not given)
+        self.amp_limit = tables["amp_limit"]  # A, insulation entry or core fallback
+        self.pack_area = tables["pack_area"]  # core area drawn in bundle sections, mm²
+        self.conductor_area = tables["conductor_area"]  # area for voltage drop, mm² (0 = none)
+        self.bundle_area = tables["bundle_area"]  # area for the quick diameter estimate, mm²
+        self.has = tables["has"]  # gauge listed in that insulation table
+        # sorted names and their ids, for vectorized name -> id lookups
+        self._ins_sorted, self._ins_order = self._sorted(self.insulations)
+        self._gauge_sorted, self._gauge_order = self._sorted(self.gauges)
+
+    @staticmethod
+    def _sorted(names):
+        names = np.array(names, dtype=str)
+        order = np.argsort(names, kind="stable")
+        return names[order], order
+
+    @classmethod
+    def from_dict(cls, wire_data):
+        """Validate a wire table dict and compile it."""
+        insulations = validate(wire_data)
+        core = wire_data.get("core", {})
+        gauges = list(core)
+        for name in insulations:
+            gauges.extend(g for g in wire_data[name] if g not in core and g not in gauges)
+        tables = {name: np.zeros((len(insulations) + 1, len(gauges) + 1)) for name in TABLES}
+        tables["has"] = tables["has"].astype(bool)
+        for i, name in enumerate(insulations):
+            table = wire_data[name]
+            for j, gauge in enumerate(gauges):
+                ins_entry = table.get(gauge, {})
+                core_entry = core.get(gauge, {})
+                r_outer = float(ins_entry.get("radius") or 0.0)
+                tables["has"][i, j] = gauge in table
+                tables["radius"][i, j] = r_outer
+                tables["radius_tol"][i, j] = float(ins_entry.get("radius_tol") or 0.0)
+                tables["amp_limit"][i, j] = float(ins_entry.get("amp_limit", core_entry.get("amp_limit", 0.0)) or 0.0)
+                # the three area rules of the original calculators, resolved once
+                if "core_area" in core_entry:
+                    pack_area = core_entry["core_area"]
+                elif "area" in core_entry:
+                    pack_area = core_entry["area"]
+                else:
+                    pack_area = ins_entry.get("area", max(0.0001, math.pi * (r_outer * 0.5) ** 2))
+                tables["pack_area"][i, j] = float(pack_area)
+                tables["conductor_area"][i, j] = float(core_entry.get("area", ins_entry.get("area", 0.0)) or 0.0)
+                tables["bundle_area"][i, j] = float(ins_entry.get("area", core_entry.get("area", 0.0)) or 0.0)
+        return cls(insulations, gauges, list(core), tables, wire_data_hash(wire_data))
+
+    # -- ids ---------------------------------------------------------------
+
+    def insulation_id(self, name):
+        """Row of an insulation, or the sentinel row for unknown names."""
+        return self.insulation_ids.get(name, len(self.insulations))
+
+    def gauge_id(self, name):
+        """Column of a gauge, or the sentinel column for unknown names."""
+        return self.gauge_ids.get(name, len(self.gauges))
+
+    def insulation_codes(self, names):
+        return name_codes(names, self._ins_sorted, self._ins_order)
+
+    def gauge_codes(self, names):
+        return name_codes(names, self._gauge_sorted, self._gauge_order)
+
+    # -- queries -----------------------------------------------------------
+
+    @staticmethod
+    def gauge_name(text):
+        """Catalog name of a gauge as typed in a table: "22" is accepted for "22 Gauge"."""
+        text = str(text or "").strip()
+        return f"{text} Gauge" if text.isdigit() else text
+
+    def gauges_for(self, insulation):
+        """Gauges listed in an insulation table, in catalog order."""
+        i = self.insulation_id(insulation)
+        return [g for j, g in enumerate(self.gauges) if self.has[i, j]]
+
+    def max_radius(self, insulation):
+        return float(self.radius[self.insulation_id(insulation)].max())
+
+    # -- binary cache --------------------------------------------------------
+
+    def save(self, path):
+        """Write the compiled arrays to an .npz file (atomically)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, version=CACHE_VERSION, insulations=np.array(self.insulations, dtype=str),
+                     gauges=np.array(self.gauges, dtype=str), core_gauges=np.array(self.core_gauges, dtype=str),
+                     content_hash=self.content_hash, **{name: getattr(self, name) for name in TABLES})
+        os.replace(tmp, path)
+
+    @classmethod
+    def load_compiled(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != CACHE_VERSION:
+                raise CatalogError(f"{path}: compiled with another catalog version")
+            return cls(data["insulations"].tolist(), data["gauges"].tolist(), data["core_gauges"].tolist(),
+                       {name: data[name] for name in TABLES}, str(data["content_hash"]))
+
+
+def load_catalog(path=None, cache_dir=DEFAULT_CACHE_DIR):
+    """Load a wire table as a WireCatalog, through the compiled cache when possible.
+
+    The cache file name carries hashes of the source path and bytes, so an edited
+    wires.json is recompiled (and its old cache removed). cache_dir=None skips the
+    cache; a cache that can't be read or written is ignored.
+    """
+    path = Path(path or WIRES_JSON)
+    raw = path.read_bytes()
+    if cache_dir is None:
+        return WireCatalog.from_dict(json.loads(raw.decode("utf-8")))
+    source = hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()[:12]
+    cached = Path(cache_dir) / f"catalog-{source}-{hashlib.sha256(raw).hexdigest()[:20]}.npz"
+    if cached.exists():
+        try:
+            return WireCatalog.load_compiled(cached)
+        except Exception:
+            pass  # stale or damaged, recompile below
+    catalog = WireCatalog.from_dict(json.loads(raw.decode("utf-8")))
+    try:
+        for old in cached.parent.glob(f"catalog-{source}-*.npz"):
+            old.unlink()
+        catalog.save(cached)
+    except OSError:
+        pass
+    return catalog
+
+
+def as_catalog(wire_data):
+    """A WireCatalog for either a catalog (returned as is) or a raw wire table dict."""
+    if isinstance(wire_data, WireCatalog):
+        return wire_data
+    return WireCatalog.from_dict(wire_data)